@@ -2,7 +2,6 @@
 
 from src.config.settings import PROJECT_ROOT_PATH
 from src.core.termwm import SecondaryWindow
-from src.utils.helpers import load_grayscale_opencv_template
 
 # Window config for TerminalWindowManager
 SECONDARY_WINDOWS = [
@@ -28,28 +27,14 @@ SETTINGS_AREA = {"left": 170, "top": 85, "width": 40, "height": 40}
 HERO_PICK_AREA = {"left": 1658, "top": 1028, "width": 62, "height": 38}
 NEW_CAPTURE_AREA = {"left": 0, "top": 0, "width": 0, "height": 0}
 
-# Path to OpenCV templates
-DOTA_TAB_TEMPLATE = load_grayscale_opencv_template(
-    _OPENCV_DIR / "dota_menu_power_icon.jpg"
-)
-IN_GAME_TEMPLATE = load_grayscale_opencv_template(
-    _OPENCV_DIR / "dota_courier_deliver_items_icon.jpg"
-)
-STARTING_BUY_TEMPLATE = load_grayscale_opencv_template(
-    _OPENCV_DIR / "dota_strategy-load-out-world-guides.jpg"
-)
-PLAY_DOTA_BUTTON_TEMPLATE = load_grayscale_opencv_template(
-    _OPENCV_DIR / "dota_play_dota_button.jpg"
-)
-DESKTOP_TAB_TEMPLATE = load_grayscale_opencv_template(
-    _OPENCV_DIR / "windows_desktop_icons.jpg"
-)
-SETTINGS_TEMPLATE = load_grayscale_opencv_template(
-    _OPENCV_DIR / "dota_settings_icon.jpg"
-)
-HERO_PICK_TEMPLATE = load_grayscale_opencv_template(
-    _OPENCV_DIR / "dota_hero_select_chat_icons.jpg"
-)
+# Paths to OpenCV templates, decoded on first use (see `images_processor`)
+DOTA_TAB_TEMPLATE_PATH = _OPENCV_DIR / "dota_menu_power_icon.jpg"
+IN_GAME_TEMPLATE_PATH = _OPENCV_DIR / "dota_courier_deliver_items_icon.jpg"
+STARTING_BUY_TEMPLATE_PATH = _OPENCV_DIR / "dota_strategy-load-out-world-guides.jpg"
+PLAY_DOTA_BUTTON_TEMPLATE_PATH = _OPENCV_DIR / "dota_play_dota_button.jpg"
+DESKTOP_TAB_TEMPLATE_PATH = _OPENCV_DIR / "windows_desktop_icons.jpg"
+SETTINGS_TEMPLATE_PATH = _OPENCV_DIR / "dota_settings_icon.jpg"
+HERO_PICK_TEMPLATE_PATH = _OPENCV_DIR / "dota_hero_select_chat_icons.jpg"
 
 # Paths to JSON request files for scene changes
 SCENE_CHANGE_IN_GAME = _WS_REQUESTS_DIR / "scene_change_for_in_game.json"
@@ -1,6 +1,8 @@
 """Image processing module for screen capture and analysis on multiple areas."""
 
 import asyncio
+from functools import cache
+from pathlib import Path
 from typing import cast
 
 import cv2 as cv
@@ -12,23 +14,45 @@ from skimage.metrics import (
 
 from src.apps.pregamespy.core.constants import (
     DESKTOP_TAB_AREA,
-    DESKTOP_TAB_TEMPLATE,
+    DESKTOP_TAB_TEMPLATE_PATH,
     DOTA_TAB_AREA,
-    DOTA_TAB_TEMPLATE,
+    DOTA_TAB_TEMPLATE_PATH,
     HERO_PICK_AREA,
-    HERO_PICK_TEMPLATE,
+    HERO_PICK_TEMPLATE_PATH,
     IN_GAME_AREA,
-    IN_GAME_TEMPLATE,
+    IN_GAME_TEMPLATE_PATH,
     SECONDARY_WINDOWS,
     SETTINGS_AREA,
-    SETTINGS_TEMPLATE,
+    SETTINGS_TEMPLATE_PATH,
     STARTING_BUY_AREA,
-    STARTING_BUY_TEMPLATE,
+    STARTING_BUY_TEMPLATE_PATH,
 )
 from src.apps.pregamespy.core.shared_events import (
     mute_ssim_prints,
     secondary_windows_spawned,
 )
+from src.utils.helpers import load_grayscale_opencv_template
+
+TEMPLATE_PATHS = (
+    DOTA_TAB_TEMPLATE_PATH,
+    IN_GAME_TEMPLATE_PATH,
+    STARTING_BUY_TEMPLATE_PATH,
+    DESKTOP_TAB_TEMPLATE_PATH,
+    SETTINGS_TEMPLATE_PATH,
+    HERO_PICK_TEMPLATE_PATH,
+)
+
+
+@cache
+def load_template(template_path: Path) -> cv.typing.MatLike:
+    """Decode a template the first time it is needed, then reuse it."""
+    return load_grayscale_opencv_template(template_path)
+
+
+def preload_templates() -> None:
+    """Decode every template ahead of their first use."""
+    for template_path in TEMPLATE_PATHS:
+        load_template(template_path)
 
 
 class ImagesProcessor:
@@ -81,32 +105,36 @@ class ImagesProcessor:
 
     async def _detect_hero_pick(self) -> float:
         return await self._capture_and_process_image(
-            "hero_pick_scanner", HERO_PICK_AREA, HERO_PICK_TEMPLATE
+            "hero_pick_scanner", HERO_PICK_AREA, load_template(HERO_PICK_TEMPLATE_PATH)
         )
 
     async def _detect_starting_buy(self) -> float:
         return await self._capture_and_process_image(
-            "starting_buy_scanner", STARTING_BUY_AREA, STARTING_BUY_TEMPLATE
+            "starting_buy_scanner",
+            STARTING_BUY_AREA,
+            load_template(STARTING_BUY_TEMPLATE_PATH),
         )
 
     async def _detect_dota_tab_out(self) -> float:
         return await self._capture_and_process_image(
-            "dota_tab_scanner", DOTA_TAB_AREA, DOTA_TAB_TEMPLATE
+            "dota_tab_scanner", DOTA_TAB_AREA, load_template(DOTA_TAB_TEMPLATE_PATH)
         )
 
     async def _detect_desktop_tab_out(self) -> float:
         return await self._capture_and_process_image(
-            "desktop_tab_scanner", DESKTOP_TAB_AREA, DESKTOP_TAB_TEMPLATE
+            "desktop_tab_scanner",
+            DESKTOP_TAB_AREA,
+            load_template(DESKTOP_TAB_TEMPLATE_PATH),
         )
 
     async def _detect_settings_screen(self) -> float:
         return await self._capture_and_process_image(
-            "settings_scanner", SETTINGS_AREA, SETTINGS_TEMPLATE
+            "settings_scanner", SETTINGS_AREA, load_template(SETTINGS_TEMPLATE_PATH)
         )
 
     async def _detect_in_game(self) -> float:
         return await self._capture_and_process_image(
-            "in_game_scanner", IN_GAME_AREA, IN_GAME_TEMPLATE
+            "in_game_scanner", IN_GAME_AREA, load_template(IN_GAME_TEMPLATE_PATH)
         )
 
     async def scan_screen_for_matches(self) -> dict[str, float]:
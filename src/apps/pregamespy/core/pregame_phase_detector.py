@@ -1,12 +1,19 @@
 """Module for managing the main logic flow of pre-game phase detection."""
 
 import asyncio
+import time
 from typing import final
 
 from src.apps.pregamespy.core.game_state_manager import GameStateManager
 from src.apps.pregamespy.core.images_processor import ImagesProcessor
 from src.apps.pregamespy.core.socket_handler import PreGamePhaseHandler
+from src.connection.control_protocol import ReadinessStage
 from src.connection.websocket_client import WebSocketClient
+from src.utils.frame_stats import FrameStats
+from src.utils.startup_timing import (
+    FIRST_DETECTION_MILESTONE,
+    report_startup_milestone,
+)
 
 
 # pylint: disable=too-few-public-methods
@@ -14,6 +21,9 @@ from src.connection.websocket_client import WebSocketClient
 class PreGamePhaseDetector:
     """Class to manage the main logic flow of pre-game phase detection."""
 
+    SSIM_MATCH_TARGET = 0.7
+    SCAN_INTERVAL_SECONDS = 0.01
+
     def __init__(
         self, socket_handler: PreGamePhaseHandler, ws_client: WebSocketClient
     ) -> None:
@@ -27,20 +37,56 @@ class PreGamePhaseDetector:
         self.image_processor = ImagesProcessor()
         self.state_manager = GameStateManager(self.image_processor, ws_client)
         self.socket_handler = socket_handler
+        self.ssim_target = self.SSIM_MATCH_TARGET
+        self.scan_interval = self.SCAN_INTERVAL_SECONDS
+        self.last_matches: dict[str, float] = {}
+        self.frame_stats = FrameStats(loop="pregamespy")
+        self._register_control_hooks()
+
+    def _register_control_hooks(self) -> None:
+        self.socket_handler.add_status_provider(self.get_status)
+        self.socket_handler.add_metrics_provider(self.frame_stats.as_dict)
+        self.socket_handler.register_config_option(
+            "ssim_target",
+            lambda: self.ssim_target,
+            lambda value: setattr(self, "ssim_target", value),
+        )
+        self.socket_handler.register_config_option(
+            "scan_interval",
+            lambda: self.scan_interval,
+            lambda value: setattr(self, "scan_interval", value),
+        )
+
+    def get_status(self) -> dict[str, object]:
+        """Return the live detection state, for the control socket."""
+        return {
+            "game_phase": self.state_manager.game_phase.active,
+            "tabbed": self.state_manager.tabbed.active,
+            "last_matches": {k: round(v, 4) for k, v in self.last_matches.items()},
+            "fps": round(self.frame_stats.fps, 2),
+        }
 
     async def detect_pregame_phase(self) -> None:
         """Start main loop to detect pre-game phases."""
         await self.state_manager.set_state_finding_game()
-        target = 0.7  # target value for ssim
         while not self.socket_handler.stop_event.is_set():
+            frame_start = time.perf_counter()
+            target = self.ssim_target
             ssim_match = await self.image_processor.scan_screen_for_matches()
+            self.last_matches = ssim_match
+            report_startup_milestone(
+                FIRST_DETECTION_MILESTONE, self.socket_handler.logger
+            )
+            self.socket_handler.mark_ready(ReadinessStage.FIRST_FRAME)
             await self._handle_finding_game(ssim_match, target)
             if self.state_manager.game_phase.finding_game:
+                self.frame_stats.record(time.perf_counter() - frame_start)
                 continue
             await self._wait_for_transitions(ssim_match, target)
             await self._handle_tabbed_states(ssim_match, target)
             await self._handle_pregame_phases(ssim_match, target)
-            await asyncio.sleep(0.01)
+            self.frame_stats.record(time.perf_counter() - frame_start)
+            await asyncio.sleep(self.scan_interval)
 
     async def _handle_finding_game(
         self, ssim_match: dict[str, float], target: float
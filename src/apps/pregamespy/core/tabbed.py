@@ -58,6 +58,13 @@ class Tabbed:
             self._set_all_false()
         self._in_game = value
 
+    @property
+    def active(self) -> str | None:
+        """Name of the currently active state, if any."""
+        return next(
+            (attr.lstrip("_") for attr, value in self.__dict__.items() if value), None
+        )
+
     def _set_all_false(self) -> None:
         for attr in self.__dict__:
             self.__dict__[attr] = False
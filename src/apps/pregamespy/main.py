@@ -9,7 +9,10 @@ from src.apps.pregamespy.core.constants import (
     NEW_CAPTURE_AREA,
     SECONDARY_WINDOWS,
 )
-from src.apps.pregamespy.core.images_processor import ImagesProcessor
+from src.apps.pregamespy.core.images_processor import (
+    ImagesProcessor,
+    preload_templates,
+)
 from src.apps.pregamespy.core.pregame_phase_detector import (
     PreGamePhaseDetector,
 )
@@ -23,6 +26,8 @@ from src.connection.constants import (
     STREAMERBOT_WS_URL,
     SUBPROCESSES_PORTS,
 )
+from src.connection.control_protocol import ReadinessStage
+from src.connection.ipc import subprocess_socket_path
 from src.connection.websocket_client import WebSocketClient
 from src.core.termwm import TerminalWindowManager
 from src.utils.helpers import construct_script_name, print_countdown
@@ -33,9 +38,20 @@ SCRIPT_NAME = construct_script_name(__file__)
 logger = setup_logger(SCRIPT_NAME)
 
 PORT = SUBPROCESSES_PORTS["pregamespy"]
+SOCKET_PATH = subprocess_socket_path("pregamespy")
+READINESS_STAGES = (
+    ReadinessStage.SOCKET_SERVER,
+    ReadinessStage.WEBSOCKET,
+    ReadinessStage.FIRST_FRAME,
+)
 twm = TerminalWindowManager()
 
 
+def warm_up() -> None:
+    """Decode the templates ahead of time, called by `warm_worker` processes."""
+    preload_templates()
+
+
 async def _setup_optional_new_capture_area(
     image_processor: ImagesProcessor,
     *,
@@ -75,14 +91,19 @@ async def main() -> None:
             return
 
         socket_server_handler = PreGamePhaseHandler(
-            port=PORT, stop_message=STOP_SUBPROCESS_MESSAGE, logger=logger
+            port=PORT,
+            stop_message=STOP_SUBPROCESS_MESSAGE,
+            logger=logger,
+            socket_path=SOCKET_PATH,
+            readiness_stages=READINESS_STAGES,
         )
         socket_server_task = asyncio.create_task(
             socket_server_handler.run_socket_server()
         )
 
         ws_client = WebSocketClient(STREAMERBOT_WS_URL, logger)
-        await ws_client.establish_connection()
+        if await ws_client.establish_connection():
+            socket_server_handler.mark_ready(ReadinessStage.WEBSOCKET)
 
         detector = PreGamePhaseDetector(socket_server_handler, ws_client)
         await _setup_optional_new_capture_area(
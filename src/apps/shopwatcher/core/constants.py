@@ -27,3 +27,7 @@ DISPLAY_TIME_SINCE_SHOP_OPENED_PATH = (
 
 # OBS
 TIME_SINCE_SHOP_OPENED_TXT_PATH = _OBS_DIR / "time_since_shop_opened.txt"
+OVERLAY_TEXT_FILE_SINK_ENABLED = False
+"""Also write the overlay text to TIME_SINCE_SHOP_OPENED_TXT_PATH (only when it changes),
+for setups where Streamer.bot/OBS reads the text from the file instead of the request's
+args."""
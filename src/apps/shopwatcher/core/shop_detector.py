@@ -1,6 +1,7 @@
 """Used to detect the shop appearing on the screen and manage further logic."""
 
 import asyncio
+import time
 from logging import Logger
 from typing import cast, final
 
@@ -12,9 +13,11 @@ from skimage.metrics import (
 )
 
 from src.apps.shopwatcher.core.constants import (
+    OVERLAY_TEXT_FILE_SINK_ENABLED,
     SCREEN_CAPTURE_AREA,
     SECONDARY_WINDOWS,
     SHOP_TEMPLATE_IMAGE_PATH,
+    TIME_SINCE_SHOP_OPENED_TXT_PATH,
 )
 from src.apps.shopwatcher.core.shared_events import (
     mute_ssim_prints,
@@ -22,8 +25,15 @@ from src.apps.shopwatcher.core.shared_events import (
 )
 from src.apps.shopwatcher.core.shop_tracker import ShopTracker
 from src.apps.shopwatcher.core.socket_handler import ShopWatcherHandler
+from src.connection.control_protocol import ReadinessStage
+from src.connection.payload_templates import ChangedTextFileSink
 from src.connection.websocket_client import WebSocketClient
+from src.utils.frame_stats import FrameStats
 from src.utils.helpers import load_grayscale_opencv_template
+from src.utils.startup_timing import (
+    FIRST_DETECTION_MILESTONE,
+    report_startup_milestone,
+)
 
 
 # pylint: disable=too-few-public-methods
@@ -32,6 +42,7 @@ class ShopDetector:
     """Detects the shop appearing on the screen and manages shop tracking logic."""
 
     SSIM_SIMILARITY_THRESHOLD = 0.8
+    SCAN_INTERVAL_SECONDS = 0.01
 
     def __init__(
         self,
@@ -51,7 +62,39 @@ class ShopDetector:
         self.mute_ssim_prints = mute_ssim_prints
         self.socket_handler = socket_handler
         self.logger = logger
-        self.shop_tracker = ShopTracker(logger, ws_client)
+        overlay_file_sink = (
+            ChangedTextFileSink(TIME_SINCE_SHOP_OPENED_TXT_PATH)
+            if OVERLAY_TEXT_FILE_SINK_ENABLED
+            else None
+        )
+        self.shop_tracker = ShopTracker(logger, ws_client, overlay_file_sink)
+        self.ssim_threshold = self.SSIM_SIMILARITY_THRESHOLD
+        self.scan_interval = self.SCAN_INTERVAL_SECONDS
+        self.last_match_value = 0.0
+        self.frame_stats = FrameStats(loop="shopwatcher")
+        self._register_control_hooks()
+
+    def _register_control_hooks(self) -> None:
+        self.socket_handler.add_status_provider(self.get_status)
+        self.socket_handler.add_metrics_provider(self.frame_stats.as_dict)
+        self.socket_handler.register_config_option(
+            "ssim_threshold",
+            lambda: self.ssim_threshold,
+            lambda value: setattr(self, "ssim_threshold", value),
+        )
+        self.socket_handler.register_config_option(
+            "scan_interval",
+            lambda: self.scan_interval,
+            lambda value: setattr(self, "scan_interval", value),
+        )
+
+    def get_status(self) -> dict[str, object]:
+        """Return the live detection state, for the control socket."""
+        return {
+            "shop_is_open": self.shop_tracker.shop_is_currently_open,
+            "last_match_value": round(self.last_match_value, 4),
+            "fps": round(self.frame_stats.fps, 2),
+        }
 
     async def scan_for_shop_and_notify(self, *, write: bool) -> None:
         """Scan for the shop on the screen and react when it appears/disappears.
@@ -64,9 +107,11 @@ class ShopDetector:
         template = load_grayscale_opencv_template(SHOP_TEMPLATE_IMAGE_PATH)
 
         while not self.socket_handler.stop_event.is_set():
+            frame_start = time.perf_counter()
             frame = await self._capture_window(SCREEN_CAPTURE_AREA)
             gray_frame = cv.cvtColor(frame, cv.COLOR_BGR2GRAY)
             match_value = await self._compare_images(gray_frame, template)
+            self.last_match_value = match_value
             cv.imshow(SECONDARY_WINDOWS[0].name, gray_frame)
             self.secondary_windows_spawned.set()
 
@@ -81,11 +126,14 @@ class ShopDetector:
             if not self.mute_ssim_prints.is_set():
                 print(f"SSIM: {match_value:.6f}", end="\r")
 
-            if match_value >= self.SSIM_SIMILARITY_THRESHOLD:
+            if match_value >= self.ssim_threshold:
                 await self.shop_tracker.react_to_opened_shop()
-            elif match_value < self.SSIM_SIMILARITY_THRESHOLD:
+            elif match_value < self.ssim_threshold:
                 await self.shop_tracker.react_to_closed_shop()
-            await asyncio.sleep(0.01)
+            self.frame_stats.record(time.perf_counter() - frame_start)
+            report_startup_milestone(FIRST_DETECTION_MILESTONE, self.logger)
+            self.socket_handler.mark_ready(ReadinessStage.FIRST_FRAME)
+            await asyncio.sleep(self.scan_interval)
 
     @staticmethod
     async def _capture_window(area: dict[str, int]) -> np.ndarray:
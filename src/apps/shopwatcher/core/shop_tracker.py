@@ -6,16 +6,14 @@ import time
 from logging import Logger
 from typing import final
 
-import aiofiles
-
 from src.apps.shopwatcher.core.constants import (
     BRB_BUYING_MILK_HIDE_PATH,
     BRB_BUYING_MILK_SHOW_PATH,
     DISPLAY_TIME_SINCE_SHOP_OPENED_PATH,
     DSLR_HIDE_PATH,
     DSLR_SHOW_PATH,
-    TIME_SINCE_SHOP_OPENED_TXT_PATH,
 )
+from src.connection.payload_templates import ChangedTextFileSink
 from src.connection.websocket_client import WebSocketClient
 
 
@@ -26,12 +24,18 @@ class ShopTracker:
     SHORT_OPEN_THRESHOLD_SECONDS = 5
     LONG_OPEN_THRESHOLD_SECONDS = 15
 
-    def __init__(self, logger: Logger, ws_client: WebSocketClient) -> None:
+    def __init__(
+        self,
+        logger: Logger,
+        ws_client: WebSocketClient,
+        overlay_file_sink: ChangedTextFileSink | None = None,
+    ) -> None:
         """Initialize the ShopTracker with logger and websocket client.
 
         Args:
             logger: Logger instance for logging messages
             ws_client: WebSocket client for sending requests
+            overlay_file_sink: Optional sink also writing the overlay text to a file
 
         """
         self.shop_is_currently_open = False
@@ -43,6 +47,7 @@ class ShopTracker:
         }
         self.logger = logger
         self.ws = ws_client
+        self.overlay_file_sink = overlay_file_sink
 
     async def react_to_opened_shop(self) -> None:
         """Signal that the shop has opened and start tracking its duration."""
@@ -122,10 +127,13 @@ class ShopTracker:
             elapsed_time = time.time() - start_time + seconds
             seconds_only = round(elapsed_time)
             formatted_time = f"{seconds_only:02d}"
-            async with aiofiles.open(TIME_SINCE_SHOP_OPENED_TXT_PATH, "w") as file:
-                await file.write(
-                    f"Bro you've been in the shop for {formatted_time} seconds,"
-                    " just buy something..."
-                )
-            await self.ws.send_json_requests(str(DISPLAY_TIME_SINCE_SHOP_OPENED_PATH))
+            overlay_text = (
+                f"Bro you've been in the shop for {formatted_time} seconds,"
+                " just buy something..."
+            )
+            if self.overlay_file_sink:
+                await self.overlay_file_sink.write(overlay_text)
+            await self.ws.send_templated_request(
+                DISPLAY_TIME_SINCE_SHOP_OPENED_PATH, {"overlay_text": overlay_text}
+            )
             await asyncio.sleep(1)
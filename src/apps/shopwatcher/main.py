@@ -17,6 +17,8 @@ from src.connection.constants import (
     STREAMERBOT_WS_URL,
     SUBPROCESSES_PORTS,
 )
+from src.connection.control_protocol import ReadinessStage
+from src.connection.ipc import subprocess_socket_path
 from src.connection.websocket_client import WebSocketClient
 from src.core.termwm import TerminalWindowManager
 from src.utils.helpers import construct_script_name, print_countdown
@@ -24,6 +26,12 @@ from src.utils.logging_utils import setup_logger
 from src.utils.script_initializer import setup_script
 
 PORT = SUBPROCESSES_PORTS["shopwatcher"]
+SOCKET_PATH = subprocess_socket_path("shopwatcher")
+READINESS_STAGES = (
+    ReadinessStage.SOCKET_SERVER,
+    ReadinessStage.WEBSOCKET,
+    ReadinessStage.FIRST_FRAME,
+)
 SCRIPT_NAME = construct_script_name(__file__)
 
 logger = setup_logger(SCRIPT_NAME)
@@ -53,14 +61,19 @@ async def main() -> None:
             return
 
         socket_server_handler = ShopWatcherHandler(
-            port=PORT, stop_message=STOP_SUBPROCESS_MESSAGE, logger=logger
+            port=PORT,
+            stop_message=STOP_SUBPROCESS_MESSAGE,
+            logger=logger,
+            socket_path=SOCKET_PATH,
+            readiness_stages=READINESS_STAGES,
         )
         socket_server_task = asyncio.create_task(
             socket_server_handler.run_socket_server()
         )
 
         ws_client = WebSocketClient(STREAMERBOT_WS_URL, logger)
-        await ws_client.establish_connection()
+        if await ws_client.establish_connection():
+            socket_server_handler.mark_ready(ReadinessStage.WEBSOCKET)
 
         shopwatcher = ShopDetector(socket_server_handler, logger, ws_client)
 
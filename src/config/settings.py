@@ -34,3 +34,7 @@ GOOGLE_CLOUD_API_KEY = get_env_var("GOOGLE_CLOUD_API_KEY_PATH")
 NEO4J_URI = get_env_var("NEO4J_URI")
 NEO4J_USER = get_env_var("NEO4J_USER")
 NEO4J_PASSWORD = get_env_var("NEO4J_PASSWORD")
+
+SUBPROCESS_IPC_TRANSPORT = get_env_var("SUBPROCESS_IPC_TRANSPORT", "tcp")
+
+METRICS_HTTP_EXPORTER = get_env_var("METRICS_HTTP_EXPORTER", "off") == "on"
@@ -3,6 +3,10 @@
 STREAMERBOT_WS_URL = "ws://127.0.0.1:50001/"
 """Defined in the Streamer.bot application settings."""
 
+TRACE_DUMP_COMMAND = "trace-dump"
+"""Control command making Robeau dump the graph engine's recent node events, with an
+optional `limit` parameter."""
+
 STOP_SUBPROCESS_MESSAGE = "stop$subprocess"
 """Message sent to the subprocess's socket handler to signal it to stop running. The `$`
 character is used as a marker to avoid accidental triggering from speech-to-text
@@ -16,3 +20,16 @@ SUBPROCESSES_PORTS = {
     "synonym_adder": 59003,
 }
 """Mapping of subprocess names to their respective port numbers."""
+
+METRICS_HTTP_PORT_OFFSET = 100
+"""Offset from an app's control port, or the server's websocket port, of the local
+HTTP port its metrics are served on when `METRICS_HTTP_EXPORTER` is "on"."""
+
+APP_ENTRY_MODULES = {
+    # list of subprocesses name and the module to run them with `python -m`
+    "shopwatcher": "src.apps.shopwatcher.main",
+    "pregamespy": "src.apps.pregamespy.main",
+    "robeau": "src.robeau.main",
+    "synonym_adder": "src.robeau.jsons.modules.prompt_synonym_adder",
+}
+"""Mapping of subprocess names to their entry point modules."""
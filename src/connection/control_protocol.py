@@ -0,0 +1,152 @@
+"""Small JSON command protocol spoken on the subprocesses' control sockets.
+
+A request is a single JSON object frame:
+
+    {"id": "1", "command": "status", "params": {}}
+
+and is answered by a single JSON object frame carrying the same id:
+
+    {"id": "1", "ok": true, "result": {...}}
+    {"id": "1", "ok": false, "error": "Unknown command: foo"}
+
+Commands are processed concurrently, so replies may come back in a different order
+than the requests were sent: match them using their ids. Plain text messages (such as
+`STOP_SUBPROCESS_MESSAGE`) keep being answered with a plain ACK.
+"""
+
+import json
+from dataclasses import dataclass, field
+from enum import StrEnum
+from typing import cast
+
+
+class ControlCommand(StrEnum):
+    """Commands understood by every `BaseHandler`."""
+
+    STATUS = "status"
+    METRICS = "metrics"
+    SET_CONFIG = "set-config"
+    STOP = "stop"
+    WAIT_READY = "wait-ready"
+    PROFILE = "profile"
+
+
+class ReadinessStage(StrEnum):
+    """Startup stages an app goes through before being ready, see `wait-ready`."""
+
+    SOCKET_SERVER = "socket-server"
+    WEBSOCKET = "websocket"
+    FIRST_FRAME = "first-frame"
+    LISTENING = "listening"
+
+
+class ControlProtocolError(ValueError):
+    """Raised when a control message cannot be parsed."""
+
+
+def is_control_message(message: str) -> bool:
+    """Tell if a received message is meant to be a JSON control message."""
+    return message.lstrip().startswith("{")
+
+
+def _load_object(message: str) -> dict[str, object]:
+    try:
+        payload = json.loads(message)
+    except json.JSONDecodeError as e:
+        msg = f"Invalid JSON control message: {e}"
+        raise ControlProtocolError(msg) from e
+    if not isinstance(payload, dict):
+        msg = "Control message must be a JSON object"
+        raise ControlProtocolError(msg)
+    return cast("dict[str, object]", payload)
+
+
+@dataclass(frozen=True)
+class ControlRequest:
+    """A command sent to a subprocess control socket."""
+
+    command: str
+    params: dict[str, object] = field(default_factory=dict)
+    request_id: str | None = None
+
+    def to_json(self) -> str:
+        """Serialize the request into a single line JSON string."""
+        return json.dumps(
+            {"id": self.request_id, "command": self.command, "params": self.params}
+        )
+
+    @classmethod
+    def from_json(cls, message: str) -> "ControlRequest":
+        """Parse a request from its JSON representation.
+
+        Raises:
+            ControlProtocolError: If the message is not a valid request.
+
+        """
+        payload = _load_object(message)
+        command = payload.get("command")
+        if not isinstance(command, str) or not command:
+            msg = "Control request is missing its command"
+            raise ControlProtocolError(msg)
+        params = payload.get("params") or {}
+        if not isinstance(params, dict):
+            msg = "Control request params must be a JSON object"
+            raise ControlProtocolError(msg)
+        request_id = payload.get("id")
+        return cls(
+            command=command,
+            params=cast("dict[str, object]", params),
+            request_id=None if request_id is None else str(request_id),
+        )
+
+
+@dataclass(frozen=True)
+class ControlResponse:
+    """The structured reply to a `ControlRequest`."""
+
+    request_id: str | None
+    ok: bool
+    result: dict[str, object] = field(default_factory=dict)
+    error: str | None = None
+
+    def to_json(self) -> str:
+        """Serialize the response into a single line JSON string."""
+        payload: dict[str, object] = {"id": self.request_id, "ok": self.ok}
+        if self.ok:
+            payload["result"] = self.result
+        else:
+            payload["error"] = self.error
+        return json.dumps(payload, default=str)
+
+    @classmethod
+    def from_json(cls, message: str) -> "ControlResponse":
+        """Parse a response from its JSON representation.
+
+        Raises:
+            ControlProtocolError: If the message is not a valid response.
+
+        """
+        payload = _load_object(message)
+        result = payload.get("result")
+        if not isinstance(result, dict):
+            result = {}
+        request_id = payload.get("id")
+        error = payload.get("error")
+        return cls(
+            request_id=None if request_id is None else str(request_id),
+            ok=bool(payload.get("ok")),
+            result=cast("dict[str, object]", result),
+            error=None if error is None else str(error),
+        )
+
+    @classmethod
+    def success(
+        cls, request_id: str | None, result: dict[str, object] | None = None
+    ) -> "ControlResponse":
+        """Build a successful response."""
+        return cls(request_id=request_id, ok=True, result=result or {})
+
+    @classmethod
+    def failure(cls, request_id: str | None, error: str) -> "ControlResponse":
+        """Build an error response."""
+        return cls(request_id=request_id, ok=False, error=error)
@@ -0,0 +1,56 @@
+"""Newline-delimited framing for the subprocesses' socket streams.
+
+TCP is a byte stream: a single `read()` can return half a message or several
+coalesced ones. Every message exchanged with a `BaseHandler` socket server is
+therefore terminated by `FRAME_DELIMITER`, and readers split the stream on it.
+"""
+
+import asyncio
+
+FRAME_DELIMITER = b"\n"
+MAX_FRAME_SIZE = 64 * 1024
+"""Maximum size in bytes of a single frame, also used as the StreamReader limit."""
+
+
+class FramingError(ValueError):
+    """Raised when a message cannot be framed or a received frame is invalid."""
+
+
+def encode_frame(message: str) -> bytes:
+    """Encode a message into a frame ready to be written on a stream.
+
+    Raises:
+        FramingError: If the message contains the delimiter or is too large.
+
+    """
+    data = message.encode("utf-8")
+    if FRAME_DELIMITER in data:
+        e = "Message must not contain a newline character"
+        raise FramingError(e)
+    if len(data) >= MAX_FRAME_SIZE:
+        e = f"Message of {len(data)} bytes exceeds the {MAX_FRAME_SIZE} bytes limit"
+        raise FramingError(e)
+    return data + FRAME_DELIMITER
+
+
+async def read_frame(reader: asyncio.StreamReader) -> str | None:
+    """Read the next complete frame from the stream.
+
+    Returns:
+        The decoded message, or None if the peer closed the connection. A trailing
+        unterminated chunk sent right before closing is returned as a last message.
+
+    Raises:
+        FramingError: If a frame exceeds `MAX_FRAME_SIZE`.
+
+    """
+    try:
+        data = await reader.readuntil(FRAME_DELIMITER)
+    except asyncio.IncompleteReadError as e:
+        if not e.partial:
+            return None
+        data = e.partial
+    except asyncio.LimitOverrunError as e:
+        msg = f"Received frame exceeds the {MAX_FRAME_SIZE} bytes limit"
+        raise FramingError(msg) from e
+    return data.rstrip(FRAME_DELIMITER).decode("utf-8")
@@ -0,0 +1,110 @@
+"""Discovery of the subprocesses' socket servers and choice of their IPC transport.
+
+By default subprocesses listen on TCP `localhost`, on the port given to them in
+`SUBPROCESSES_PORTS`. Setting the `SUBPROCESS_IPC_TRANSPORT` environment variable to
+`unix` makes them listen on a Unix domain socket instead, named after the subprocess
+in `SUBPROCESS_SOCKETS_DIR_PATH`. This skips the TCP stack entirely and lets clients
+tell a subprocess is not running without even trying to connect, since its socket
+file does not exist.
+
+Unix domain sockets are not supported by asyncio on Windows, where the transport
+always falls back to TCP.
+"""
+
+import asyncio
+import sys
+from dataclasses import dataclass
+from enum import StrEnum
+from pathlib import Path
+
+from src.config.settings import SUBPROCESS_IPC_TRANSPORT
+from src.connection.constants import SUBPROCESSES_PORTS
+from src.connection.framing import MAX_FRAME_SIZE
+from src.core.constants import SUBPROCESS_SOCKETS_DIR_PATH
+
+SOCKET_FILE_SUFFIX = ".sock"
+
+
+class IpcTransport(StrEnum):
+    """Transports available for the subprocesses' socket servers."""
+
+    TCP = "tcp"
+    UNIX = "unix"
+
+
+def unix_sockets_supported() -> bool:
+    """Tell if asyncio can serve Unix domain sockets on this platform."""
+    return sys.platform != "win32" and hasattr(asyncio, "start_unix_server")
+
+
+def get_ipc_transport() -> IpcTransport:
+    """Return the configured transport, TCP when Unix sockets are unavailable.
+
+    Raises:
+        ValueError: If `SUBPROCESS_IPC_TRANSPORT` is not a known transport.
+
+    """
+    transport = IpcTransport(SUBPROCESS_IPC_TRANSPORT.lower())
+    if transport is IpcTransport.UNIX and not unix_sockets_supported():
+        return IpcTransport.TCP
+    return transport
+
+
+def subprocess_socket_path(name: str) -> Path | None:
+    """Return the Unix socket path of a subprocess, or None when TCP is used."""
+    if get_ipc_transport() is not IpcTransport.UNIX:
+        return None
+    return SUBPROCESS_SOCKETS_DIR_PATH / f"{name}{SOCKET_FILE_SUFFIX}"
+
+
+@dataclass(frozen=True)
+class SubprocessEndpoint:
+    """Where a subprocess' socket server can be reached."""
+
+    name: str
+    port: int
+    socket_path: Path | None = None
+    host: str = "localhost"
+
+    @property
+    def address(self) -> str:
+        """Human readable address, for logs and prints."""
+        if self.socket_path is not None:
+            return str(self.socket_path)
+        return f"{self.host}:{self.port}"
+
+    def is_listening(self) -> bool:
+        """Cheaply tell if the server may be up, without connecting to it.
+
+        Always True for TCP, where only a connection attempt can tell.
+        """
+        return self.socket_path is None or self.socket_path.exists()
+
+    async def open_connection(
+        self,
+    ) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        """Open a stream connection to the subprocess' socket server.
+
+        Raises:
+            OSError: If the server cannot be reached.
+
+        """
+        if self.socket_path is not None:
+            return await asyncio.open_unix_connection(
+                self.socket_path, limit=MAX_FRAME_SIZE
+            )
+        return await asyncio.open_connection(self.host, self.port, limit=MAX_FRAME_SIZE)
+
+
+def resolve_endpoint(name: str) -> SubprocessEndpoint:
+    """Return the endpoint of a known subprocess.
+
+    Raises:
+        KeyError: If the subprocess is not in `SUBPROCESSES_PORTS`.
+
+    """
+    return SubprocessEndpoint(
+        name=name,
+        port=SUBPROCESSES_PORTS[name],
+        socket_path=subprocess_socket_path(name),
+    )
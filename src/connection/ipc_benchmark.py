@@ -0,0 +1,204 @@
+"""Compare the TCP and Unix domain socket transports of `BaseHandler`.
+
+Three costs are measured for each transport, against a local `BaseHandler`:
+- connect: opening and closing a connection, without exchanging anything.
+- one_shot: connect, send a message, wait for its ACK and close, which is what
+  `send_message_to_subprocess_socket` does for every message.
+- round_trip: send a message and wait for its ACK on an already open connection.
+- pooled: a `status` command through a `SubprocessConnection`, as the server does.
+- pipelined: many `status` commands in flight at once on a `SubprocessConnection`,
+  reported as the mean cost per command.
+
+Usage:
+    python -m src.connection.ipc_benchmark --iterations 2000
+
+"""
+
+import argparse
+import asyncio
+import logging
+import statistics
+import tempfile
+import time
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+from typing import Protocol, cast
+
+from src.connection.control_protocol import ControlCommand
+from src.connection.framing import encode_frame, read_frame
+from src.connection.ipc import IpcTransport, SubprocessEndpoint, unix_sockets_supported
+from src.connection.socket_server import BaseHandler
+from src.connection.subprocess_client import SubprocessConnection
+from src.utils.helpers import construct_script_name
+
+SCRIPT_NAME = construct_script_name(__file__)
+
+BENCHMARK_PORT = 59999
+PING_MESSAGE = "ping"
+MIN_SAMPLES_FOR_QUANTILES = 2
+
+
+class Args(Protocol):
+    """Protocol for command-line arguments."""
+
+    iterations: int
+    port: int
+
+
+def _quiet_logger() -> logging.Logger:
+    # The handler logs every received message, which would dwarf the transport cost.
+    logger = logging.getLogger(f"{SCRIPT_NAME}.server")
+    logger.setLevel(logging.WARNING)
+    logger.propagate = False
+    return logger
+
+
+def _summarize(samples: list[float]) -> dict[str, float]:
+    if len(samples) < MIN_SAMPLES_FOR_QUANTILES:
+        value = samples[0] if samples else 0.0
+        return {"mean_ms": value, "p50_ms": value, "p99_ms": value}
+    quantiles = statistics.quantiles(samples, n=100, method="inclusive")
+    return {
+        "mean_ms": statistics.fmean(samples),
+        "p50_ms": quantiles[49],
+        "p99_ms": quantiles[98],
+    }
+
+
+async def _time_each(
+    iterations: int, operation: Callable[[], Awaitable[None]]
+) -> list[float]:
+    samples: list[float] = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await operation()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+async def _close(writer: asyncio.StreamWriter) -> None:
+    writer.close()
+    await writer.wait_closed()
+
+
+async def benchmark_endpoint(
+    endpoint: SubprocessEndpoint, iterations: int
+) -> dict[str, dict[str, float]]:
+    """Measure connection setup and round trip costs against a running server.
+
+    Returns:
+        Latency statistics in milliseconds for each measured operation.
+
+    """
+
+    async def connect() -> None:
+        _, writer = await endpoint.open_connection()
+        await _close(writer)
+
+    async def one_shot() -> None:
+        reader, writer = await endpoint.open_connection()
+        writer.write(encode_frame(PING_MESSAGE))
+        await writer.drain()
+        await read_frame(reader)
+        await _close(writer)
+
+    reader, writer = await endpoint.open_connection()
+
+    async def round_trip() -> None:
+        writer.write(encode_frame(PING_MESSAGE))
+        await writer.drain()
+        await read_frame(reader)
+
+    pooled_connection = SubprocessConnection(endpoint, _quiet_logger())
+
+    async def pooled() -> None:
+        await pooled_connection.request(ControlCommand.STATUS)
+
+    async def pipelined() -> float:
+        start = time.perf_counter()
+        await asyncio.gather(*(pooled() for _ in range(iterations)))
+        return (time.perf_counter() - start) * 1000 / iterations
+
+    try:
+        return {
+            "connect": _summarize(await _time_each(iterations, connect)),
+            "one_shot": _summarize(await _time_each(iterations, one_shot)),
+            "round_trip": _summarize(await _time_each(iterations, round_trip)),
+            "pooled": _summarize(await _time_each(iterations, pooled)),
+            "pipelined": {"mean_ms": await pipelined()},
+        }
+    finally:
+        await _close(writer)
+        await pooled_connection.close()
+
+
+async def run_benchmark(
+    iterations: int, port: int = BENCHMARK_PORT
+) -> dict[IpcTransport, dict[str, dict[str, float]]]:
+    """Serve a `BaseHandler` on each available transport and benchmark it.
+
+    Returns:
+        The results of `benchmark_endpoint` for each transport.
+
+    """
+    results: dict[IpcTransport, dict[str, dict[str, float]]] = {}
+    with tempfile.TemporaryDirectory() as temp_dir:
+        endpoints = [(IpcTransport.TCP, SubprocessEndpoint("benchmark", port))]
+        if unix_sockets_supported():
+            socket_path = Path(temp_dir) / "benchmark.sock"
+            endpoints.append(
+                (IpcTransport.UNIX, SubprocessEndpoint("benchmark", port, socket_path))
+            )
+
+        for transport, endpoint in endpoints:
+            handler = BaseHandler(
+                port=endpoint.port,
+                stop_message="stop",
+                logger=_quiet_logger(),
+                socket_path=endpoint.socket_path,
+            )
+            server_task = asyncio.create_task(handler.run_socket_server())
+            try:
+                await _wait_until_reachable(endpoint)
+                results[transport] = await benchmark_endpoint(endpoint, iterations)
+            finally:
+                server_task.cancel()
+                await server_task
+    return results
+
+
+async def _wait_until_reachable(
+    endpoint: SubprocessEndpoint, timeout: float = 5.0
+) -> None:
+    async with asyncio.timeout(timeout):
+        while True:
+            try:
+                _, writer = await endpoint.open_connection()
+            except OSError:
+                await asyncio.sleep(0.01)
+            else:
+                await _close(writer)
+                return
+
+
+def main() -> None:
+    """Parse arguments, run the benchmark and print the results."""
+    parser = argparse.ArgumentParser(
+        description="Compare the TCP and Unix socket transports of BaseHandler."
+    )
+    parser.add_argument("--iterations", type=int, default=1000)
+    parser.add_argument("--port", type=int, default=BENCHMARK_PORT)
+    args = cast("Args", cast("object", parser.parse_args()))
+
+    results = asyncio.run(run_benchmark(args.iterations, args.port))
+    if IpcTransport.UNIX not in results:
+        print("Unix domain sockets are not supported here, only TCP was measured.")
+    for transport, operations in results.items():
+        print(f"{transport}:")
+        for operation, stats in operations.items():
+            formatted = ", ".join(f"{k} {v:.4f}" for k, v in stats.items())
+            print(f"  {operation:>10}: {formatted}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,334 @@
+"""Local stand-in for the Streamer.bot websocket server.
+
+Speaks the same `DoAction` request/response shape as the JSON files found in
+`data/apps/*/ws_requests`, so the `WebSocketClient` and the apps' reactions can be
+exercised without the real Streamer.bot running on Windows.
+
+The server's behavior can be degraded on purpose (latency, jitter, failures and
+disconnects) and every received action is recorded with its timestamps, which makes
+it usable both for tests and for latency/throughput benchmarks of the client.
+
+Usage:
+    python -m src.connection.mock_streamerbot_server --latency 0.02 --jitter 0.01
+
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from dataclasses import dataclass, field
+from logging import Logger
+from typing import Protocol, cast, final
+from urllib.parse import urlsplit
+
+from websockets import ConnectionClosed
+from websockets.asyncio.server import Server, ServerConnection, serve
+
+from src.connection.constants import STREAMERBOT_WS_URL
+from src.utils.helpers import construct_script_name
+from src.utils.logging_utils import setup_logger
+
+SCRIPT_NAME = construct_script_name(__file__)
+
+DO_ACTION_REQUEST = "DoAction"
+ABNORMAL_CLOSURE_CODE = 1011
+"""Close code used for injected disconnects, mimics a server side crash."""
+
+
+@dataclass(frozen=True)
+class MockServerBehavior:
+    """Knobs used to degrade the mock server's behavior.
+
+    Attributes:
+        latency: Base delay in seconds applied before answering each request.
+        jitter: Maximum random delay in seconds added on top of `latency`.
+        failure_rate: Probability (0 to 1) of answering with an error status.
+        disconnect_rate: Probability (0 to 1) of dropping the connection instead of
+            answering.
+        disconnect_after: Drop each connection after this many received messages.
+        seed: Seed for the random generator, for reproducible runs.
+
+    """
+
+    latency: float = 0.0
+    jitter: float = 0.0
+    failure_rate: float = 0.0
+    disconnect_rate: float = 0.0
+    disconnect_after: int | None = None
+    seed: int | None = None
+
+
+@dataclass(frozen=True)
+class ReceivedAction:
+    """A request received by the mock server.
+
+    Attributes:
+        received_at: Wall clock time (`time.time()`) of reception.
+        received_monotonic: Monotonic time (`time.perf_counter()`) of reception.
+        request: The request type, e.g. "DoAction".
+        action_id: The Streamer.bot action id, if any.
+        action_name: The Streamer.bot action name, if any.
+        request_id: The request id echoed back in the response.
+        args: The arguments passed along with the action.
+        raw: The raw message as received.
+
+    """
+
+    received_at: float
+    received_monotonic: float
+    request: str
+    action_id: str | None
+    action_name: str | None
+    request_id: str | None
+    args: dict[str, object] = field(default_factory=dict)
+    raw: str = ""
+
+
+@final
+class MockStreamerBotServer:
+    """Websocket server answering `DoAction` requests like Streamer.bot does."""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 50001,
+        behavior: MockServerBehavior | None = None,
+        logger: Logger | None = None,
+    ) -> None:
+        """Initialize the mock server.
+
+        Args:
+            host: Interface to bind to.
+            port: Port to bind to, 0 picks a free one (see `url` once started).
+            behavior: Degradation knobs, defaults to a perfect server.
+            logger: Logger instance, defaults to this module's logger.
+
+        """
+        self.host = host
+        self.port = port
+        self.behavior = behavior if behavior is not None else MockServerBehavior()
+        self.logger = logger if logger is not None else setup_logger(SCRIPT_NAME)
+        self.received_actions: list[ReceivedAction] = []
+        self.failures_injected = 0
+        self.disconnects_injected = 0
+
+        self._random = random.Random(self.behavior.seed)  # noqa: S311
+        self._server: Server | None = None
+        self._action_received = asyncio.Condition()
+
+    @property
+    def url(self) -> str:
+        """Websocket url of the running server, usable by `WebSocketClient`."""
+        return f"ws://{self.host}:{self.port}/"
+
+    async def start(self) -> None:
+        """Start serving in the background."""
+        self._server = await serve(self._handle_connection, self.host, self.port)
+        # Resolve the actual port when an ephemeral one was requested.
+        self.port = cast("int", self._server.sockets[0].getsockname()[1])
+        self.logger.info(f"Mock Streamer.bot server listening on {self.url}")
+
+    async def stop(self) -> None:
+        """Stop the server and close all client connections."""
+        if self._server is None:
+            return
+        self._server.close()
+        await self._server.wait_closed()
+        self._server = None
+        self.logger.info("Mock Streamer.bot server stopped")
+
+    async def __aenter__(self) -> "MockStreamerBotServer":
+        """Start the server when entering an `async with` block."""
+        await self.start()
+        return self
+
+    async def __aexit__(self, *_exc_info: object) -> None:
+        """Stop the server when leaving an `async with` block."""
+        await self.stop()
+
+    def clear(self) -> None:
+        """Forget all recorded actions and injection counters."""
+        self.received_actions.clear()
+        self.failures_injected = 0
+        self.disconnects_injected = 0
+
+    def actions_named(self, action_name: str) -> list[ReceivedAction]:
+        """Return the recorded actions matching the given Streamer.bot action name."""
+        return [a for a in self.received_actions if a.action_name == action_name]
+
+    async def wait_for_actions(self, count: int, timeout: float = 5.0) -> None:
+        """Wait until at least `count` actions have been recorded.
+
+        Raises:
+            TimeoutError: If the count is not reached within `timeout` seconds.
+
+        """
+        async with asyncio.timeout(timeout), self._action_received:
+            await self._action_received.wait_for(
+                lambda: len(self.received_actions) >= count
+            )
+
+    async def serve_forever(self) -> None:
+        """Start the server and block until cancelled."""
+        await self.start()
+        try:
+            await asyncio.Future()
+        finally:
+            await self.stop()
+
+    async def _handle_connection(self, websocket: ServerConnection) -> None:
+        self.logger.info(f"Client connected: {websocket.remote_address}")
+        messages_received = 0
+        try:
+            async for raw_message in websocket:
+                message = (
+                    raw_message.decode("utf-8")
+                    if isinstance(raw_message, bytes)
+                    else raw_message
+                )
+                messages_received += 1
+                action = await self._record(message)
+
+                if self._should_disconnect(messages_received):
+                    self.disconnects_injected += 1
+                    self.logger.info("Injecting disconnect")
+                    await websocket.close(
+                        ABNORMAL_CLOSURE_CODE, "Injected disconnect"
+                    )
+                    return
+
+                await self._apply_latency()
+                await websocket.send(json.dumps(self._build_response(action)))
+        except ConnectionClosed:
+            self.logger.info("Client connection closed")
+
+    async def _record(self, message: str) -> ReceivedAction:
+        action = _parse_request(message)
+        async with self._action_received:
+            self.received_actions.append(action)
+            self._action_received.notify_all()
+        self.logger.debug(f"Received action: {action}")
+        return action
+
+    def _should_disconnect(self, messages_received: int) -> bool:
+        disconnect_after = self.behavior.disconnect_after
+        if disconnect_after is not None and messages_received >= disconnect_after:
+            return True
+        return self._random.random() < self.behavior.disconnect_rate
+
+    async def _apply_latency(self) -> None:
+        delay = self.behavior.latency + self._random.uniform(0, self.behavior.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def _build_response(self, action: ReceivedAction) -> dict[str, object]:
+        if action.request != DO_ACTION_REQUEST:
+            return {
+                "id": action.request_id,
+                "status": "error",
+                "error": f"Unsupported request: {action.request}",
+            }
+        if self._random.random() < self.behavior.failure_rate:
+            self.failures_injected += 1
+            return {
+                "id": action.request_id,
+                "status": "error",
+                "error": "Injected failure",
+            }
+        return {"id": action.request_id, "status": "ok"}
+
+
+def _parse_request(message: str) -> ReceivedAction:
+    received_at = time.time()
+    received_monotonic = time.perf_counter()
+    try:
+        payload = json.loads(message)
+    except json.JSONDecodeError:
+        payload = None
+    if not isinstance(payload, dict):
+        return ReceivedAction(
+            received_at, received_monotonic, "Invalid", None, None, None, raw=message
+        )
+
+    payload = cast("dict[str, object]", payload)
+    action = payload.get("action")
+    action = cast("dict[str, object]", action) if isinstance(action, dict) else {}
+    args = payload.get("args")
+    request_id = payload.get("id")
+    return ReceivedAction(
+        received_at=received_at,
+        received_monotonic=received_monotonic,
+        request=str(payload.get("request", "")),
+        action_id=_optional_str(action.get("id")),
+        action_name=_optional_str(action.get("name")),
+        request_id=_optional_str(request_id),
+        args=cast("dict[str, object]", args) if isinstance(args, dict) else {},
+        raw=message,
+    )
+
+
+def _optional_str(value: object) -> str | None:
+    return None if value is None else str(value)
+
+
+class Args(Protocol):
+    """Protocol for command-line arguments."""
+
+    latency: float
+    jitter: float
+    failure_rate: float
+    disconnect_rate: float
+    disconnect_after: int | None
+    seed: int | None
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    """Build the command-line parser shared by the mock server and its benchmark."""
+    parser = argparse.ArgumentParser(
+        description="Run a local stand-in for the Streamer.bot websocket server."
+    )
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Seconds")
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--disconnect-rate", type=float, default=0.0)
+    parser.add_argument("--disconnect-after", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=None)
+    return parser
+
+
+def behavior_from_args(args: Args) -> MockServerBehavior:
+    """Create a `MockServerBehavior` from parsed command-line arguments."""
+    return MockServerBehavior(
+        latency=args.latency,
+        jitter=args.jitter,
+        failure_rate=args.failure_rate,
+        disconnect_rate=args.disconnect_rate,
+        disconnect_after=args.disconnect_after,
+        seed=args.seed,
+    )
+
+
+async def main(behavior: MockServerBehavior) -> None:
+    """Serve on the address the apps expect Streamer.bot to be on."""
+    url = urlsplit(STREAMERBOT_WS_URL)
+    server = MockStreamerBotServer(
+        host=url.hostname or "127.0.0.1",
+        port=url.port or 50001,
+        behavior=behavior,
+    )
+    print(f"Mock Streamer.bot server running on {STREAMERBOT_WS_URL}")
+    try:
+        await server.serve_forever()
+    finally:
+        for action in server.received_actions:
+            print(f"{action.received_at:.3f} {action.action_name}")
+
+
+if __name__ == "__main__":
+    parsed_args = cast("Args", cast("object", build_arg_parser().parse_args()))
+    try:
+        asyncio.run(main(behavior_from_args(parsed_args)))
+    except KeyboardInterrupt:
+        print("Mock Streamer.bot server stopped.")
@@ -0,0 +1,129 @@
+"""Parameterised websocket request payloads.
+
+Request JSON files (see `data/apps/*/ws_requests`) can declare placeholders in any of
+their string values using the `${name}` syntax, e.g. to pass an overlay's text along
+with the action in its `args`:
+
+    "args": {"overlayText": "${overlay_text}"}
+
+Templates are parsed once and rendered in memory on every send, so dynamic overlays
+only cost a single websocket message instead of a file write followed by a request
+asking Streamer.bot to re-read that file.
+"""
+
+import json
+import re
+from collections.abc import Mapping
+from pathlib import Path
+from typing import cast, final
+
+import aiofiles
+
+PLACEHOLDER_PATTERN = re.compile(r"\$\{(\w+)\}")
+
+
+@final
+class PayloadTemplate:
+    """A request payload with `${name}` placeholders."""
+
+    def __init__(self, payload: object, source: str = "<memory>") -> None:
+        """Initialize the template from an already parsed JSON payload.
+
+        Args:
+            payload: The parsed JSON payload.
+            source: Where the payload comes from, used in error messages.
+
+        """
+        self.payload = payload
+        self.source = source
+        self.placeholders = frozenset(_collect_placeholders(payload))
+
+    @classmethod
+    def from_json(cls, content: str, source: str = "<memory>") -> "PayloadTemplate":
+        """Create a template from a JSON string."""
+        return cls(json.loads(content), source)
+
+    @classmethod
+    async def from_file(cls, file_path: str | Path) -> "PayloadTemplate":
+        """Create a template from a JSON request file."""
+        async with aiofiles.open(file_path) as file:
+            content = await file.read()
+        return cls.from_json(content, str(file_path))
+
+    def render(self, values: Mapping[str, object] | None = None) -> str:
+        """Render the template into a JSON string ready to be sent.
+
+        A string value made of a single placeholder is replaced by the raw value (so
+        numbers and booleans keep their JSON type), otherwise placeholders are
+        substituted with the string representation of their values.
+
+        Raises:
+            KeyError: If a declared placeholder has no value.
+
+        """
+        values = values or {}
+        missing = self.placeholders - values.keys()
+        if missing:
+            e = f"Missing values for placeholders {sorted(missing)} in {self.source}"
+            raise KeyError(e)
+        if not self.placeholders:
+            return json.dumps(self.payload)
+        return json.dumps(_render_node(self.payload, values))
+
+
+def _collect_placeholders(node: object) -> set[str]:
+    if isinstance(node, str):
+        return set(PLACEHOLDER_PATTERN.findall(node))
+    children: list[object] = []
+    if isinstance(node, dict):
+        children = list(cast("dict[str, object]", node).values())
+    elif isinstance(node, list):
+        children = cast("list[object]", node)
+    found: set[str] = set()
+    for child in children:
+        found |= _collect_placeholders(child)
+    return found
+
+
+def _render_node(node: object, values: Mapping[str, object]) -> object:
+    if isinstance(node, str):
+        whole = PLACEHOLDER_PATTERN.fullmatch(node)
+        if whole:
+            return values[whole.group(1)]
+        return PLACEHOLDER_PATTERN.sub(lambda m: str(values[m.group(1)]), node)
+    if isinstance(node, dict):
+        return {
+            key: _render_node(child, values)
+            for key, child in cast("dict[str, object]", node).items()
+        }
+    if isinstance(node, list):
+        return [_render_node(child, values) for child in cast("list[object]", node)]
+    return node
+
+
+@final
+class ChangedTextFileSink:
+    """Optional file sink that only touches the disk when the text changes.
+
+    Meant for overlays that still need to be read from a file (e.g. an OBS text
+    source), while the websocket request carries the text itself.
+    """
+
+    def __init__(self, file_path: str | Path) -> None:
+        """Initialize the sink for the given file path."""
+        self.file_path = Path(file_path)
+        self._last_written: str | None = None
+
+    async def write(self, text: str) -> bool:
+        """Write the text if it differs from the last written one.
+
+        Returns:
+            True if the file was written, False if the text was unchanged.
+
+        """
+        if text == self._last_written:
+            return False
+        async with aiofiles.open(self.file_path, "w") as file:
+            await file.write(text)
+        self._last_written = text
+        return True
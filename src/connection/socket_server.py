@@ -4,33 +4,147 @@ This module provides the BaseHandler class which implements common socket server
 functionality. Mainly, it is used to allow subprocesses to stop conducting their main
 logic unpon receiving a "stop message", which sets an asyncio event.
 
+Any number of clients can be connected at the same time: each connection gets its own
+`ClientConnection` context and is served by its own task, so a short-lived control
+command is never blocked by a long-lived client. Messages are newline framed (see
+`framing`), and every received message is answered with exactly one frame.
+
+JSON messages are treated as structured commands (see `control_protocol`): `status`,
+`metrics`, `set-config` and `stop` are built in, and apps can plug their own state,
+metrics, tunable settings and commands in through the `add_*_provider()`,
+`register_config_option()` and `register_command()` methods. The `metrics` reply also
+holds the process's metrics registry (see `metrics`), or only that registry in the
+Prometheus text format when asked with a `{"format": "prometheus"}` param. With the
+`METRICS_HTTP_EXPORTER` setting on, the registry is served over HTTP too. A reply
+must fit in a single frame, so large results are kept within `MAX_RESULT_BYTES`, the
+Prometheus text is cut and marked `truncated` past it.
+
+The `profile` command runs a profiling session of the app for a few seconds and
+answers with its summary once it is written to `temp/profiles/` (see `profiling`).
+
+Apps declare the startup stages they go through (see `ReadinessStage`) and report each
+of them with `mark_ready()`, the `wait-ready` command answers once they all are done.
+
+The server listens on TCP `localhost` by default, or on a Unix domain socket when
+given a `socket_path` (see `ipc`).
+
 Subclasses should override on_message() to implement custom message handling logic
 beyond logging and ack send.
 """
 
 import asyncio
+import itertools
+import os
+import time
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import dataclass, field
 from logging import Logger
-from typing import TYPE_CHECKING
-
+from pathlib import Path
+from typing import cast
+
+from src.config.settings import METRICS_HTTP_EXPORTER
+from src.connection.constants import METRICS_HTTP_PORT_OFFSET
+from src.connection.control_protocol import (
+    ControlCommand,
+    ControlProtocolError,
+    ControlRequest,
+    ControlResponse,
+    ReadinessStage,
+    is_control_message,
+)
+from src.connection.framing import (
+    MAX_FRAME_SIZE,
+    FramingError,
+    encode_frame,
+    read_frame,
+)
 from src.utils.helpers import construct_script_name
 from src.utils.logging_utils import setup_logger
-
-if TYPE_CHECKING:
-    from asyncio.streams import StreamReader, StreamWriter
+from src.utils.metrics import MetricsExporter, registry
+from src.utils.profiling import DEFAULT_PROFILE_SECONDS, profiler
 
 SCRIPT_NAME = construct_script_name(__file__)
 
 MIN_SUGGESTED_PORT = 59000
 MAX_SUGGESTED_PORT = 59999
+ACK_MESSAGE = "ACK from Socket server"
+DEFAULT_WAIT_READY_TIMEOUT = 30.0
+MAX_RESULT_BYTES = MAX_FRAME_SIZE // 2
+"""Size budget of large command results, leaving room for their JSON escaping."""
+
+StateProvider = Callable[[], dict[str, object]]
+"""Callable returning a JSON serializable snapshot of some live state."""
+CommandHandler = Callable[[dict[str, object]], Awaitable[dict[str, object]]]
+"""Coroutine function receiving a command's params and returning its result."""
+
+
+@dataclass(frozen=True)
+class ConfigOption:
+    """A live tunable setting exposed through the `set-config` command."""
+
+    getter: Callable[[], object]
+    setter: Callable[..., None]
+    value_type: type = float
+
+    def coerce(self, name: str, value: object) -> object:
+        """Convert a received value to the option's type.
+
+        Raises:
+            ValueError: If the value cannot be converted.
+
+        """
+        if self.value_type is bool:
+            if not isinstance(value, bool):
+                e = f"Config option {name} expects a boolean, got {value!r}"
+                raise ValueError(e)
+            return value
+        try:
+            return self.value_type(value)
+        except (TypeError, ValueError) as err:
+            type_name = self.value_type.__name__
+            e = f"Config option {name} expects {type_name}, got {value!r}"
+            raise ValueError(e) from err
+
+
+@dataclass
+class ClientConnection:
+    """Per-connection context of a socket client."""
+
+    connection_id: int
+    reader: asyncio.StreamReader
+    writer: asyncio.StreamWriter
+    peer: str
+    connected_at: float = field(default_factory=time.time)
+    messages_received: int = 0
+    write_lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+    async def send(self, message: str) -> None:
+        """Send a framed message to this client."""
+        async with self.write_lock:
+            self.writer.write(encode_frame(message))
+            await self.writer.drain()
+
+    async def close(self) -> None:
+        """Close the connection with this client."""
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except (ConnectionError, OSError):
+            pass
 
 
 class BaseHandler:
     """Base class for handling socket server messages."""
 
     port: int
+    socket_path: Path | None
     stop_message: str
     logger: Logger
     stop_event: asyncio.Event
+    connections: dict[int, ClientConnection]
+    status_providers: list[StateProvider]
+    metrics_providers: list[StateProvider]
+    config_options: dict[str, ConfigOption]
 
     @property
     def handler_name(self) -> str:
@@ -38,39 +152,72 @@ class BaseHandler:
         return self.__class__.__name__
 
     def __init__(
-        self, port: int, stop_message: str, logger: Logger | None = None
+        self,
+        port: int,
+        stop_message: str,
+        logger: Logger | None = None,
+        socket_path: Path | None = None,
+        readiness_stages: Iterable[str] = (ReadinessStage.SOCKET_SERVER,),
     ) -> None:
-        """Initialize the BaseHandler."""
+        """Initialize the BaseHandler.
+
+        Args:
+            port: TCP port to listen on, unused when `socket_path` is given.
+            stop_message: Plain message that sets the `stop_event`.
+            logger: Logger instance, defaults to this module's logger.
+            socket_path: Unix domain socket path to listen on instead of TCP.
+            readiness_stages: Stages to go through before the app is ready.
+
+        """
         self.port = port
+        self.socket_path = socket_path
         self.stop_message = stop_message
         self.logger = logger if logger is not None else _assign_default_logger()
         self.stop_event = asyncio.Event()
-
-        self._reader: StreamReader | None = None
-        self._writer: StreamWriter | None = None
-
-        if not MIN_SUGGESTED_PORT <= port <= MAX_SUGGESTED_PORT:
+        self.connections = {}
+        self.started_at = time.time()
+        self.status_providers = []
+        self.metrics_providers = []
+        self.config_options = {}
+        self.readiness_stages: dict[str, float | None] = dict.fromkeys(readiness_stages)
+        self.ready_event = asyncio.Event()
+
+        self._connection_ids = itertools.count(1)
+        self._command_tasks: set[asyncio.Task[None]] = set()
+        self._commands: dict[str, CommandHandler] = {
+            ControlCommand.STATUS: self._status_command,
+            ControlCommand.METRICS: self._metrics_command,
+            ControlCommand.SET_CONFIG: self._set_config_command,
+            ControlCommand.STOP: self._stop_command,
+            ControlCommand.WAIT_READY: self._wait_ready_command,
+            ControlCommand.PROFILE: self._profile_command,
+        }
+
+        if socket_path is None and not MIN_SUGGESTED_PORT <= port <= MAX_SUGGESTED_PORT:
             self.logger.warning(f"""port {port} is outside the suggested port range of
                                 {MIN_SUGGESTED_PORT} to {MAX_SUGGESTED_PORT}""")
 
-    async def _handle_client(self) -> None:
-        if self._reader is None or self._writer is None:
-            self.logger.error(
-                f"Reader or writer is None: reader {self._reader}, writer {self._writer}"  # noqa: E501
-            )
-            return
-
+    async def _handle_client(self, connection: ClientConnection) -> None:
         while True:
-            data = await self._reader.read(1024)
-            if not data:
-                self.logger.info("Socket client disconnected")
+            try:
+                message = await read_frame(connection.reader)
+            except FramingError:
+                self.logger.exception(
+                    f"Invalid frame from client {connection.connection_id}"
+                )
+                break
+            except ConnectionError:
+                self.logger.info(f"Socket client {connection.connection_id} reset")
                 break
-            message = data.decode()
-            await self.handle_message(message)
-        self._writer.close()
-        await self._writer.wait_closed()
+            if message is None:
+                self.logger.info(
+                    f"Socket client {connection.connection_id} disconnected"
+                )
+                break
+            connection.messages_received += 1
+            await self.handle_message(message, connection)
 
-    async def handle_message(self, message: str) -> None:
+    async def handle_message(self, message: str, connection: ClientConnection) -> None:
         """Process incoming message using template method pattern.
 
         Logs the message, sends acknowledgment, then delegates to hook for
@@ -78,76 +225,324 @@ class BaseHandler:
 
         Args:
             message: The received message string.
+            connection: The context of the client that sent the message.
 
         """
-        self.logger.info(f"Socket received: {message}")
-        await self._send_ack()
+        self.logger.info(
+            f"Socket received from client {connection.connection_id}: {message}"
+        )
+        if is_control_message(message):
+            # Run commands in their own task so a slow one does not hold up the
+            # following ones, replies are matched to requests through their ids.
+            task = asyncio.create_task(
+                self._handle_control_message(message, connection)
+            )
+            self._command_tasks.add(task)
+            task.add_done_callback(self._command_tasks.discard)
+            return
+
+        await self._send_ack(connection)
 
         if message == self.stop_message:
             self.stop_event.set()
             self.logger.info("Socket received stop message")
         else:
-            await self.on_message(message)
+            await self.on_message(message, connection)
 
-    async def on_message(self, _message: str) -> None:
+    async def on_message(self, _message: str, _connection: ClientConnection) -> None:
         """Conduct subclass-specific message processing.
 
         Override this method in subclasses to implement custom message handling logic.
 
         Args:
             _message: The received message string to process.
+            _connection: The context of the client that sent the message.
 
         """
 
-    async def _send_ack(self) -> None:
-        if self._writer is None:
-            self.logger.error("Writer is None")
+    def register_command(self, name: str, handler: CommandHandler) -> None:
+        """Register an additional JSON command, or override a built-in one."""
+        self._commands[name] = handler
+
+    def register_config_option(
+        self,
+        name: str,
+        getter: Callable[[], object],
+        setter: Callable[..., None],
+        value_type: type = float,
+    ) -> None:
+        """Expose a setting that can be read by `status` and changed by `set-config`."""
+        self.config_options[name] = ConfigOption(getter, setter, value_type)
+
+    def add_status_provider(self, provider: StateProvider) -> None:
+        """Add a callable whose result is merged into the `status` command reply."""
+        self.status_providers.append(provider)
+
+    def add_metrics_provider(self, provider: StateProvider) -> None:
+        """Add a callable whose result is merged into the `metrics` command reply."""
+        self.metrics_providers.append(provider)
+
+    @property
+    def pending_stages(self) -> list[str]:
+        """Readiness stages not reached yet."""
+        return [stage for stage, at in self.readiness_stages.items() if at is None]
+
+    def mark_ready(self, stage: str) -> None:
+        """Record that a readiness stage was reached, the first time only."""
+        if self.readiness_stages.get(stage) is not None:
             return
-        self._writer.write(b"ACK from Socket server")
-        await self._writer.drain()
+        elapsed = round(time.time() - self.started_at, 3)
+        self.readiness_stages[stage] = elapsed
+        self.logger.info(f"Readiness stage {stage} reached after {elapsed}s")
+        if not self.pending_stages:
+            self.ready_event.set()
+
+    def get_readiness(self) -> dict[str, object]:
+        """Return the readiness state, with each reached stage's time since start."""
+        return {"ready": self.ready_event.is_set(), "stages": self.readiness_stages}
+
+    def get_status(self) -> dict[str, object]:
+        """Return the handler's base status merged with the app provided one."""
+        status: dict[str, object] = {
+            "handler": self.handler_name,
+            "pid": os.getpid(),
+            "port": self.port,
+            "socket_path": None if self.socket_path is None else str(self.socket_path),
+            "uptime_seconds": round(time.time() - self.started_at, 3),
+            "connections": len(self.connections),
+            "stopping": self.stop_event.is_set(),
+            "config": {name: opt.getter() for name, opt in self.config_options.items()},
+            "readiness": self.get_readiness(),
+        }
+        for provider in self.status_providers:
+            status.update(provider())
+        return status
+
+    def get_metrics(self) -> dict[str, object]:
+        """Return the metrics collected from all metrics providers and the registry."""
+        metrics: dict[str, object] = {}
+        for provider in self.metrics_providers:
+            metrics.update(provider())
+        metrics["registry"] = registry.snapshot()
+        return metrics
+
+    async def _handle_control_message(
+        self, message: str, connection: ClientConnection
+    ) -> None:
+        try:
+            request = ControlRequest.from_json(message)
+        except ControlProtocolError as e:
+            response = ControlResponse.failure(None, str(e))
+        else:
+            response = await self._execute_command(request)
+
+        try:
+            await self._send_response(response, connection)
+        except ConnectionError:
+            self.logger.warning(
+                f"Could not reply to {response.request_id}, "
+                f"client {connection.connection_id} is gone"
+            )
+
+    async def _send_response(
+        self, response: ControlResponse, connection: ClientConnection
+    ) -> None:
+        try:
+            await connection.send(response.to_json())
+        except FramingError as e:
+            # Commands with large results should keep them within MAX_RESULT_BYTES
+            self.logger.warning(f"Reply to {response.request_id} not sent: {e}")
+            await connection.send(
+                ControlResponse.failure(
+                    response.request_id, f"Reply too large to be sent: {e}"
+                ).to_json()
+            )
+
+    async def _execute_command(self, request: ControlRequest) -> ControlResponse:
+        handler = self._commands.get(request.command)
+        if handler is None:
+            return ControlResponse.failure(
+                request.request_id,
+                f"Unknown command: {request.command} "
+                f"(known: {', '.join(sorted(self._commands))})",
+            )
+        try:
+            result = await handler(request.params)
+        except (KeyError, TypeError, ValueError) as e:
+            return ControlResponse.failure(request.request_id, str(e))
+        except Exception as e:
+            self.logger.exception(f"Command {request.command} failed")
+            return ControlResponse.failure(
+                request.request_id, f"Internal error: {type(e).__name__}: {e}"
+            )
+        return ControlResponse.success(request.request_id, result)
+
+    async def _status_command(self, _params: dict[str, object]) -> dict[str, object]:
+        return self.get_status()
+
+    async def _metrics_command(self, params: dict[str, object]) -> dict[str, object]:
+        metrics_format = params.get("format", "json")
+        if metrics_format == "prometheus":
+            text = registry.render_prometheus()
+            data = text.encode("utf-8")
+            if len(data) <= MAX_RESULT_BYTES:
+                return {"prometheus": text}
+            # Cut at a line, the whole text is served by the HTTP exporter
+            kept = data[:MAX_RESULT_BYTES].rsplit(b"\n", 1)[0] + b"\n"
+            return {"prometheus": kept.decode("utf-8"), "truncated": True}
+        if metrics_format != "json":
+            e = f'Unknown metrics format {metrics_format!r}, use "json" or "prometheus"'
+            raise ValueError(e)
+        return self.get_metrics()
+
+    async def _set_config_command(self, params: dict[str, object]) -> dict[str, object]:
+        unknown = params.keys() - self.config_options.keys()
+        if unknown:
+            e = (
+                f"Unknown config options {sorted(unknown)} "
+                f"(known: {sorted(self.config_options)})"
+            )
+            raise ValueError(e)
+        # Validate everything before applying anything, so a bad value does not
+        # leave the config half updated.
+        coerced = {
+            name: self.config_options[name].coerce(name, value)
+            for name, value in params.items()
+        }
+        for name, value in coerced.items():
+            self.config_options[name].setter(value)
+            self.logger.info(f"Config option {name} set to {value!r}")
+        return {"config": {n: o.getter() for n, o in self.config_options.items()}}
+
+    async def _stop_command(self, _params: dict[str, object]) -> dict[str, object]:
+        self.stop_event.set()
+        self.logger.info("Socket received stop command")
+        return {"stopping": True}
+
+    async def _wait_ready_command(self, params: dict[str, object]) -> dict[str, object]:
+        timeout = float(
+            cast("float", params.get("timeout", DEFAULT_WAIT_READY_TIMEOUT))
+        )
+        try:
+            await asyncio.wait_for(self.ready_event.wait(), timeout)
+        except TimeoutError:
+            self.logger.warning(
+                f"Not ready after {timeout}s, pending stages: {self.pending_stages}"
+            )
+        return self.get_readiness()
+
+    async def _profile_command(self, params: dict[str, object]) -> dict[str, object]:
+        seconds = float(cast("float", params.get("seconds", DEFAULT_PROFILE_SECONDS)))
+        mode = str(params.get("mode", "sampling"))
+        return await profiler.profile(self.logger.name, self.logger, seconds, mode)
+
+    async def _send_ack(self, connection: ClientConnection) -> None:
+        try:
+            await connection.send(ACK_MESSAGE)
+        except ConnectionError:
+            self.logger.warning(
+                f"Could not send ACK, client {connection.connection_id} is gone"
+            )
 
     async def handle_socket_client(
         self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
     ) -> None:
         """Handle new socket client connection.
 
-        Callback method for asyncio.start_server that stores reader/writer
-        and initiates client handling.
+        Callback method for asyncio.start_server, called in its own task for every
+        client. Creates the connection's context and serves it until it disconnects.
 
         Args:
             reader: StreamReader for reading from the client.
             writer: StreamWriter for writing to the client.
 
         """
-        self._reader = reader
-        self._writer = writer
-        await self._handle_client()
+        connection = ClientConnection(
+            connection_id=next(self._connection_ids),
+            reader=reader,
+            writer=writer,
+            peer=str(writer.get_extra_info("peername")),
+        )
+        self.connections[connection.connection_id] = connection
+        self.logger.info(
+            f"Socket client {connection.connection_id} connected from "
+            f"{connection.peer} ({len(self.connections)} connected)"
+        )
+        try:
+            await self._handle_client(connection)
+        finally:
+            del self.connections[connection.connection_id]
+            await connection.close()
+
+    @property
+    def address(self) -> str:
+        """Human readable address the server listens on."""
+        if self.socket_path is not None:
+            return str(self.socket_path)
+        return f"port {self.port}"
+
+    async def _start_server(self) -> asyncio.Server:
+        if self.socket_path is None:
+            return await asyncio.start_server(
+                self.handle_socket_client, "localhost", self.port, limit=MAX_FRAME_SIZE
+            )
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+        # A socket file left behind by a crashed run would make the bind fail.
+        self.socket_path.unlink(missing_ok=True)
+        return await asyncio.start_unix_server(
+            self.handle_socket_client, self.socket_path, limit=MAX_FRAME_SIZE
+        )
 
     async def run_socket_server(self) -> None:
-        """Run the socket server."""
+        """Run the socket server, until the `stop_event` is set or it is cancelled.
+
+        The client connections are closed before waiting for the server to close,
+        which would otherwise wait for clients that keep their connection open, like
+        the main server's pooled ones.
+        """
         self.logger.debug(
-            f"Starting Socket server {self.handler_name} on port {self.port}"
-        )
-        server = await asyncio.start_server(
-            self.handle_socket_client, "localhost", self.port
+            f"Starting Socket server {self.handler_name} on {self.address}"
         )
+        server = await self._start_server()
         addr = server.sockets[0].getsockname()  # pyright: ignore[reportAny]
         self.logger.info(f"Socket server {self.handler_name} serving on {addr}")
+        exporter = None
+        if METRICS_HTTP_EXPORTER:
+            exporter = MetricsExporter(
+                self.port + METRICS_HTTP_PORT_OFFSET, self.logger
+            )
+            try:
+                await exporter.start()
+            except OSError:
+                self.logger.exception("Could not start the metrics exporter")
+                exporter = None
+        self.mark_ready(ReadinessStage.SOCKET_SERVER)
 
         try:
-            await server.serve_forever()
+            # The server serves from its start, this only waits for it to be stopped
+            await self.stop_event.wait()
+            self.logger.info(
+                f"Socket server {self.handler_name} on {self.address} stopping on "
+                "the stop event"
+            )
         except KeyboardInterrupt:
             self.logger.info(
-                f"Socket server {self.handler_name} on port {self.port} stopping due "
+                f"Socket server {self.handler_name} on {self.address} stopping due "
                 "to keyboard interrupt"
             )
         except asyncio.CancelledError:
             self.logger.info(
-                f"Socket server {self.handler_name} on port {self.port} was cancelled"
+                f"Socket server {self.handler_name} on {self.address} was cancelled"
             )
         finally:
+            if exporter is not None:
+                await exporter.close()
             server.close()
+            for connection in list(self.connections.values()):
+                await connection.close()
             await server.wait_closed()
+            if self.socket_path is not None:
+                self.socket_path.unlink(missing_ok=True)
             self.logger.info("Socket server closed")
 
 
@@ -0,0 +1,302 @@
+"""Pooled, long-lived connections to the subprocesses' control sockets.
+
+Opening a connection for every command costs a connect and a teardown each time. The
+`SubprocessClientPool` instead keeps one framed connection per subprocess, opened
+lazily on the first request and transparently re-opened after the subprocess went
+away (e.g. restarted).
+
+Requests are JSON control commands (see `control_protocol`) carrying an id, so several
+of them can be in flight on the same connection: a background reader task matches
+every response to its waiting request, whatever order they come back in.
+"""
+
+import asyncio
+import itertools
+from logging import Logger
+from typing import final
+
+from src.connection.control_protocol import (
+    ControlCommand,
+    ControlProtocolError,
+    ControlRequest,
+    ControlResponse,
+)
+from src.connection.framing import FramingError, encode_frame, read_frame
+from src.connection.ipc import SubprocessEndpoint, resolve_endpoint
+from src.utils.helpers import construct_script_name
+from src.utils.logging_utils import setup_logger
+
+SCRIPT_NAME = construct_script_name(__file__)
+
+DEFAULT_REQUEST_TIMEOUT = 5.0
+MAX_IN_FLIGHT_REQUESTS = 32
+"""Requests to a same subprocess beyond this many wait for a free slot."""
+NOT_RESENT_COMMANDS = frozenset(
+    {ControlCommand.STOP, ControlCommand.SET_CONFIG, ControlCommand.PROFILE}
+)
+"""Commands not sent again once written, as the subprocess may have run them."""
+
+
+class ResponseLostError(ConnectionResetError):
+    """The request was sent, but its connection was lost before the response came."""
+
+
+@final
+class SubprocessConnection:
+    """A lazily (re)connected, pipelined connection to one subprocess."""
+
+    def __init__(
+        self,
+        endpoint: SubprocessEndpoint,
+        logger: Logger,
+        max_in_flight: int = MAX_IN_FLIGHT_REQUESTS,
+    ) -> None:
+        """Initialize the connection, without connecting yet.
+
+        Args:
+            endpoint: Where the subprocess' socket server can be reached.
+            logger: Logger instance.
+            max_in_flight: Maximum number of requests awaiting their response.
+
+        """
+        self.endpoint = endpoint
+        self.logger = logger
+        self.requests_sent = 0
+        self.reconnections = 0
+
+        self._writer: asyncio.StreamWriter | None = None
+        self._reader_task: asyncio.Task[None] | None = None
+        # Requests awaiting their response, with the connection they were sent on
+        self._pending: dict[
+            str, tuple[asyncio.StreamWriter, asyncio.Future[ControlResponse]]
+        ] = {}
+        self._request_ids = itertools.count(1)
+        self._connect_lock = asyncio.Lock()
+        self._write_lock = asyncio.Lock()
+        self._slots = asyncio.Semaphore(max_in_flight)
+
+    @property
+    def connected(self) -> bool:
+        """Tell if the connection is currently open."""
+        return self._writer is not None and not self._writer.is_closing()
+
+    @property
+    def in_flight(self) -> int:
+        """Number of requests awaiting their response."""
+        return len(self._pending)
+
+    async def request(
+        self,
+        command: str,
+        params: dict[str, object] | None = None,
+        timeout: float = DEFAULT_REQUEST_TIMEOUT,
+    ) -> ControlResponse:
+        """Send a command and wait for its response.
+
+        A request failing on a connection that was reused is retried once on a fresh
+        one, as the subprocess may have been restarted since the last request. The
+        commands of `NOT_RESENT_COMMANDS` are only retried if they were not written.
+
+        Raises:
+            ResponseLostError: If the request was sent but its response was lost.
+            OSError: If the subprocess cannot be reached (including ConnectionError).
+            TimeoutError: If no response came back within `timeout` seconds.
+
+        """
+        async with self._slots, asyncio.timeout(timeout):
+            reused = self.connected
+            try:
+                return await self._request_once(command, params or {})
+            except ConnectionError as e:
+                if not reused or (
+                    isinstance(e, ResponseLostError) and command in NOT_RESENT_COMMANDS
+                ):
+                    raise
+                self.logger.info(f"Retrying {command} on a fresh connection")
+                return await self._request_once(command, params or {})
+
+    async def _request_once(
+        self, command: str, params: dict[str, object]
+    ) -> ControlResponse:
+        writer = await self._ensure_connected()
+        request = ControlRequest(command, params, str(next(self._request_ids)))
+        request_id = str(request.request_id)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = (writer, future)
+        try:
+            try:
+                async with self._write_lock:
+                    writer.write(encode_frame(request.to_json()))
+                    await writer.drain()
+            except ConnectionError:
+                # The reader task tears the connection down, unless it was replaced
+                if self._writer is writer:
+                    self._close_writer()
+                raise
+            self.requests_sent += 1
+            try:
+                return await future
+            except ConnectionError as e:
+                raise ResponseLostError(str(e)) from e
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def _ensure_connected(self) -> asyncio.StreamWriter:
+        async with self._connect_lock:
+            if self._writer is not None and not self._writer.is_closing():
+                return self._writer
+            if not self.endpoint.is_listening():
+                e = f"{self.endpoint.name} is not listening on {self.endpoint.address}"
+                raise ConnectionRefusedError(e)
+            reader, writer = await self.endpoint.open_connection()
+            if self._reader_task is not None:
+                self.reconnections += 1
+            self._writer = writer
+            self._reader_task = asyncio.create_task(
+                self._read_responses(reader, writer)
+            )
+            self.logger.info(
+                f"Connected to {self.endpoint.name} on {self.endpoint.address}"
+            )
+            return writer
+
+    async def _read_responses(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        reason = "connection closed by the subprocess"
+        try:
+            while (message := await read_frame(reader)) is not None:
+                self._resolve(message)
+        except (OSError, FramingError) as e:
+            reason = f"connection lost: {e}"
+        finally:
+            # Only the requests sent on this connection fail, a new one may be open
+            self._fail_pending(reason, writer)
+            writer.close()
+            if self._writer is writer:
+                self._writer = None
+
+    def _resolve(self, message: str) -> None:
+        try:
+            response = ControlResponse.from_json(message)
+        except ControlProtocolError:
+            self.logger.warning(
+                f"Ignoring non JSON reply from {self.endpoint.name}: {message}"
+            )
+            return
+        pending = self._pending.get(str(response.request_id))
+        if pending is None:
+            # Its request most likely timed out already.
+            self.logger.warning(f"Dropping unexpected response: {message}")
+        elif not pending[1].done():
+            pending[1].set_result(response)
+
+    def _fail_pending(
+        self, reason: str, writer: asyncio.StreamWriter | None = None
+    ) -> None:
+        """Fail the requests sent on a connection, on any connection if None."""
+        for sent_on, future in self._pending.values():
+            if (writer is None or sent_on is writer) and not future.done():
+                future.set_exception(
+                    ConnectionResetError(f"{self.endpoint.name}: {reason}")
+                )
+
+    def _close_writer(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    async def close(self) -> None:
+        """Close the connection, requests still in flight fail with ConnectionError."""
+        self._close_writer()
+        task, self._reader_task = self._reader_task, None
+        if task is not None and task is not asyncio.current_task():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._fail_pending("connection closed by the client")
+
+
+@final
+class SubprocessClientPool:
+    """Keeps one `SubprocessConnection` per subprocess, created on first use."""
+
+    def __init__(
+        self,
+        logger: Logger | None = None,
+        timeout: float = DEFAULT_REQUEST_TIMEOUT,
+    ) -> None:
+        """Initialize an empty pool.
+
+        Args:
+            logger: Logger instance, defaults to this module's logger.
+            timeout: Default time in seconds to wait for a response.
+
+        """
+        self.logger = logger if logger is not None else setup_logger(SCRIPT_NAME)
+        self.timeout = timeout
+        self._connections: dict[str, SubprocessConnection] = {}
+
+    def connection(self, target: str) -> SubprocessConnection:
+        """Return the connection of a subprocess, creating it if needed.
+
+        Raises:
+            KeyError: If the target is not a known subprocess.
+
+        """
+        connection = self._connections.get(target)
+        if connection is None:
+            connection = SubprocessConnection(resolve_endpoint(target), self.logger)
+            self._connections[target] = connection
+        return connection
+
+    async def request(
+        self,
+        target: str,
+        command: str,
+        params: dict[str, object] | None = None,
+        timeout: float | None = None,
+    ) -> ControlResponse:
+        """Send a command to a subprocess and wait for its response.
+
+        Once a subprocess acknowledged a `stop` command, its connection is closed
+        and dropped from the pool, so that it does not hold up the shutdown.
+
+        Raises:
+            KeyError: If the target is not a known subprocess.
+            OSError: If the subprocess cannot be reached (including ConnectionError).
+            TimeoutError: If no response came back in time.
+
+        """
+        response = await self.connection(target).request(
+            command, params, self.timeout if timeout is None else timeout
+        )
+        if command == ControlCommand.STOP and response.ok:
+            await self.drop(target)
+        return response
+
+    async def drop(self, target: str) -> None:
+        """Close the connection of a subprocess and remove it from the pool."""
+        connection = self._connections.pop(target, None)
+        if connection is not None:
+            await connection.close()
+
+    def stats(self) -> dict[str, dict[str, object]]:
+        """Return per-target connection statistics."""
+        return {
+            target: {
+                "connected": connection.connected,
+                "in_flight": connection.in_flight,
+                "requests_sent": connection.requests_sent,
+                "reconnections": connection.reconnections,
+            }
+            for target, connection in self._connections.items()
+        }
+
+    async def close(self) -> None:
+        """Close every connection of the pool."""
+        for connection in self._connections.values():
+            await connection.close()
+        self._connections.clear()
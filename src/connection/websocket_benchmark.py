@@ -0,0 +1,102 @@
+"""Latency and throughput benchmark of `WebSocketClient` against the mock server.
+
+Runs entirely locally (no Streamer.bot needed), so it can run on Linux CI.
+
+Usage:
+    python -m src.connection.websocket_benchmark --requests 500 --latency 0.005
+
+"""
+
+import asyncio
+import statistics
+import time
+from typing import Protocol, cast
+
+from src.config.settings import PROJECT_ROOT_PATH
+from src.connection.mock_streamerbot_server import (
+    MockServerBehavior,
+    MockStreamerBotServer,
+    behavior_from_args,
+    build_arg_parser,
+)
+from src.connection.websocket_client import WebSocketClient
+
+WS_REQUESTS_GLOB = "data/apps/*/ws_requests/*.json"
+MIN_SAMPLES_FOR_QUANTILES = 2
+
+
+class Args(Protocol):
+    """Protocol for command-line arguments."""
+
+    requests: int
+    latency: float
+    jitter: float
+    failure_rate: float
+    disconnect_rate: float
+    disconnect_after: int | None
+    seed: int | None
+
+
+def _percentile(samples: list[float], percent: int) -> float:
+    if len(samples) < MIN_SAMPLES_FOR_QUANTILES:
+        return samples[0] if samples else 0.0
+    return statistics.quantiles(samples, n=100, method="inclusive")[percent - 1]
+
+
+async def run_benchmark(
+    request_count: int, behavior: MockServerBehavior
+) -> dict[str, float]:
+    """Send `request_count` requests through `WebSocketClient` and time them.
+
+    Returns:
+        A dictionary of latency statistics (in milliseconds) and throughput.
+
+    """
+    request_files = sorted(str(p) for p in PROJECT_ROOT_PATH.glob(WS_REQUESTS_GLOB))
+    if not request_files:
+        e = f"No request files found with {WS_REQUESTS_GLOB}"
+        raise FileNotFoundError(e)
+
+    async with MockStreamerBotServer(port=0, behavior=behavior) as server:
+        client = WebSocketClient(server.url)
+        await client.establish_connection()
+
+        latencies: list[float] = []
+        start = time.perf_counter()
+        for i in range(request_count):
+            sent_at = time.perf_counter()
+            await client.send_json_requests(request_files[i % len(request_files)])
+            latencies.append((time.perf_counter() - sent_at) * 1000)
+        elapsed = time.perf_counter() - start
+
+        await client.close()
+
+        return {
+            "requests": request_count,
+            "received": len(server.received_actions),
+            "failures_injected": server.failures_injected,
+            "disconnects_injected": server.disconnects_injected,
+            "mean_ms": statistics.fmean(latencies) if latencies else 0.0,
+            "p50_ms": _percentile(latencies, 50),
+            "p95_ms": _percentile(latencies, 95),
+            "p99_ms": _percentile(latencies, 99),
+            "max_ms": max(latencies, default=0.0),
+            "throughput_rps": request_count / elapsed if elapsed else 0.0,
+        }
+
+
+def main() -> None:
+    """Parse arguments, run the benchmark and print the results."""
+    parser = build_arg_parser()
+    parser.description = "Benchmark WebSocketClient against the mock server."
+    parser.add_argument("--requests", type=int, default=200)
+    args = cast("Args", cast("object", parser.parse_args()))
+
+    results = asyncio.run(run_benchmark(args.requests, behavior_from_args(args)))
+    for key, value in results.items():
+        formatted = f"{value:.3f}" if isinstance(value, float) else str(value)
+        print(f"{key:>22}: {formatted}")
+
+
+if __name__ == "__main__":
+    main()
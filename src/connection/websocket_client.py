@@ -1,6 +1,9 @@
 """WebSocket client for sending and receiving JSON messages with external apps."""
 
+import time
+from collections.abc import Mapping
 from logging import Logger
+from pathlib import Path
 from typing import final
 
 import aiofiles
@@ -11,11 +14,18 @@ from websockets import (
     WebSocketException,
 )
 
+from src.connection.payload_templates import PayloadTemplate
 from src.utils.helpers import construct_script_name
 from src.utils.logging_utils import setup_logger
+from src.utils.metrics import registry
 
 SCRIPT_NAME = construct_script_name(__file__)
 
+round_trip_seconds = registry.histogram(
+    "websocket_round_trip_seconds",
+    "Time between sending a websocket request and receiving its response",
+)
+
 
 @final
 class WebSocketClient:
@@ -26,6 +36,7 @@ class WebSocketClient:
         self.url = url
         self.logger = logger if logger else self._assign_default_logger()
         self.ws: ClientConnection | None = None
+        self._templates: dict[str, PayloadTemplate] = {}
 
     async def establish_connection(
         self,
@@ -58,12 +69,7 @@ class WebSocketClient:
             try:
                 async with aiofiles.open(json_file) as file:
                     content = await file.read()
-                    await self.ws.send(content)
-
-                response = await self.ws.recv()
-                if isinstance(response, bytes):
-                    response = response.decode("utf-8")
-                self.logger.info(f"WebSocket response: {response}")
+                await self._send_and_receive(content)
 
             except ConnectionClosedError:
                 self.logger.exception("WebSocket connection closed")
@@ -74,6 +80,48 @@ class WebSocketClient:
             except Exception:
                 self.logger.exception("Unexpected error while sending JSON request")
 
+    async def send_templated_request(
+        self, json_file_path: str | Path, values: Mapping[str, object] | None = None
+    ) -> None:
+        """Render a templated JSON request in memory and send it.
+
+        The request file is read and parsed once, then cached; placeholders declared
+        in it (see `payload_templates`) are filled with `values` on every call.
+        """
+        if not self.ws:
+            self.logger.warning("No websocket connection established")
+            return
+
+        key = str(json_file_path)
+        try:
+            template = self._templates.get(key)
+            if template is None:
+                template = await PayloadTemplate.from_file(json_file_path)
+                self._templates[key] = template
+            await self._send_and_receive(template.render(values))
+
+        except ConnectionClosedError:
+            self.logger.exception("WebSocket connection closed")
+        except FileNotFoundError:
+            self.logger.exception(f"file not found: {json_file_path}")
+        except KeyError:
+            self.logger.exception(f"Could not render template: {json_file_path}")
+        except WebSocketException:
+            self.logger.exception("WebSocket error")
+        except Exception:
+            self.logger.exception("Unexpected error while sending templated request")
+
+    async def _send_and_receive(self, content: str) -> None:
+        if not self.ws:
+            return
+        sent_at = time.perf_counter()
+        await self.ws.send(content)
+        response = await self.ws.recv()
+        round_trip_seconds.observe(time.perf_counter() - sent_at)
+        if isinstance(response, bytes):
+            response = response.decode("utf-8")
+        self.logger.info(f"WebSocket response: {response}")
+
     async def close(self) -> None:
         """Close the websocket connection."""
         if self.ws:
@@ -10,3 +10,5 @@ TEMP_DIR_PATH = PROJECT_ROOT_PATH / "temp"
 LOG_DIR_PATH = TEMP_DIR_PATH / "logs"
 LOCK_FILES_DIR_PATH = TEMP_DIR_PATH / "lock_files"
 COMMON_LOGS_FILE_PATH = LOG_DIR_PATH / "all_logs.log"
+SUBPROCESS_SOCKETS_DIR_PATH = TEMP_DIR_PATH / "sockets"
+PROFILES_DIR_PATH = TEMP_DIR_PATH / "profiles"
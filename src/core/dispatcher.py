@@ -0,0 +1,192 @@
+"""Concurrent, per-route dispatch of the messages received by the server.
+
+Every message is handled in its own task, so a slow handler (e.g. a windows refit doing
+many database calls and window moves) does not hold up the messages received after
+it. Where ordering matters, a route provides a key function: messages sharing a key
+are handled one at a time, in the order they were received, while messages with
+different keys run concurrently. A message may have several keys, e.g. a command to
+a group of subprocesses, it then waits for the messages received before it on any of
+its keys. The total number of messages handled at once is
+bounded, and each route keeps latency statistics.
+"""
+
+import asyncio
+import time
+from collections.abc import Awaitable, Callable, Sequence
+from dataclasses import dataclass, field
+from logging import Logger
+from typing import final
+
+from src.utils.helpers import construct_script_name
+from src.utils.logging_utils import setup_logger
+
+SCRIPT_NAME = construct_script_name(__file__)
+
+DEFAULT_MAX_CONCURRENCY = 8
+
+MessageHandler = Callable[[str], Awaitable[None]]
+"""Coroutine function handling a message received on a route."""
+KeyFunction = Callable[[str], str | Sequence[str] | None]
+"""Return the serialisation key(s) of a message, None to not serialise it at all."""
+
+
+@dataclass
+class RouteStats:
+    """Latency statistics of a route, in milliseconds."""
+
+    handled: int = 0
+    errors: int = 0
+    in_flight: int = 0
+    total_ms: float = 0.0
+    total_wait_ms: float = 0.0
+    max_ms: float = 0.0
+    last_ms: float = 0.0
+
+    def record(self, wait_ms: float, duration_ms: float, *, failed: bool) -> None:
+        """Record a handled message."""
+        self.handled += 1
+        self.errors += failed
+        self.total_ms += duration_ms
+        self.total_wait_ms += wait_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+        self.last_ms = duration_ms
+
+    def as_dict(self) -> dict[str, object]:
+        """Return the statistics as a JSON serializable dictionary."""
+        handled = self.handled or 1
+        return {
+            "handled": self.handled,
+            "errors": self.errors,
+            "in_flight": self.in_flight,
+            "mean_ms": round(self.total_ms / handled, 3),
+            "mean_wait_ms": round(self.total_wait_ms / handled, 3),
+            "max_ms": round(self.max_ms, 3),
+            "last_ms": round(self.last_ms, 3),
+        }
+
+
+@dataclass(frozen=True)
+class Route:
+    """A message handler and how its messages are serialised."""
+
+    handler: MessageHandler
+    key: KeyFunction | None = None
+    stats: RouteStats = field(default_factory=RouteStats)
+
+
+@final
+class MessageDispatcher:
+    """Routes messages to their handler, each in its own task."""
+
+    def __init__(
+        self,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        logger: Logger | None = None,
+    ) -> None:
+        """Initialize a dispatcher without routes.
+
+        Args:
+            max_concurrency: Maximum number of messages handled at the same time.
+            logger: Logger instance, defaults to this module's logger.
+
+        """
+        self.logger = logger if logger is not None else setup_logger(SCRIPT_NAME)
+        self.routes: dict[str, Route] = {}
+        self._slots = asyncio.Semaphore(max_concurrency)
+        # Last message dispatched for each (path, key), the next one waits for it
+        self._key_tails: dict[tuple[str, str], asyncio.Task[None]] = {}
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    def add_route(
+        self, path: str, handler: MessageHandler, key: KeyFunction | None = None
+    ) -> None:
+        """Register the handler of a path.
+
+        Args:
+            path: The websocket path, e.g. "/subprocess".
+            handler: Coroutine function handling the path's messages.
+            key: Function returning a message's serialisation key, or keys. Messages
+                sharing a key are handled in order, one at a time.
+
+        """
+        self.routes[path] = Route(handler, key)
+
+    def dispatch(self, path: str, message: str) -> asyncio.Task[None] | None:
+        """Schedule the handling of a message.
+
+        Returns:
+            The task handling the message, or None if no route matches its path.
+
+        """
+        route = self.routes.get(path)
+        if route is None:
+            self.logger.warning(f"No route for path {path}, ignoring: {message}")
+            return None
+        keys = [(path, key) for key in self._keys(route, message)]
+        previous = {tail for key in keys if (tail := self._key_tails.get(key))}
+        task = asyncio.create_task(self._handle(path, route, message, previous))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        for key in keys:
+            self._key_tails[key] = task
+        task.add_done_callback(lambda _: self._release(keys, task))
+        return task
+
+    @staticmethod
+    def _keys(route: Route, message: str) -> Sequence[str]:
+        keys = route.key(message) if route.key is not None else None
+        if keys is None:
+            return ()
+        return (keys,) if isinstance(keys, str) else keys
+
+    def _release(self, keys: list[tuple[str, str]], task: asyncio.Task[None]) -> None:
+        for key in keys:
+            if self._key_tails.get(key) is task:
+                del self._key_tails[key]
+
+    async def _handle(
+        self,
+        path: str,
+        route: Route,
+        message: str,
+        previous: set[asyncio.Task[None]],
+    ) -> None:
+        route.stats.in_flight += 1
+        received_at = time.perf_counter()
+        failed = False
+        # The previous messages of the keys are waited for before taking a
+        # concurrency slot, so that messages waiting for their turn do not hold slots
+        # other routes could use. Waiting on tasks rather than locks keeps the order
+        # of messages with several keys, and cannot deadlock.
+        try:
+            if previous:
+                await asyncio.wait(previous)
+            async with self._slots:
+                started_at = time.perf_counter()
+                try:
+                    await route.handler(message)
+                except Exception:
+                    failed = True
+                    self.logger.exception(f"Error handling '{message}' on {path}")
+                finished_at = time.perf_counter()
+        finally:
+            route.stats.in_flight -= 1
+        route.stats.record(
+            (started_at - received_at) * 1000,
+            (finished_at - started_at) * 1000,
+            failed=failed,
+        )
+
+    def stats(self) -> dict[str, dict[str, object]]:
+        """Return the latency statistics of every route."""
+        return {path: route.stats.as_dict() for path, route in self.routes.items()}
+
+    async def drain(self) -> None:
+        """Wait for every message being handled to be done."""
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def close(self) -> None:
+        """Cancel the handling of every pending message."""
+        for task in self._tasks:
+            task.cancel()
+        await self.drain()
@@ -6,18 +6,29 @@ about later.
 """
 
 import asyncio
+import json
+import time
 from collections.abc import Awaitable, Callable
+from functools import partial
 
 import aiosqlite
 import websockets
 from websockets.asyncio.server import ServerConnection
 
-from src.config.settings import PROJECT_ROOT_PATH
-from src.connection.constants import STOP_SUBPROCESS_MESSAGE, SUBPROCESSES_PORTS
-from src.core.constants import (
-    APPS_DIR_PATH,
-    LOCK_FILES_DIR_PATH,
+from src.config.settings import METRICS_HTTP_EXPORTER
+from src.connection.constants import (
+    APP_ENTRY_MODULES,
+    METRICS_HTTP_PORT_OFFSET,
+    SUBPROCESSES_PORTS,
+    TRACE_DUMP_COMMAND,
 )
+from src.connection.control_protocol import (
+    ControlCommand,
+    ControlResponse,
+)
+from src.connection.subprocess_client import SubprocessClientPool
+from src.core.dispatcher import MessageDispatcher
+from src.core.supervisor import AppState, AppSupervisor
 from src.core.termwm import (
     TERMINAL_WINDOW_SLOTS_DB_FILE_PATH,
     TerminalWindowManager,
@@ -26,15 +37,30 @@ from src.core.termwm import (
 from src.core.termwm import (
     slots_db_handler as sdh,
 )
+from src.core.warm_pool import WarmWorkerPool
 from src.utils.helpers import construct_script_name
+from src.utils.lock_file_manager import LockFileManager, lock_name_for_module
 from src.utils.logging_utils import setup_logger
+from src.utils.metrics import MetricsExporter, registry
+from src.utils.profiling import DEFAULT_PROFILE_SECONDS, PROFILE_MODES
 
 twm = TerminalWindowManager()
 
 SCRIPT_NAME = construct_script_name(__file__)
 MIN_MSG_LENGTH = 2
+SUBPROCESS_COMMAND_TIMEOUT = 5.0
+MAX_CONCURRENT_MESSAGES = 8
+START_GROUP_COMMAND = "start-group"
+START_GROUP_TIMEOUT = 60.0
+"""Seconds an app started with a group has to become ready."""
+READINESS_POLL_INTERVAL = 0.2
+WEBSOCKET_PORT = 50000
 
 logger = setup_logger(SCRIPT_NAME)
+subprocess_clients = SubprocessClientPool(logger, timeout=SUBPROCESS_COMMAND_TIMEOUT)
+warm_pool = WarmWorkerPool(logger=logger)
+supervisor = AppSupervisor(logger, warm_pool=warm_pool)
+dispatcher = MessageDispatcher(MAX_CONCURRENT_MESSAGES, logger)
 
 
 async def _manage_subprocess(message: str) -> None:
@@ -47,6 +73,19 @@ async def _manage_subprocess(message: str) -> None:
         logger.error(error_msg)
         raise ValueError(error_msg)
 
+    if parts[0] == START_GROUP_COMMAND:
+        targets = parts[1].split()
+        unknown_targets = [t for t in targets if t not in SUBPROCESSES_PORTS]
+        if unknown_targets:
+            error_msg = (
+                f"Unknown targets {unknown_targets} not in"
+                f" {list(SUBPROCESSES_PORTS.keys())}"
+            )
+            logger.error(error_msg)
+            raise ValueError(error_msg)
+        await _start_group(list(dict.fromkeys(targets)))
+        return
+
     target = parts[0]
     instructions = parts[1].strip()
     if target not in SUBPROCESSES_PORTS:
@@ -55,50 +94,213 @@ async def _manage_subprocess(message: str) -> None:
         raise ValueError(error_msg)
 
     if instructions == "start":
-        # Open the process in a new separate cli window: this is done to be
-        # able to manipulate the position of the script's terminal with the
+        # The supervisor opens each app in its own console on Windows: this is done
+        # to be able to manipulate the position of the script's terminal with the
         # terminal window manager module.
+        app = await supervisor.start(target)
+        print(f"Started {target} (pid {app.pid})")
+        logger.info(f"Started subprocess {target} with pid {app.pid}")
 
-        venv_python = PROJECT_ROOT_PATH / ".venv" / "Scripts" / "python.exe"
-        script_path = APPS_DIR_PATH / target / "main.py"
-
-        command = (
-            f'start /min cmd /k "'
-            f"cd /d {PROJECT_ROOT_PATH} && "
-            f"set PYTHONPATH={PROJECT_ROOT_PATH} && "
-            f'{venv_python} {script_path}"'
+    elif instructions == "stop":
+        await _stop_subprocess(target)
+
+    elif instructions == ControlCommand.STATUS:
+        print(f"{target} process: {json.dumps(supervisor.status(target), indent=2)}")
+        if target not in supervisor.apps or supervisor.is_running(target):
+            # Apps started outside of the supervisor can only be found by asking.
+            response = await send_command_to_subprocess(target, instructions)
+            _print_command_response(target, instructions, response)
+
+    elif instructions == ControlCommand.METRICS:
+        response = await send_command_to_subprocess(target, instructions)
+        _print_command_response(target, instructions, response)
+
+    elif instructions == f"{ControlCommand.METRICS} prometheus":
+        response = await send_command_to_subprocess(
+            target, ControlCommand.METRICS, {"format": "prometheus"}
         )
+        if response is not None and response.ok:
+            print(response.result.get("prometheus", ""), end="")
+            if response.result.get("truncated"):
+                print(f"# truncated, {target}'s metrics exporter serves all of them")
+        else:
+            _print_command_response(target, ControlCommand.METRICS, response)
 
-        await asyncio.create_subprocess_shell(
-            command,
-            cwd=str(PROJECT_ROOT_PATH),
+    elif instructions.startswith(ControlCommand.SET_CONFIG):
+        params = _parse_config_params(
+            instructions.removeprefix(ControlCommand.SET_CONFIG)
         )
+        response = await send_command_to_subprocess(
+            target, ControlCommand.SET_CONFIG, params
+        )
+        _print_command_response(target, ControlCommand.SET_CONFIG, response)
 
-        print(f"Started {target}")
-        logger.info(f"Started subprocess {target}")
-
-    elif instructions == "stop":
-        await send_message_to_subprocess_socket(
-            STOP_SUBPROCESS_MESSAGE, SUBPROCESSES_PORTS[target]
+    elif instructions.startswith(ControlCommand.PROFILE):
+        # e.g. "shopwatcher profile 30 cprofile", the reply comes once it is done
+        seconds, mode = _parse_profile_params(
+            instructions.removeprefix(ControlCommand.PROFILE)
         )
+        response = await send_command_to_subprocess(
+            target,
+            ControlCommand.PROFILE,
+            {"seconds": seconds, "mode": mode},
+            timeout=seconds + SUBPROCESS_COMMAND_TIMEOUT,
+        )
+        _print_command_response(target, ControlCommand.PROFILE, response)
+
+    elif instructions.startswith(TRACE_DUMP_COMMAND):
+        # e.g. "robeau trace-dump 50" for the 50 most recent node events
+        limit = instructions.removeprefix(TRACE_DUMP_COMMAND).strip()
+        if limit and not limit.isdigit():
+            error_msg = f"Invalid {TRACE_DUMP_COMMAND} limit: {limit}"
+            logger.error(error_msg)
+            raise ValueError(error_msg)
+        params: dict[str, object] = {"limit": int(limit)} if limit else {}
+        response = await send_command_to_subprocess(target, TRACE_DUMP_COMMAND, params)
+        _print_command_response(target, TRACE_DUMP_COMMAND, response)
 
     elif instructions == "unlock":
-        # Check for an ACK from the subprocess SOCK server. If there is one,
-        # it means the subprocess is running and should not be attempted to
-        # be unlocked.
-        answer = await send_message_to_subprocess_socket(
-            "Check for server ACK", SUBPROCESSES_PORTS[target]
-        )
-        if not answer:
-            lock_file = LOCK_FILES_DIR_PATH / f"{target}.lock"
-            print(f"Checking for {lock_file}")
-            if lock_file.exists():
-                lock_file.unlink()
-                print(f"Found and removed lock for {target}")
-            else:
-                print("No lock found here, traveler.")
+        # Locks are released by the kernel when their process exits, so a held lock
+        # always belongs to a running app and there is nothing stale to remove.
+        if target not in APP_ENTRY_MODULES:
+            print(f"Unknown app {target}, no lock to look for")
+            return
+        lock = LockFileManager(lock_name_for_module(APP_ENTRY_MODULES[target]))
+        if lock.lock_exists():
+            print(f"{target} is running ({lock.holder()}), its lock goes with it")
         else:
-            print(f"{target} seems to be running, cannot unlock")
+            print(f"{target} is not locked, nothing to unlock, traveler.")
+
+
+async def _stop_subprocess(target: str) -> None:
+    async def request_stop() -> None:
+        response = await send_command_to_subprocess(target, ControlCommand.STOP)
+        _print_command_response(target, ControlCommand.STOP, response)
+
+    if supervisor.is_running(target):
+        exit_code = await supervisor.stop(target, request_stop)
+        print(f"{target} exited with code {exit_code}")
+    else:
+        await request_stop()
+
+
+async def _start_group(targets: list[str]) -> None:
+    """Start apps side by side and report how long each took to be ready."""
+    started_at = time.perf_counter()
+    results = await asyncio.gather(
+        *(_start_and_wait_ready(target) for target in targets),
+        return_exceptions=True,
+    )
+    for target, result in zip(targets, results, strict=True):
+        if isinstance(result, BaseException):
+            print(f"{target}: failed to start: {result!r}")
+            logger.error(f"Group start of {target} failed: {result!r}")
+            continue
+        elapsed, readiness = result
+        stages = readiness.get("stages", {})
+        pending = readiness.get("pending", [])
+        state = "ready" if readiness.get("ready") else f"NOT ready, pending {pending}"
+        if "error" in readiness:
+            state += f" ({readiness['error']})"
+        print(f"{target}: {state} after {elapsed:.2f}s, stages: {json.dumps(stages)}")
+        logger.info(f"Group start of {target}: {state} after {elapsed:.2f}s")
+    total = time.perf_counter() - started_at
+    print(f"Group {' '.join(targets)} started in {total:.2f}s")
+    logger.info(f"Group {targets} started in {total:.2f}s")
+
+
+async def _start_and_wait_ready(target: str) -> tuple[float, dict[str, object]]:
+    """Start an app and wait until it reports all its readiness stages.
+
+    The app's socket server is polled until it is up, then asked to reply once the
+    app is ready, so an app already running answers right away.
+
+    Returns:
+        The seconds from start to ready (or to giving up) and the app's readiness.
+
+    """
+    started_at = time.perf_counter()
+    deadline = started_at + START_GROUP_TIMEOUT
+    await supervisor.start(target)
+    readiness: dict[str, object] = {"ready": False, "stages": {}}
+    while (remaining := deadline - time.perf_counter()) > 0:
+        state = supervisor.status(target)["state"]
+        if state in {AppState.STOPPED, AppState.STOPPING, AppState.FAILED}:
+            # Gave up on or stopped while starting, a backoff still gets its chance.
+            readiness["error"] = f"app is {state}"
+            break
+        try:
+            response = await subprocess_clients.request(
+                target,
+                ControlCommand.WAIT_READY,
+                {"timeout": remaining},
+                timeout=remaining + 1,
+            )
+        except (OSError, TimeoutError):
+            # The app's socket server is not up yet.
+            await asyncio.sleep(READINESS_POLL_INTERVAL)
+            continue
+        if response.ok:
+            readiness = response.result
+        break
+    stages = readiness.get("stages")
+    if isinstance(stages, dict):
+        readiness["pending"] = [name for name, at in stages.items() if at is None]
+    return time.perf_counter() - started_at, readiness
+
+
+def _parse_config_params(text: str) -> dict[str, object]:
+    """Parse `key=value` pairs, values are read as JSON when possible.
+
+    Raises:
+        ValueError: If a pair is not in the `key=value` format.
+
+    """
+    params: dict[str, object] = {}
+    for pair in text.split():
+        key, sep, raw_value = pair.partition("=")
+        if not sep or not key:
+            error_msg = f"Invalid config pair {pair!r}, expected key=value"
+            logger.error(error_msg)
+            raise ValueError(error_msg)
+        try:
+            params[key] = json.loads(raw_value)
+        except json.JSONDecodeError:
+            params[key] = raw_value
+    return params
+
+
+def _parse_profile_params(text: str) -> tuple[float, str]:
+    """Parse the optional duration and mode of a profiling session, in any order.
+
+    Raises:
+        ValueError: If a word is neither a duration nor a profiling mode.
+
+    """
+    seconds, mode = DEFAULT_PROFILE_SECONDS, "sampling"
+    for word in text.split():
+        if word in PROFILE_MODES:
+            mode = word
+            continue
+        try:
+            seconds = float(word)
+        except ValueError:
+            error_msg = f"Invalid {ControlCommand.PROFILE} argument: {word}"
+            logger.error(error_msg)  # noqa: TRY400
+            raise ValueError(error_msg) from None
+    return seconds, mode
+
+
+def _print_command_response(
+    target: str, command: str, response: ControlResponse | None
+) -> None:
+    if response is None:
+        print(f"{target} did not answer the {command} command")
+    elif response.ok:
+        print(f"{target} {command}: {json.dumps(response.result, indent=2)}")
+    else:
+        print(f"{target} {command} failed: {response.error}")
+        logger.warning(f"{target} {command} failed: {response.error}")
 
 
 async def _manage_windows(conn: aiosqlite.Connection, message: str) -> None:
@@ -118,10 +320,54 @@ async def _manage_database(conn: aiosqlite.Connection, message: str) -> None:
         print("Invalid database path message, does not fit any use")
 
 
+async def _manage_test(conn: aiosqlite.Connection, message: str) -> None:
+    if message == "get windows":
+        windows_names = await sdh.get_all_names(conn)
+        print(f"Windows in slot DB: {windows_names}")
+    elif message == "stats":
+        print(f"Routes stats: {json.dumps(dispatcher.stats(), indent=2)}")
+        print(f"Subprocess connections: {json.dumps(subprocess_clients.stats())}")
+        print(f"Warm workers: {json.dumps(warm_pool.stats())}")
+        print(f"Slots cache: {json.dumps(sdh.get_cache_stats(conn))}")
+        print(f"Window registry: {json.dumps(twm.adjuster.registry.stats())}")
+        print(f"Layout plans: {json.dumps(twm.calculator.engine.cache_stats())}")
+        print(f"Metrics: {json.dumps(registry.snapshot(), indent=2)}")
+    elif message == "hi bitch":
+        print("I aint ur bitch")
+
+
+def _subprocess_target(message: str) -> list[str]:
+    # Commands to a same subprocess must keep their order (e.g. start then stop),
+    # commands to different subprocesses can run side by side. A group start is
+    # ordered with the commands to each of its targets.
+    parts = message.split()
+    if not parts:
+        return [""]
+    if parts[0] == START_GROUP_COMMAND:
+        return list(dict.fromkeys(parts[1:])) or [START_GROUP_COMMAND]
+    return parts[:1]
+
+
+def register_routes(conn: aiosqlite.Connection) -> None:
+    """Fill the route table of the server, with access to given database connection.
+
+    Windows and database messages are handled one at a time as they share the slots
+    database and move the same windows.
+    """
+    dispatcher.add_route("/subprocess", _manage_subprocess, _subprocess_target)
+    dispatcher.add_route(
+        "/windows", partial(_manage_windows, conn), key=lambda _: "slots"
+    )
+    dispatcher.add_route(
+        "/database", partial(_manage_database, conn), key=lambda _: "slots"
+    )
+    dispatcher.add_route("/test", partial(_manage_test, conn))  # Path to test stuff
+
+
 def create_websocket_handler(
-    conn: aiosqlite.Connection,
+    message_dispatcher: MessageDispatcher,
 ) -> Callable[[ServerConnection], Awaitable[None]]:
-    """Create a websocket handler function with access to given database connection."""
+    """Create a websocket handler function handing messages to given dispatcher."""
 
     async def websocket_handler(websocket: ServerConnection) -> None:
         async for raw_message in websocket:
@@ -133,47 +379,36 @@ def create_websocket_handler(
 
             path = websocket.request.path if websocket.request else "/"
             print(f"Received: '{message}' on path: {path}")
-
-            if path == "/subprocess":
-                await _manage_subprocess(message)
-
-            elif path == "/windows":
-                await _manage_windows(conn, message)
-
-            elif path == "/database":
-                await _manage_database(conn, message)
-
-            elif path == "/test":  # Path to test stuff
-                if message == "get windows":
-                    windows_names = await sdh.get_all_names(conn)
-                    print(f"Windows in slot DB: {windows_names}")
-                elif message == "hi bitch":
-                    print("I aint ur bitch")
+            message_dispatcher.dispatch(path, message)
 
     return websocket_handler
 
 
-async def send_message_to_subprocess_socket(
-    message: str, port: int, host: str = "localhost"
-) -> str:
-    """Client function to send messages to subprocesses servers."""
-    try:
-        reader, writer = await asyncio.open_connection(host, port)
+async def send_command_to_subprocess(
+    target: str,
+    command: str,
+    params: dict[str, object] | None = None,
+    timeout: float = SUBPROCESS_COMMAND_TIMEOUT,
+) -> ControlResponse | None:
+    """Send a JSON control command to a subprocess server and wait for its reply.
 
-        writer.write(message.encode("utf-8"))
-        print(f"SOCK: Sent: {message}")
-        data = await reader.read(1024)
-        msg = data.decode("utf-8")
-        print(f"SOCK: Received: {msg}")
+    Args:
+        target: The subprocess name, a key of `SUBPROCESSES_PORTS`.
+        command: The command to run, see `ControlCommand` for the built-in ones.
+        params: The command's parameters.
+        timeout: Seconds to wait for the reply.
 
-        print("SOCK: closing connection")
-        writer.close()
-        await writer.wait_closed()
+    Returns:
+        The subprocess' response, or None if it could not be reached.
 
-    except OSError as e:
-        msg = f"SOCK: Could not connect to {host}:{port}"
-        print(e)
-    return msg
+    """
+    try:
+        response = await subprocess_clients.request(target, command, params, timeout)
+    except (OSError, TimeoutError) as e:
+        print(f"SOCK: Could not communicate with {target}: {e or type(e).__name__}")
+        return None
+    print(f"SOCK: {target} answered {command}")
+    return response
 
 
 async def main() -> None:
@@ -184,16 +419,28 @@ async def main() -> None:
         print("Could not connect to the windows slots database.")
         return
     await twm.adjust_terminal_window(conn, WinType.SERVER, "SERVER")
+    register_routes(conn)
+    await warm_pool.start()
     websocket_server = await websockets.serve(
-        create_websocket_handler(conn), "localhost", 50000
+        create_websocket_handler(dispatcher), "localhost", WEBSOCKET_PORT
     )
+    exporter = None
+    if METRICS_HTTP_EXPORTER:
+        exporter = MetricsExporter(WEBSOCKET_PORT + METRICS_HTTP_PORT_OFFSET, logger)
+        await exporter.start()
     try:
         await asyncio.Future()
     except KeyboardInterrupt:
         logger.info("Server stopping due to keyboard interrupt")
     finally:
+        if exporter is not None:
+            await exporter.close()
         websocket_server.close()
         await websocket_server.wait_closed()
+        await dispatcher.close()
+        await subprocess_clients.close()
+        await supervisor.close()
+        await warm_pool.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,119 @@
+"""Compare cold and warm app starts, from launch to the app's `main()`.
+
+Both modes run the app through a `warm_worker` in dry-run mode, which reports the time
+elapsed from launch to the moment the app's `main()` would be called:
+- cold: the handoff is sent right as the worker is spawned, so the measured time
+  includes the interpreter startup and all the app's imports, like a fresh start.
+- warm: the handoff is sent once the worker announced it is warmed up, like a start
+  handed off by the `WarmWorkerPool`.
+
+The time from launch to first detection, which adds the app's own setup on top, is
+logged by the apps themselves (see `startup_timing`) when started by the supervisor.
+
+Usage:
+    python -m src.core.startup_benchmark shopwatcher --runs 5
+
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from typing import Protocol, cast
+
+from src.config.settings import PROJECT_ROOT_PATH
+from src.connection.constants import APP_ENTRY_MODULES
+from src.core.warm_pool import WARM_WORKER_MODULE
+from src.core.warm_worker import HANDOFF_COMMAND, READY_ANNOUNCEMENT
+
+WARM_UP_TIMEOUT = 300.0
+
+
+class Args(Protocol):
+    """Protocol for command-line arguments."""
+
+    apps: list[str]
+    runs: int
+
+
+async def measure_start(app: str, *, warm: bool) -> float:
+    """Measure one start of an app, in seconds from launch to its `main()`.
+
+    Raises:
+        RuntimeError: If the worker exits without reporting its timing.
+
+    """
+    env = os.environ.copy()
+    env["PYTHONPATH"] = str(PROJECT_ROOT_PATH)
+    worker_args = [WARM_WORKER_MODULE, app, "--dry-run"]
+    if warm:
+        worker_args.append("--announce-ready")
+
+    launched_at = time.time()
+    worker = await asyncio.create_subprocess_exec(
+        sys.executable,
+        "-m",
+        *worker_args,
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        cwd=PROJECT_ROOT_PATH,
+        env=env,
+    )
+    assert worker.stdin is not None and worker.stdout is not None  # noqa: S101
+
+    if warm:
+        async with asyncio.timeout(WARM_UP_TIMEOUT):
+            while (line := await worker.stdout.readline()) and (
+                line.decode().strip() != READY_ANNOUNCEMENT
+            ):
+                pass
+        launched_at = time.time()
+
+    mode = "warm" if warm else "cold"
+    worker.stdin.write(f"{HANDOFF_COMMAND} {launched_at!r} {mode}\n".encode())
+    await worker.stdin.drain()
+    worker.stdin.close()
+
+    output, _ = await worker.communicate()
+    for line in reversed(output.decode().splitlines()):
+        if line.startswith("{"):
+            return float(json.loads(line)["launch_to_main_seconds"])
+    e = f"Worker of {app} exited with code {worker.returncode} without a timing"
+    raise RuntimeError(e)
+
+
+async def run_benchmark(apps: list[str], runs: int) -> dict[str, dict[str, float]]:
+    """Measure `runs` cold and warm starts of each app.
+
+    Returns:
+        The mean and best launch to `main()` times of each app and mode, in seconds.
+
+    """
+    results: dict[str, dict[str, float]] = {}
+    for app in apps:
+        for warm in (False, True):
+            samples = [await measure_start(app, warm=warm) for _ in range(runs)]
+            results[f"{app} {'warm' if warm else 'cold'}"] = {
+                "mean_s": statistics.fmean(samples),
+                "best_s": min(samples),
+            }
+    return results
+
+
+def main() -> None:
+    """Parse arguments, run the benchmark and print the results."""
+    parser = argparse.ArgumentParser(description="Compare cold and warm app starts.")
+    parser.add_argument("apps", nargs="+", choices=sorted(APP_ENTRY_MODULES))
+    parser.add_argument("--runs", type=int, default=3)
+    args = cast("Args", cast("object", parser.parse_args()))
+
+    results = asyncio.run(run_benchmark(args.apps, args.runs))
+    for name, stats in results.items():
+        print(f"{name:>20}: mean {stats['mean_s']:.3f}s, best {stats['best_s']:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
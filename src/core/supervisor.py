@@ -0,0 +1,359 @@
+"""Supervisor spawning the app subprocesses and keeping track of them.
+
+Apps are started with `python -m <entry module>` (see `APP_ENTRY_MODULES`) straight
+through `asyncio.create_subprocess_exec`, so no shell is involved and the same code
+runs on Linux. On Windows each app gets its own console window, which the terminal
+window manager then positions.
+
+The supervisor keeps every app's process handle, so telling whether an app is running
+is a dictionary lookup rather than a socket probe. Each app is watched by a task that
+records its exit code and, depending on its `RestartPolicy`, restarts it after an
+exponential backoff when it exits unexpectedly.
+
+Given a `WarmWorkerPool`, starts are handed off to a pre-warmed worker when one is
+available, skipping the import cost of the app.
+"""
+
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from enum import StrEnum
+from logging import Logger
+from typing import final
+
+from src.config.settings import PROJECT_ROOT_PATH
+from src.connection.constants import APP_ENTRY_MODULES
+from src.core.warm_pool import WarmWorkerPool
+from src.utils.helpers import construct_script_name
+from src.utils.logging_utils import setup_logger
+from src.utils.startup_timing import mark_launch
+
+SCRIPT_NAME = construct_script_name(__file__)
+
+DEFAULT_STOP_TIMEOUT = 10.0
+"""Seconds given to an app to exit by itself before it is terminated."""
+KILL_TIMEOUT = 5.0
+"""Seconds given to an app to exit after being terminated before it is killed."""
+
+
+class RestartMode(StrEnum):
+    """When an app should be restarted after exiting by itself."""
+
+    NEVER = "never"
+    ON_FAILURE = "on-failure"
+    ALWAYS = "always"
+
+
+class AppState(StrEnum):
+    """Lifecycle states of a supervised app."""
+
+    STOPPED = "stopped"
+    RUNNING = "running"
+    STOPPING = "stopping"
+    BACKOFF = "backoff"
+    FAILED = "failed"
+
+
+@dataclass(frozen=True)
+class RestartPolicy:
+    """How, and how often, a crashed app is restarted.
+
+    Attributes:
+        mode: When to restart the app.
+        max_restarts: Consecutive restarts allowed before giving up.
+        initial_backoff: Seconds to wait before the first restart.
+        max_backoff: Upper bound of the wait between restarts.
+        backoff_factor: Multiplier applied to the wait after each restart.
+        healthy_after: Seconds of uptime after which the app is considered healthy,
+            which resets its consecutive restarts count.
+
+    """
+
+    mode: RestartMode = RestartMode.ON_FAILURE
+    max_restarts: int = 5
+    initial_backoff: float = 1.0
+    max_backoff: float = 30.0
+    backoff_factor: float = 2.0
+    healthy_after: float = 60.0
+
+    def should_restart(self, exit_code: int, consecutive_restarts: int) -> bool:
+        """Tell if an app that exited by itself should be restarted."""
+        if consecutive_restarts >= self.max_restarts:
+            return False
+        if self.mode is RestartMode.ALWAYS:
+            return True
+        return self.mode is RestartMode.ON_FAILURE and exit_code != 0
+
+    def backoff(self, consecutive_restarts: int) -> float:
+        """Return the seconds to wait before the next restart."""
+        delay = self.initial_backoff * self.backoff_factor**consecutive_restarts
+        return min(delay, self.max_backoff)
+
+
+@dataclass
+class SupervisedApp:
+    """Process handle and lifecycle information of a supervised app."""
+
+    name: str
+    module: str
+    policy: RestartPolicy
+    state: AppState = AppState.STOPPED
+    process: asyncio.subprocess.Process | None = None
+    started_at: float | None = None
+    exited_at: float | None = None
+    exit_code: int | None = None
+    starts: int = 0
+    consecutive_restarts: int = 0
+    stop_requested: bool = False
+    launch_mode: str | None = None
+    watcher: asyncio.Task[None] | None = field(default=None, repr=False)
+
+    @property
+    def pid(self) -> int | None:
+        """PID of the app's latest process, if it was ever spawned."""
+        return self.process.pid if self.process is not None else None
+
+    @property
+    def running(self) -> bool:
+        """Tell if the app's process is alive."""
+        return self.process is not None and self.process.returncode is None
+
+    def as_dict(self) -> dict[str, object]:
+        """Return the app's information as a JSON serializable dictionary."""
+        uptime = (
+            round(time.time() - self.started_at, 3)
+            if self.running and self.started_at is not None
+            else None
+        )
+        return {
+            "name": self.name,
+            "state": self.state,
+            "pid": self.pid,
+            "uptime_seconds": uptime,
+            "exit_code": self.exit_code,
+            "starts": self.starts,
+            "consecutive_restarts": self.consecutive_restarts,
+            "restart_mode": self.policy.mode,
+            "launch_mode": self.launch_mode,
+        }
+
+
+@final
+class AppSupervisor:
+    """Spawns, watches, restarts and stops the app subprocesses."""
+
+    def __init__(
+        self,
+        logger: Logger | None = None,
+        python_executable: str = sys.executable,
+        entry_modules: dict[str, str] | None = None,
+        default_policy: RestartPolicy | None = None,
+        warm_pool: WarmWorkerPool | None = None,
+    ) -> None:
+        """Initialize the supervisor, no app is started.
+
+        Args:
+            logger: Logger instance, defaults to this module's logger.
+            python_executable: Interpreter used to run the apps.
+            entry_modules: App names mapped to their entry module, defaults to
+                `APP_ENTRY_MODULES`.
+            default_policy: Restart policy of apps started without one.
+            warm_pool: Pool of warm workers to hand app starts off to, apps are
+                started in a fresh interpreter when it has none for them.
+
+        """
+        self.logger = logger if logger is not None else setup_logger(SCRIPT_NAME)
+        self.python_executable = python_executable
+        self.entry_modules = (
+            entry_modules if entry_modules is not None else APP_ENTRY_MODULES
+        )
+        self.default_policy = (
+            default_policy if default_policy is not None else RestartPolicy()
+        )
+        self.warm_pool = warm_pool
+        self.apps: dict[str, SupervisedApp] = {}
+        # Starts and stops of a same app wait for each other, so that two starts do
+        # not spawn it twice and a stop is not missed while it is being spawned.
+        self._app_locks: dict[str, asyncio.Lock] = {}
+
+    def is_running(self, name: str) -> bool:
+        """Tell if the app is running under this supervisor."""
+        app = self.apps.get(name)
+        return app is not None and app.running
+
+    def status(self, name: str) -> dict[str, object]:
+        """Return the supervision information of an app, known or not."""
+        app = self.apps.get(name)
+        if app is None:
+            return {"name": name, "state": AppState.STOPPED, "pid": None}
+        return app.as_dict()
+
+    def statuses(self) -> dict[str, dict[str, object]]:
+        """Return the supervision information of every app started so far."""
+        return {name: app.as_dict() for name, app in self.apps.items()}
+
+    async def start(
+        self, name: str, policy: RestartPolicy | None = None
+    ) -> SupervisedApp:
+        """Start an app, does nothing if it is already running.
+
+        Raises:
+            KeyError: If the app has no entry module.
+            OSError: If the process cannot be spawned.
+
+        """
+        module = self.entry_modules[name]
+        async with self._app_lock(name):
+            app = self.apps.get(name)
+            if app is not None and (app.running or app.state is AppState.BACKOFF):
+                self.logger.info(f"{name} is already {app.state}, not starting it")
+                return app
+
+            app = SupervisedApp(name, module, policy or self.default_policy)
+            self.apps[name] = app
+            await self._spawn(app)
+            app.watcher = asyncio.create_task(self._watch(app), name=f"watch-{name}")
+            return app
+
+    async def stop(
+        self,
+        name: str,
+        request_stop: Callable[[], Awaitable[object]] | None = None,
+        timeout: float = DEFAULT_STOP_TIMEOUT,
+    ) -> int | None:
+        """Stop an app and wait for it to exit, it will not be restarted.
+
+        Args:
+            name: The app's name.
+            request_stop: Coroutine function asking the app to exit by itself, so it
+                can clean up. The app is terminated right away when not given, or if
+                it is still running `timeout` seconds later.
+            timeout: Seconds to wait for the app to exit by itself.
+
+        Returns:
+            The app's exit code, or None if it was not running.
+
+        """
+        async with self._app_lock(name):
+            app = self.apps.get(name)
+            if app is None:
+                return None
+            app.stop_requested = True
+            if app.state is AppState.BACKOFF and app.watcher is not None:
+                app.watcher.cancel()
+                app.state = AppState.STOPPED
+            process = app.process
+            if process is None or not app.running:
+                return app.exit_code
+
+            app.state = AppState.STOPPING
+            if request_stop is not None:
+                await request_stop()
+                try:
+                    await asyncio.wait_for(process.wait(), timeout)
+                except TimeoutError:
+                    self.logger.warning(
+                        f"{name} did not stop in {timeout}s, terminating"
+                    )
+            await self._terminate(process)
+            if app.watcher is not None:
+                await asyncio.gather(app.watcher, return_exceptions=True)
+            return app.exit_code
+
+    async def close(self) -> None:
+        """Stop watching the apps, leaving them running.
+
+        Apps have always outlived the server, they are still reachable through their
+        socket servers.
+        """
+        for app in self.apps.values():
+            if app.watcher is not None:
+                app.watcher.cancel()
+        await asyncio.gather(
+            *(app.watcher for app in self.apps.values() if app.watcher is not None),
+            return_exceptions=True,
+        )
+
+    def _app_lock(self, name: str) -> asyncio.Lock:
+        return self._app_locks.setdefault(name, asyncio.Lock())
+
+    async def _spawn(self, app: SupervisedApp) -> None:
+        process = None
+        if self.warm_pool is not None:
+            process = await self.warm_pool.hand_off(app.name)
+        if process is not None:
+            app.launch_mode = "warm"
+        else:
+            app.launch_mode = "cold"
+            process = await self._spawn_cold(app)
+        app.process = process
+        app.state = AppState.RUNNING
+        app.started_at = time.time()
+        app.exit_code = None
+        app.starts += 1
+        self.logger.info(
+            f"Started {app.name} ({app.module}) with pid {app.pid}, {app.launch_mode}"
+        )
+
+    async def _spawn_cold(self, app: SupervisedApp) -> asyncio.subprocess.Process:
+        env = os.environ.copy()
+        env["PYTHONPATH"] = str(PROJECT_ROOT_PATH)
+        mark_launch(env, "cold")
+        kwargs: dict[str, object] = {}
+        if sys.platform == "win32":
+            kwargs["creationflags"] = subprocess.CREATE_NEW_CONSOLE
+        return await asyncio.create_subprocess_exec(
+            self.python_executable,
+            "-m",
+            app.module,
+            cwd=PROJECT_ROOT_PATH,
+            env=env,
+            **kwargs,  # pyright: ignore[reportArgumentType]
+        )
+
+    async def _watch(self, app: SupervisedApp) -> None:
+        while app.process is not None:
+            exit_code = await app.process.wait()
+            app.exit_code = exit_code
+            app.exited_at = time.time()
+            uptime = app.exited_at - (app.started_at or app.exited_at)
+            self.logger.info(f"{app.name} exited with code {exit_code}")
+
+            if app.stop_requested:
+                app.state = AppState.STOPPED
+                return
+            if uptime >= app.policy.healthy_after:
+                app.consecutive_restarts = 0
+            if not app.policy.should_restart(exit_code, app.consecutive_restarts):
+                app.state = AppState.STOPPED if exit_code == 0 else AppState.FAILED
+                return
+
+            delay = app.policy.backoff(app.consecutive_restarts)
+            app.state = AppState.BACKOFF
+            app.consecutive_restarts += 1
+            self.logger.warning(
+                f"Restarting {app.name} in {delay:.1f}s "
+                f"(restart {app.consecutive_restarts}/{app.policy.max_restarts})"
+            )
+            # The crashed process' lock was released by the kernel on its exit.
+            await asyncio.sleep(delay)
+            try:
+                await self._spawn(app)
+            except OSError:
+                self.logger.exception(f"Could not restart {app.name}")
+                app.state = AppState.FAILED
+                return
+
+    async def _terminate(self, process: asyncio.subprocess.Process) -> None:
+        if process.returncode is not None:
+            return
+        process.terminate()
+        try:
+            await asyncio.wait_for(process.wait(), KILL_TIMEOUT)
+        except TimeoutError:
+            process.kill()
+            await process.wait()
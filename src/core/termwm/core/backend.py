@@ -0,0 +1,72 @@
+"""Interface between the terminal window manager and the desktop's windows.
+
+The window manager only ever needs a handful of operations on top-level windows:
+find them by title, restore them, place them and change their z-order. A
+`WindowBackend` provides them, the Windows one through the win32 API and an
+in-memory one anywhere else, which lets termwm run, and be exercised, on Linux.
+
+Operations work on batches of windows, so that a whole layout is applied in one
+call. Windows are looked up by title in an index of the enumerated windows, see
+`WindowRegistry`.
+"""
+
+import sys
+from dataclasses import dataclass
+from typing import Protocol
+
+WindowHandle = int
+
+
+@dataclass(frozen=True)
+class WindowPlacement:
+    """Where a window goes, by title."""
+
+    title: str
+    width: int
+    height: int
+    x: int
+    y: int
+
+    @classmethod
+    def from_properties(
+        cls, title: str, properties: tuple[int, int, int, int]
+    ) -> "WindowPlacement":
+        """Build a placement from a calculator's (width, height, x, y) tuple."""
+        width, height, x, y = properties
+        return cls(title, width, height, x, y)
+
+
+class WindowBackend(Protocol):
+    """Operations on the desktop's top-level windows."""
+
+    def enumerate_windows(self) -> list[tuple[WindowHandle, str]]:
+        """Return the handle and title of every visible, titled window, in z-order."""
+        ...
+
+    def restore(self, handles: list[WindowHandle]) -> None:
+        """Restore minimized or maximized windows to their normal state."""
+        ...
+
+    def place(self, placements: dict[WindowHandle, WindowPlacement]) -> None:
+        """Move and resize windows, all in one batch."""
+        ...
+
+    def set_topmost(self, handles: list[WindowHandle], *, topmost: bool) -> None:
+        """Put windows on top of the non-topmost ones, in order, or take them off."""
+        ...
+
+    def set_console_title(self, title: str) -> None:
+        """Set the title of the current process' console window."""
+        ...
+
+
+def get_default_backend() -> WindowBackend:
+    """Return the win32 backend on Windows, the in-memory one elsewhere."""
+    if sys.platform == "win32":
+        from src.core.termwm.helpers.win32_backend import Win32WindowBackend
+
+        return Win32WindowBackend()
+
+    from src.core.termwm.helpers.fake_backend import FakeWindowBackend
+
+    return FakeWindowBackend()
@@ -1,10 +1,16 @@
 """Constants for terminal window manager."""
 
 from src.config.settings import PROJECT_ROOT_PATH
+from src.core.termwm.core.types import Monitor
 
 MAIN_WINDOW_WIDTH = 600
 MAIN_WINDOW_HEIGHT = 260
-MAX_WINDOWS_PER_COLUMN = 1040 // MAIN_WINDOW_HEIGHT  # So currently 4
+SERVER_WINDOW_WIDTH = 700
+SERVER_WINDOW_HEIGHT = 400
+
+# Monitors the windows are laid out on, in the order slots fill them: the 1920x1080
+# monitor left of the main one, without its taskbar.
+MONITORS = (Monitor(x=-1920, y=0, width=1920, height=1040),)
 
 WINDOW_NAME_SUFFIX = "twm_"
 SERVER_WINDOW_NAME = "MY SERVER"
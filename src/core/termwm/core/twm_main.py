@@ -2,6 +2,7 @@ from typing import List, Optional
 
 import aiosqlite
 
+from src.core.termwm.core.backend import WindowBackend
 from src.core.termwm.core.types import SecondaryWindow, WinType
 from src.core.termwm.helpers.window_adjuster import WindowAdjuster
 from src.core.termwm.helpers.window_foreground_manager import (
@@ -20,8 +21,8 @@ logger = setup_logger(SCRIPT_NAME)
 
 
 class TerminalWindowManager:
-    def __init__(self) -> None:
-        self.adjuster = WindowAdjuster(logger=logger)
+    def __init__(self, backend: Optional[WindowBackend] = None) -> None:
+        self.adjuster = WindowAdjuster(logger=logger, backend=backend)
         self.calculator = WindowPropertiesCalculator(logger=logger)
         self.manager = WindowManager(self.adjuster, self.calculator, logger)
         self.foreground_manager = WindowForegroundManager(self.adjuster, logger)
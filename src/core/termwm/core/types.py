@@ -13,3 +13,13 @@ class SecondaryWindow:
     name: str
     width: int
     height: int
+
+
+@dataclass(frozen=True)
+class Monitor:
+    """Area of a monitor that windows can be laid out on, in desktop coordinates."""
+
+    x: int
+    y: int
+    width: int
+    height: int
@@ -0,0 +1,108 @@
+"""In-memory window backend, standing in for the desktop outside of Windows.
+
+Windows are plain records that can be opened with a delay, to mimic a console
+window showing up a while after its process started. The backend counts the calls
+it gets, which shows how many desktop enumerations and placement batches a layout
+costs, and can make each enumeration take time like a real one does.
+"""
+
+import itertools
+import time
+from dataclasses import dataclass
+from typing import final
+
+from src.core.termwm.core.backend import WindowHandle, WindowPlacement
+
+
+@dataclass
+class FakeWindow:
+    """A window of the fake desktop."""
+
+    handle: WindowHandle
+    title: str
+    visible_at: float
+    width: int = 0
+    height: int = 0
+    x: int = 0
+    y: int = 0
+    minimized: bool = False
+    topmost: bool = False
+
+
+@final
+class FakeWindowBackend:
+    """Keeps the desktop's windows in memory, see `WindowBackend`."""
+
+    def __init__(self, enumeration_seconds: float = 0.0) -> None:
+        """Start with an empty desktop.
+
+        Args:
+            enumeration_seconds: Time each enumeration of the windows blocks for.
+
+        """
+        self.enumeration_seconds = enumeration_seconds
+        self.windows: dict[WindowHandle, FakeWindow] = {}
+        self.z_order: list[WindowHandle] = []
+        """Handles of the topmost windows, the last one on top."""
+        self.console_handle: WindowHandle | None = None
+        self.enumerations = 0
+        self.place_batches = 0
+        self._handles = itertools.count(1)
+
+    def open_window(self, title: str, delay: float = 0.0) -> WindowHandle:
+        """Open a window, which becomes visible after `delay` seconds."""
+        handle = next(self._handles)
+        self.windows[handle] = FakeWindow(handle, title, time.monotonic() + delay)
+        return handle
+
+    def close_window(self, handle: WindowHandle) -> None:
+        """Close a window, if it is still open."""
+        self.windows.pop(handle, None)
+        if handle in self.z_order:
+            self.z_order.remove(handle)
+
+    def enumerate_windows(self) -> list[tuple[WindowHandle, str]]:
+        """List the windows that are visible by now."""
+        self.enumerations += 1
+        if self.enumeration_seconds:
+            time.sleep(self.enumeration_seconds)
+        now = time.monotonic()
+        return [
+            (handle, window.title)
+            for handle, window in self.windows.items()
+            if window.visible_at <= now
+        ]
+
+    def restore(self, handles: list[WindowHandle]) -> None:
+        """Restore the windows that are still open."""
+        for handle in handles:
+            if handle in self.windows:
+                self.windows[handle].minimized = False
+
+    def place(self, placements: dict[WindowHandle, WindowPlacement]) -> None:
+        """Place the windows that are still open, as one batch."""
+        self.place_batches += 1
+        for handle, placement in placements.items():
+            window = self.windows.get(handle)
+            if window is not None:
+                window.width, window.height = placement.width, placement.height
+                window.x, window.y = placement.x, placement.y
+
+    def set_topmost(self, handles: list[WindowHandle], *, topmost: bool) -> None:
+        """Change the windows' topmost state, in order."""
+        for handle in handles:
+            window = self.windows.get(handle)
+            if window is None:
+                continue
+            window.topmost = topmost
+            if handle in self.z_order:
+                self.z_order.remove(handle)
+            if topmost:
+                self.z_order.append(handle)
+
+    def set_console_title(self, title: str) -> None:
+        """Rename this process' console window, opening it on first use."""
+        if self.console_handle not in self.windows:
+            self.console_handle = self.open_window(title)
+        else:
+            self.windows[self.console_handle].title = title
@@ -0,0 +1,195 @@
+"""Layout of the managed windows on one or more monitors.
+
+Each slot owns a cell the size of a main window. Accepted slots fill columns of
+cells from the right edge of the monitors, denied slots from their left edge, top
+to bottom, and move on to the next monitor once a monitor's columns are full. The
+server window sits in the bottom left corner of the first monitor.
+
+The secondary windows of a slot are packed in its cell, right to left, on shelves:
+windows are taken from the tallest to the shortest, each put on the first shelf
+that has room left for it, or on a new shelf below the others (first fit
+decreasing height). A shelf is as tall as its tallest window, so windows of
+different heights never overlap.
+
+Layouts only depend on which slots are occupied and on their windows' sizes, so
+the plans are memoised on exactly that: refits of an unchanged desktop reuse them.
+"""
+
+from collections.abc import Sequence
+from functools import lru_cache
+from typing import final
+
+from src.core.termwm.core.backend import WindowPlacement
+from src.core.termwm.core.constants import (
+    MAIN_WINDOW_HEIGHT,
+    MAIN_WINDOW_WIDTH,
+    MONITORS,
+    SERVER_WINDOW_HEIGHT,
+    SERVER_WINDOW_WIDTH,
+)
+from src.core.termwm.core.types import Monitor, WinType
+
+PLAN_CACHE_SIZE = 256
+
+Properties = tuple[int, int, int, int]
+"""A window's (width, height, x, y)."""
+WindowSizes = tuple[tuple[int, int], ...]
+SlotsKey = tuple[tuple[int, WindowSizes], ...]
+"""Occupied slots with the (width, height) of their secondary windows."""
+
+
+@final
+class LayoutEngine:
+    """Computes and memoises where every managed window goes."""
+
+    def __init__(
+        self,
+        monitors: Sequence[Monitor] = MONITORS,
+        main_size: tuple[int, int] = (MAIN_WINDOW_WIDTH, MAIN_WINDOW_HEIGHT),
+        server_size: tuple[int, int] = (SERVER_WINDOW_WIDTH, SERVER_WINDOW_HEIGHT),
+        cache_size: int = PLAN_CACHE_SIZE,
+    ) -> None:
+        """Describe the screens to lay windows out on.
+
+        Args:
+            monitors: Monitors the slots fill, in order.
+            main_size: Width and height of main windows, which is also a slot's cell.
+            server_size: Width and height of the server window.
+            cache_size: Amount of plans and packed slots memoised.
+
+        Raises:
+            ValueError: If no monitor is given, or one cannot hold a single cell.
+
+        """
+        if not monitors:
+            e = "At least one monitor is needed to lay windows out"
+            raise ValueError(e)
+        self.monitors = tuple(monitors)
+        self.main_width, self.main_height = main_size
+        self.server_size = server_size
+        for monitor in self.monitors:
+            if monitor.width < self.main_width or monitor.height < self.main_height:
+                e = f"{monitor} cannot hold a {self.main_width}x{self.main_height} cell"
+                raise ValueError(e)
+        self._plan = lru_cache(maxsize=cache_size)(self._compute_plan)
+        self._pack_slot = lru_cache(maxsize=cache_size)(self._compute_slot)
+
+    def main_window_properties(
+        self, window_type: WinType, slot: int | None = None
+    ) -> Properties:
+        """Return the properties of a main window, or of the server's.
+
+        Raises:
+            ValueError: If no slot is given for an accepted or denied window.
+
+        """
+        if window_type == WinType.SERVER:
+            monitor = self.monitors[0]
+            width, height = self.server_size
+            return width, height, monitor.x, monitor.y + monitor.height - height
+        if slot is None:
+            e = "Slot number must be provided for ACCEPTED and DENIED windows."
+            raise ValueError(e)
+        x, y = self._cell_origin(window_type, slot)
+        return self.main_width, self.main_height, x, y
+
+    def secondary_windows_properties(
+        self, slot: int, sizes: WindowSizes
+    ) -> tuple[Properties, ...]:
+        """Return the properties of an accepted slot's secondary windows, in order."""
+        return self._pack_slot(slot, sizes)
+
+    def plan_slots(
+        self, slots_data: dict[int, list[tuple[str, int, int]]]
+    ) -> list[WindowPlacement]:
+        """Place every window of the accepted slots, from their database rows.
+
+        Slots without a main window are left out, as there is nothing to place.
+        """
+        occupied = {
+            slot: data
+            for slot, data in sorted(slots_data.items())
+            if len(data) > 0 and data[0][0] is not None
+        }
+        key: SlotsKey = tuple(
+            (slot, tuple((width, height) for _, width, height in data[1:]))
+            for slot, data in occupied.items()
+        )
+        placements = []
+        for data, slot_properties in zip(
+            occupied.values(), self._plan(key), strict=True
+        ):
+            placements.extend(
+                WindowPlacement.from_properties(title, props)
+                for (title, _, _), props in zip(data, slot_properties, strict=True)
+            )
+        return placements
+
+    def cache_stats(self) -> dict[str, object]:
+        """Return the hits and misses of the plans and packed slots caches."""
+        return {
+            name: cache.cache_info()._asdict()
+            for name, cache in (("plans", self._plan), ("slots", self._pack_slot))
+        }
+
+    def _compute_plan(self, key: SlotsKey) -> tuple[tuple[Properties, ...], ...]:
+        return tuple(
+            (
+                self.main_window_properties(WinType.ACCEPTED, slot),
+                *self._pack_slot(slot, sizes),
+            )
+            for slot, sizes in key
+        )
+
+    def _compute_slot(self, slot: int, sizes: WindowSizes) -> tuple[Properties, ...]:
+        cell_x, cell_y = self._cell_origin(WinType.ACCEPTED, slot)
+        positions = pack_shelves(sizes, self.main_width)
+        return tuple(
+            (width, height, cell_x + x, cell_y + y)
+            for (width, height), (x, y) in zip(sizes, positions, strict=True)
+        )
+
+    def _cell_origin(self, window_type: WinType, slot: int) -> tuple[int, int]:
+        # Slots fill the monitors in order, the last one takes any overflow
+        index = slot
+        monitor = self.monitors[-1]
+        for candidate in self.monitors[:-1]:
+            capacity = (candidate.height // self.main_height) * (
+                candidate.width // self.main_width
+            )
+            if index < capacity:
+                monitor = candidate
+                break
+            index -= capacity
+        per_column = monitor.height // self.main_height
+        column, row = divmod(index, per_column)
+        if window_type == WinType.ACCEPTED:
+            x = monitor.x + monitor.width - self.main_width * (1 + column)
+        else:
+            x = monitor.x + self.main_width * column
+        return x, monitor.y + self.main_height * row
+
+
+def pack_shelves(sizes: WindowSizes, width: int) -> list[tuple[int, int]]:
+    """Pack windows on shelves `width` wide, first fit by decreasing height.
+
+    Windows are aligned right on their shelf, and a window wider than the shelves
+    gets one of its own.
+
+    Returns:
+        The (x, y) offset of each window from the top left of the packing area, in
+        the order of `sizes`.
+
+    """
+    shelves: list[list[int]] = []  # [y, height, width left]
+    positions = [(0, 0)] * len(sizes)
+    for i in sorted(range(len(sizes)), key=lambda i: -sizes[i][1]):
+        window_width, window_height = sizes[i]
+        shelf = next((s for s in shelves if s[2] >= window_width), None)
+        if shelf is None:
+            y = shelves[-1][0] + shelves[-1][1] if shelves else 0
+            shelf = [y, window_height, width]
+            shelves.append(shelf)
+        positions[i] = (shelf[2] - window_width, shelf[0])
+        shelf[2] -= window_width
+    return positions
@@ -0,0 +1,120 @@
+"""Window backend for Windows, on top of the win32 API."""
+
+import ctypes
+from ctypes import wintypes
+from typing import final
+
+import pywintypes
+import win32con
+import win32gui
+from src.core.termwm.core.backend import WindowHandle, WindowPlacement
+from src.utils.helpers import construct_script_name
+from src.utils.logging_utils import setup_logger
+
+SCRIPT_NAME = construct_script_name(__file__)
+logger = setup_logger(SCRIPT_NAME)
+
+PLACE_FLAGS = win32con.SWP_NOZORDER | win32con.SWP_NOACTIVATE
+Z_ORDER_FLAGS = win32con.SWP_NOMOVE | win32con.SWP_NOSIZE
+
+# pywin32 does not wrap the deferred window positioning functions, they are called
+# from user32 directly
+user32 = ctypes.WinDLL("user32", use_last_error=True)
+user32.BeginDeferWindowPos.argtypes = (ctypes.c_int,)
+user32.BeginDeferWindowPos.restype = wintypes.HANDLE
+user32.DeferWindowPos.argtypes = (
+    wintypes.HANDLE,
+    wintypes.HWND,
+    wintypes.HWND,
+    ctypes.c_int,
+    ctypes.c_int,
+    ctypes.c_int,
+    ctypes.c_int,
+    wintypes.UINT,
+)
+user32.DeferWindowPos.restype = wintypes.HANDLE
+user32.EndDeferWindowPos.argtypes = (wintypes.HANDLE,)
+user32.EndDeferWindowPos.restype = wintypes.BOOL
+
+
+def _place_in_batch(placements: dict[WindowHandle, WindowPlacement]) -> None:
+    """Place windows in one deferred positioning batch.
+
+    Raises:
+        OSError: If the batch could not be started, extended or ended. A batch that
+            could not be extended is already discarded by Windows.
+
+    """
+    batch: int | None = user32.BeginDeferWindowPos(len(placements))
+    if not batch:
+        raise ctypes.WinError(ctypes.get_last_error())
+    for hwnd, p in placements.items():
+        batch = user32.DeferWindowPos(
+            batch, hwnd, None, p.x, p.y, p.width, p.height, PLACE_FLAGS
+        )
+        if not batch:
+            raise ctypes.WinError(ctypes.get_last_error())
+    if not user32.EndDeferWindowPos(batch):
+        raise ctypes.WinError(ctypes.get_last_error())
+
+
+@final
+class Win32WindowBackend:
+    """Finds and arranges the desktop's windows with win32gui."""
+
+    def enumerate_windows(self) -> list[tuple[WindowHandle, str]]:
+        """List the visible, titled windows in one `EnumWindows` pass."""
+        windows: list[tuple[WindowHandle, str]] = []
+
+        def collect(hwnd: int, _: None) -> bool:
+            if win32gui.IsWindowVisible(hwnd):
+                title = win32gui.GetWindowText(hwnd)
+                if title:
+                    windows.append((hwnd, title))
+            return True
+
+        win32gui.EnumWindows(collect, None)
+        return windows
+
+    def restore(self, handles: list[WindowHandle]) -> None:
+        """Restore windows, skipping the ones that were closed meanwhile."""
+        for hwnd in handles:
+            try:
+                win32gui.ShowWindow(hwnd, win32con.SW_RESTORE)
+            except pywintypes.error as e:
+                logger.warning(f"Could not restore window {hwnd}: {e}")
+
+    def place(self, placements: dict[WindowHandle, WindowPlacement]) -> None:
+        """Place every window in one deferred positioning batch.
+
+        Windows redraw once, when the batch ends. Should the batch fail, e.g. a
+        window was closed meanwhile, windows are placed one by one instead.
+        """
+        if not placements:
+            return
+        try:
+            _place_in_batch(placements)
+        except OSError as e:
+            logger.warning(f"Batched placement failed ({e}), placing one by one")
+            for hwnd, p in placements.items():
+                try:
+                    win32gui.SetWindowPos(
+                        hwnd, 0, p.x, p.y, p.width, p.height, PLACE_FLAGS
+                    )
+                except pywintypes.error as window_error:
+                    logger.warning(
+                        f"Could not place window <{p.title}>: {window_error}"
+                    )
+
+    def set_topmost(self, handles: list[WindowHandle], *, topmost: bool) -> None:
+        """Change the windows' topmost state, in order, see `WindowBackend`."""
+        insert_after = win32con.HWND_TOPMOST if topmost else win32con.HWND_NOTOPMOST
+        for hwnd in handles:
+            try:
+                win32gui.SetWindowPos(hwnd, insert_after, 0, 0, 0, 0, Z_ORDER_FLAGS)
+            except pywintypes.error as e:
+                logger.warning(f"Could not change z-order of window {hwnd}: {e}")
+
+    def set_console_title(self, title: str) -> None:
+        """Set the console's title in process, rather than through a `title` shell."""
+        ctypes.windll.kernel32.SetConsoleTitleW(title)
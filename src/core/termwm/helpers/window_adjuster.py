@@ -1,48 +1,121 @@
-import asyncio
-import os
 import time
+from dataclasses import dataclass
 from logging import Logger
 from typing import Optional
 
-import pygetwindow
+from src.core.termwm.core.backend import (
+    WindowBackend,
+    WindowHandle,
+    WindowPlacement,
+    get_default_backend,
+)
+from src.core.termwm.helpers.window_registry import WindowRegistry
+
+FIND_TIMEOUT = 2.0
+
+
+@dataclass(frozen=True)
+class LayoutTiming:
+    """Time spent in each phase of applying a layout, in milliseconds."""
+
+    windows: int
+    found: int
+    lookup_ms: float
+    restore_ms: float
+    apply_ms: float
+
+    def __str__(self) -> str:
+        return (
+            f"{self.found}/{self.windows} windows, lookup {self.lookup_ms:.1f}ms, "
+            f"restore {self.restore_ms:.1f}ms, apply {self.apply_ms:.1f}ms"
+        )
 
 
 class WindowAdjuster:
-    def __init__(self, logger: Logger) -> None:
+    def __init__(self, logger: Logger, backend: Optional[WindowBackend] = None) -> None:
         self.logger = logger
+        self.backend = backend if backend is not None else get_default_backend()
+        self.registry = WindowRegistry(self.backend, logger)
+        self.last_timing: Optional[LayoutTiming] = None
+
+    async def find_windows(
+        self, titles: set[str], timeout: float = FIND_TIMEOUT
+    ) -> dict[str, WindowHandle]:
+        """Look all windows up at once in the registry's shared index.
+
+        Windows that are not found yet are waited for until the timeout, a timeout
+        of 0 looks them up once.
+        """
+        found = await self.registry.find(titles, timeout)
+        missing = titles - found.keys()
+        if missing and timeout:
+            self.logger.warning(
+                f"Windows {sorted(missing)} not found within {timeout}s."
+            )
+        return found
 
     async def find_window(
-        self, title: str, timeout: int = 2
-    ) -> Optional[pygetwindow.Win32Window]:
-        start_time = time.time()
-        duration = 0.0
-        while duration < timeout:
-            window = pygetwindow.getWindowsWithTitle(title)
-            if window:
-                return window[0]
-            await asyncio.sleep(0.01)
-            duration = time.time() - start_time
-        self.logger.warning(f"Window <{title}> not found within {timeout}s.")
-        return None
+        self, title: str, timeout: float = FIND_TIMEOUT
+    ) -> Optional[WindowHandle]:
+        return (await self.find_windows({title}, timeout)).get(title)
+
+    async def apply_layout(self, placements: list[WindowPlacement]) -> LayoutTiming:
+        """Place every window of a layout in one pass: look up, restore, apply."""
+        started_at = time.perf_counter()
+        handles = await self.find_windows({p.title for p in placements})
+        looked_up_at = time.perf_counter()
+
+        self.backend.restore(list(handles.values()))
+        restored_at = time.perf_counter()
+
+        self.backend.place(
+            {handles[p.title]: p for p in placements if p.title in handles}
+        )
+        applied_at = time.perf_counter()
+
+        timing = LayoutTiming(
+            windows=len(placements),
+            found=len(handles),
+            lookup_ms=(looked_up_at - started_at) * 1000,
+            restore_ms=(restored_at - looked_up_at) * 1000,
+            apply_ms=(applied_at - restored_at) * 1000,
+        )
+        self.last_timing = timing
+        self.logger.info(f"Layout applied: {timing}.")
+        return timing
 
     async def adjust_window(
-        self,
-        title: str,
-        properties: tuple[int, int, int, int],
-        resize: bool = True,
-        move: bool = True,
+        self, title: str, properties: tuple[int, int, int, int]
     ) -> None:
-        window = await self.find_window(title)
-        if window:
-            window.restore()
-            if resize:
-                window.resizeTo(properties[0], properties[1])
-            if move:
-                window.moveTo(properties[2], properties[3])
-            self.logger.info(f"Window <{title}> adjusted successfully.")
-        else:
-            self.logger.error(f"Was not able to adjust window {title}.")
+        await self.apply_layout([WindowPlacement.from_properties(title, properties)])
+
+    async def bring_to_front(self, titles: list[str]) -> LayoutTiming:
+        """Restore the windows and raise them above the others."""
+        started_at = time.perf_counter()
+        handles = await self.find_windows(set(titles), timeout=0)
+        ordered = [handles[title] for title in titles if title in handles]
+        looked_up_at = time.perf_counter()
+
+        self.backend.restore(ordered)
+        restored_at = time.perf_counter()
+
+        # Made topmost from the bottom up, so that they stack in order, then
+        # released so that they are not pinned above everything else.
+        self.backend.set_topmost(ordered[::-1], topmost=True)
+        self.backend.set_topmost(ordered, topmost=False)
+        applied_at = time.perf_counter()
+
+        timing = LayoutTiming(
+            windows=len(titles),
+            found=len(ordered),
+            lookup_ms=(looked_up_at - started_at) * 1000,
+            restore_ms=(restored_at - looked_up_at) * 1000,
+            apply_ms=(applied_at - restored_at) * 1000,
+        )
+        self.last_timing = timing
+        self.logger.info(f"Windows brought to front: {timing}.")
+        return timing
 
     def set_window_title(self, title: str) -> None:
-        os.system(f"title {title}")
+        self.backend.set_console_title(title)
         self.logger.debug(f"Window title set to <{title}>.")
@@ -3,6 +3,7 @@ from typing import Optional
 
 import aiosqlite
 import src.core.termwm.slots_db_handler as sdh
+from src.core.termwm.core.backend import WindowPlacement
 from src.core.termwm.core.constants import (
     MAIN_WINDOW_HEIGHT,
     MAIN_WINDOW_WIDTH,
@@ -52,8 +53,12 @@ class WindowManager:
         properties = self.calculator.calculate_secondary_window_properties(
             slot, secondary_windows
         )
-        for window, props in zip(secondary_windows, properties):
-            await self.adjuster.adjust_window(window.name, props)
+        await self.adjuster.apply_layout(
+            [
+                WindowPlacement.from_properties(window.name, props)
+                for window, props in zip(secondary_windows, properties)
+            ]
+        )
         self.logger.info(f"Secondary windows managed for slot {slot}.")
 
     async def initially_manage_window(
@@ -72,20 +77,19 @@ class WindowManager:
         properties = self.calculator.calculate_main_window_properties(window_type, slot)
         await self.adjuster.adjust_window(title, properties)
 
-        if window_type == WinType.ACCEPTED and slot is not None:
-            data = self._generate_window_data(title)
-            await sdh.occupy_slot_with_data(conn, slot, data)
-
         return slot, window_name
 
     async def _assign_slot_and_name_window(
         self, conn: aiosqlite.Connection, window_type: WinType, window_name: str
     ) -> tuple[Optional[int], str]:
         if window_type == WinType.ACCEPTED:
-            slot_id = await sdh.get_first_free_slot(conn)
+            # Claimed along with the main window's data, so that apps starting at
+            # the same time cannot end up in the same slot.
+            title = window_name
+            data = self._generate_window_data(title)
+            slot_id = await sdh.claim_first_free_slot(conn, data)
             if slot_id is None:
                 raise ValueError("No available slot for an accepted window.")
-            title = window_name
             self.adjuster.set_window_title(title)
 
         elif window_type == WinType.DENIED:
@@ -1,84 +1,41 @@
 from logging import Logger
 from typing import Optional
 
-from src.core.termwm.core.constants import (
-    MAIN_WINDOW_HEIGHT,
-    MAIN_WINDOW_WIDTH,
-    MAX_WINDOWS_PER_COLUMN,
-)
+from src.core.termwm.core.backend import WindowPlacement
 from src.core.termwm.core.types import SecondaryWindow, WinType
+from src.core.termwm.helpers.layout_engine import LayoutEngine
 
 
 class WindowPropertiesCalculator:
-    def __init__(self, logger: Logger) -> None:
+    def __init__(self, logger: Logger, engine: Optional[LayoutEngine] = None) -> None:
         self.logger = logger
+        self.engine = engine if engine is not None else LayoutEngine()
 
     def calculate_main_window_properties(
         self, window_type: WinType, slot: Optional[int] = None
     ) -> tuple[int, int, int, int]:
-        width = MAIN_WINDOW_WIDTH
-        height = MAIN_WINDOW_HEIGHT
-        x_pos = None
-        y_pos = None
-
-        if window_type in (WinType.ACCEPTED, WinType.DENIED):
-            if slot is None:
-                raise ValueError(
-                    "Slot number must be provided for ACCEPTED and DENIED windows."
-                )
-
-            if window_type == WinType.ACCEPTED:
-                x_pos = -width * (1 + slot // MAX_WINDOWS_PER_COLUMN)
-            elif window_type == WinType.DENIED:
-                x_pos = -1920 + width * (slot // MAX_WINDOWS_PER_COLUMN)
-
-            y_pos = height * (slot % MAX_WINDOWS_PER_COLUMN)
-
-        elif window_type == WinType.SERVER:
-            width = 700
-            height = 400
-            x_pos = -1920
-            y_pos = 640
-
+        properties = self.engine.main_window_properties(window_type, slot)
         self.logger.debug(
             f"Calculated properties for {window_type.name} window at slot number {slot}"
-            f": ({width}, {height}, {x_pos}, {y_pos})."
+            f": {properties}."
         )
-
-        return width, height, x_pos, y_pos
+        return properties
 
     def calculate_secondary_window_properties(
         self, slot: int, secondary_windows: list[SecondaryWindow]
     ) -> list[tuple[int, int, int, int]]:
-        properties = []
-        x_pos_offset = MAIN_WINDOW_WIDTH
-        y_pos_offset = 0
-
-        for window in secondary_windows:
-            width = window.width
-            height = window.height
-
-            if x_pos_offset - width < 0:
-                x_pos_offset = MAIN_WINDOW_WIDTH
-                y_pos_offset += height
-
-            x_pos = (
-                x_pos_offset
-                - width
-                - MAIN_WINDOW_WIDTH * (1 + slot // MAX_WINDOWS_PER_COLUMN)
-            )
-            y_pos = y_pos_offset + (
-                MAIN_WINDOW_HEIGHT * (slot % MAX_WINDOWS_PER_COLUMN)
-            )
-
-            props = (width, height, x_pos, y_pos)
-            properties.append(props)
-
-            x_pos_offset -= width
-
+        sizes = tuple((window.width, window.height) for window in secondary_windows)
+        properties = list(self.engine.secondary_windows_properties(slot, sizes))
         self.logger.debug(
             f"Secondary properties for {[window.name for window in secondary_windows]} "
             f"calculated are {properties}"
         )
-
         return properties
+
+    def calculate_slots_layout(
+        self, slots_data: dict[int, list[tuple[str, int, int]]]
+    ) -> list[WindowPlacement]:
+        """Place the windows of every accepted slot, reusing memoised plans."""
+        placements = self.engine.plan_slots(slots_data)
+        self.logger.debug(f"Slots layout calculated: {self.engine.cache_stats()}")
+        return placements
@@ -2,7 +2,7 @@ from logging import Logger
 
 import aiosqlite
 import src.core.termwm.slots_db_handler as sdh
-from src.core.termwm.core.types import SecondaryWindow, WinType
+from src.core.termwm.core.backend import WindowPlacement
 from src.core.termwm.helpers.window_adjuster import WindowAdjuster
 from src.core.termwm.helpers.window_foreground_manager import (
     WindowForegroundManager,
@@ -30,7 +30,13 @@ class WindowRefitter:
     ) -> dict[int, int]:
         free_slots = await sdh.get_all_free_slots(conn)
         occupied_slots = await sdh.get_all_occupied_slots(conn)
-        occupied_slots.reverse()
+        return self.pair_vacant_slots(free_slots, occupied_slots)
+
+    def pair_vacant_slots(
+        self, free_slots: list[int], occupied_slots: list[int]
+    ) -> dict[int, int]:
+        """Pair the last occupied slots with the first free slots before them."""
+        occupied_slots = sorted(occupied_slots, reverse=True)
         pairs = {}
         shorter_length = min(len(free_slots), len(occupied_slots))
         if free_slots:
@@ -45,49 +51,44 @@ class WindowRefitter:
             self.logger.info("No Vacant pairs found")
         return pairs
 
-    async def readjust_main_window(self, slot: int, title: str) -> None:
-        props = self.calculator.calculate_main_window_properties(WinType.ACCEPTED, slot)
-        await self.adjuster.adjust_window(title, props)
+    def compute_layout(
+        self, slots_data: dict[int, list[tuple[str, int, int]]]
+    ) -> list[WindowPlacement]:
+        """Compute where every window of every slot goes."""
+        self.logger.info(f"Rearrangement data obtained: {slots_data}")
+        return self.calculator.calculate_slots_layout(slots_data)
 
-    async def readjust_secondary_windows(
-        self, free_slot: int, data: list[tuple[str, int, int]]
+    async def reset_windows_positions(
+        self,
+        conn: aiosqlite.Connection,
+        slots_data: dict[int, list[tuple[str, int, int]]] | None = None,
     ) -> None:
-        secondary_windows = [
-            SecondaryWindow(data[i][0], data[i][1], data[i][2])
-            for i in range(1, len(data))
-        ]
-
-        properties = self.calculator.calculate_secondary_window_properties(
-            free_slot, secondary_windows
-        )
-
-        for window, props in zip(secondary_windows, properties):
-            await self.adjuster.adjust_window(window.name, props)
-
-    async def reset_windows_positions(self, conn: aiosqlite.Connection) -> None:
-        occupied_slots = await sdh.get_all_occupied_slots(conn)
-        for slot in occupied_slots:
-            data = await sdh.get_full_data(conn, slot)
-            self.logger.info(f"Rearrangement data obtained for slot {slot}: {data}")
-
-            if data is not None and len(data) > 0 and len(data[0]) > 0:
-                await self.readjust_main_window(slot, data[0][0])
-                await self.readjust_secondary_windows(slot, data)
+        if slots_data is None:
+            slots_data = await sdh.get_all_slots_data(conn)
+        # Every window is looked up and placed in a single pass
+        await self.adjuster.apply_layout(self.compute_layout(slots_data))
 
     async def refit_all_windows(self, conn: aiosqlite.Connection) -> None:
         self.logger.info("Refitting all windows...")
-        pairs = await self.search_for_vacant_slots(conn) or {}
-
-        for slot, new_slot in pairs.items():
-            data = await sdh.get_full_data(conn, slot)
-            self.logger.info(f"Rearrangement data obtained: {data}")
+        # The whole refit reads the slots twice and writes them in one transaction
+        slots_data = await sdh.get_all_slots_data(conn)
+        free_slots = await sdh.get_all_free_slots(conn)
+        pairs = self.pair_vacant_slots(free_slots, list(slots_data))
 
-            if data is not None and len(data) > 0 and len(data[0]) > 0:
-                await sdh.free_slot(conn, slot)
-                await sdh.occupy_slot_with_data(conn, new_slot, data)
-                await self.readjust_main_window(new_slot, data[0][0])
-                await self.readjust_secondary_windows(new_slot, data)
+        # Moves carry the windows and lease along, slots without a main window to
+        # move are left where they are
+        plan = sdh.LayoutPlan(
+            moves={
+                slot: new_slot
+                for slot, new_slot in pairs.items()
+                if len(slots_data[slot]) > 0 and len(slots_data[slot][0]) > 0
+            }
+        )
+        if plan and await sdh.apply_layout_plan(conn, plan):
+            slots_data = {
+                plan.moves.get(slot, slot): data for slot, data in slots_data.items()
+            }
 
-        await self.reset_windows_positions(conn)
+        await self.reset_windows_positions(conn, slots_data)
         await self.foreground_manager.bring_windows_to_foreground(conn)
         self.logger.info("Windows refitted.")
@@ -0,0 +1,139 @@
+"""Index of the desktop's windows by title, shared by every pending lookup.
+
+Enumerating the desktop's windows is what looking a window up costs, and it used to
+be done by every lookup, every 10ms, until its window showed up. The registry keeps
+the last enumeration indexed by title instead: lookups are answered from the index
+when it is fresh, and the ones still waiting for their window are all resolved by a
+single enumeration tick, which only runs while lookups are pending.
+"""
+
+import asyncio
+import contextlib
+import time
+from dataclasses import dataclass, field
+from logging import Logger
+from typing import final
+
+from src.core.termwm.core.backend import WindowBackend, WindowHandle
+
+TICK_INTERVAL = 0.01
+"""Seconds between enumerations while lookups are pending, also the index's
+freshness: an index older than that is refreshed before answering a lookup."""
+
+
+@dataclass
+class _Lookup:
+    pending: set[str]
+    found: dict[str, WindowHandle] = field(default_factory=dict)
+    done: asyncio.Event = field(default_factory=asyncio.Event)
+
+
+@final
+class WindowRegistry:
+    """Windows by title, from enumerations shared by all lookups."""
+
+    def __init__(
+        self,
+        backend: WindowBackend,
+        logger: Logger,
+        tick_interval: float = TICK_INTERVAL,
+    ) -> None:
+        """Start with an empty index, filled by the first lookup.
+
+        Args:
+            backend: Backend enumerating the desktop's windows.
+            logger: Logger instance.
+            tick_interval: Seconds between enumerations while lookups are pending.
+
+        """
+        self.backend = backend
+        self.logger = logger
+        self.tick_interval = tick_interval
+        self._titles: dict[WindowHandle, str] = {}
+        self._by_title: dict[str, WindowHandle] = {}
+        self._refreshed_at = float("-inf")
+        self._lookups: list[_Lookup] = []
+        self._ticker: asyncio.Task[None] | None = None
+        self.enumerations = 0
+        self.lookups = 0
+
+    def refresh(self) -> None:
+        """Enumerate the windows, reindexing them if they changed since last time."""
+        titles = dict(self.backend.enumerate_windows())
+        self.enumerations += 1
+        self._refreshed_at = time.monotonic()
+        if titles == self._titles:
+            return
+        self._titles = titles
+        self._by_title = {}
+        for handle, title in titles.items():
+            self._by_title.setdefault(title, handle)
+
+    def lookup(self, title: str) -> WindowHandle | None:
+        """Find a window in the index, as of the last enumeration.
+
+        A title matches a window with that exact title, or else the first window, in
+        z-order, whose title contains it, case insensitively.
+        """
+        handle = self._by_title.get(title)
+        if handle is None:
+            wanted = title.upper()
+            handle = next(
+                (h for h, t in self._titles.items() if wanted in t.upper()), None
+            )
+        return handle
+
+    async def find(self, titles: set[str], timeout: float) -> dict[str, WindowHandle]:
+        """Find windows by title, waiting up to `timeout` for the missing ones.
+
+        Returns:
+            The handle of each title's window, for the titles that were found.
+
+        """
+        self.lookups += 1
+        if time.monotonic() - self._refreshed_at >= self.tick_interval:
+            self.refresh()
+        lookup = _Lookup(set(titles))
+        self._resolve(lookup)
+        if not lookup.pending or timeout <= 0:
+            return lookup.found
+
+        self._lookups.append(lookup)
+        if self._ticker is None:
+            self._ticker = asyncio.create_task(self._tick())
+        try:
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(lookup.done.wait(), timeout)
+        finally:
+            self._lookups.remove(lookup)
+        return lookup.found
+
+    def stats(self) -> dict[str, object]:
+        """Return how many lookups were made and how many enumerations they cost."""
+        return {
+            "lookups": self.lookups,
+            "enumerations": self.enumerations,
+            "indexed_windows": len(self._titles),
+            "pending_lookups": len(self._lookups),
+        }
+
+    def _resolve(self, lookup: _Lookup) -> None:
+        for title in list(lookup.pending):
+            handle = self.lookup(title)
+            if handle is not None:
+                lookup.found[title] = handle
+                lookup.pending.discard(title)
+        if not lookup.pending:
+            lookup.done.set()
+
+    async def _tick(self) -> None:
+        try:
+            while self._lookups:
+                await asyncio.sleep(self.tick_interval)
+                if not self._lookups:
+                    break
+                self.refresh()
+                for lookup in self._lookups:
+                    self._resolve(lookup)
+        finally:
+            self._ticker = None
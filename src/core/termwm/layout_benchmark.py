@@ -0,0 +1,201 @@
+"""Compare applying a refit window by window, slot by slot and in one batched pass.
+
+Runs on the in-memory window backend, whose windows show up with a delay like the
+console windows of apps that are still starting, and whose every enumeration of the
+desktop blocks for a while like a real one does. Every slot is filled with windows,
+some of which never show up (e.g. their app exited), then their layout is applied:
+- per window: each window is looked up, polled for and placed on its own, the way
+  the window manager used to do it. Every missing window costs a lookup timeout.
+- per slot: the windows of each slot are applied as a layout of their own, all
+  slots at the same time, as independent callers would. Their lookups share the
+  window registry's enumerations.
+- batched: the refitter looks all windows up at once and places them in one batch.
+  Missing windows cost a single lookup timeout, shared by all of them.
+
+The wall time, desktop enumerations and placement batches of each are reported, and
+the windows' final positions checked against the layout.
+
+Usage:
+    python -m src.core.termwm.layout_benchmark --windows-per-slot 3 --missing 2
+
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Protocol, cast
+
+import src.core.termwm.slots_db_handler as sdh
+from src.core.termwm.core.backend import WindowPlacement
+from src.core.termwm.core.constants import MAIN_WINDOW_HEIGHT, MAIN_WINDOW_WIDTH
+from src.core.termwm.core.twm_main import TerminalWindowManager
+from src.core.termwm.helpers.fake_backend import FakeWindowBackend
+
+SECONDARY_WINDOW_SIZE = (200, 130)
+
+
+class Args(Protocol):
+    """Protocol for command-line arguments."""
+
+    windows_per_slot: int
+    spread: float
+    enumeration_ms: float
+    missing: int
+
+
+def build_slots_data(windows_per_slot: int) -> dict[int, list[tuple[str, int, int]]]:
+    """Return the windows of every slot, a main window and its secondaries."""
+    return {
+        slot: [(f"twm_app{slot}", MAIN_WINDOW_WIDTH, MAIN_WINDOW_HEIGHT)]
+        + [
+            (f"app{slot}_secondary{i}", *SECONDARY_WINDOW_SIZE)
+            for i in range(1, windows_per_slot)
+        ]
+        for slot in range(sdh.AMOUNT_OF_SLOTS)
+    }
+
+
+def open_windows(
+    backend: FakeWindowBackend,
+    placements: list[WindowPlacement],
+    spread: float,
+    missing: int,
+) -> list[WindowPlacement]:
+    """Open the layout's windows but the last `missing` ones, over `spread` seconds.
+
+    Returns:
+        The placements of the opened windows.
+
+    """
+    opened = placements[: len(placements) - missing]
+    for i, placement in enumerate(opened):
+        backend.open_window(placement.title, delay=spread * i / len(opened))
+    return opened
+
+
+def check_positions(
+    backend: FakeWindowBackend, placements: list[WindowPlacement]
+) -> int:
+    """Return how many windows are not where the layout puts them."""
+    positions = {
+        window.title: (window.width, window.height, window.x, window.y)
+        for window in backend.windows.values()
+    }
+    return sum(
+        positions.get(p.title) != (p.width, p.height, p.x, p.y) for p in placements
+    )
+
+
+async def run_benchmark(
+    windows_per_slot: int, spread: float, enumeration_ms: float, missing: int
+) -> dict[str, dict[str, float]]:
+    """Apply the layout both ways, each on a fresh fake desktop.
+
+    Raises:
+        RuntimeError: If windows were not placed where the layout puts them.
+
+    """
+    slots_data = build_slots_data(windows_per_slot)
+    results: dict[str, dict[str, float]] = {}
+    with tempfile.TemporaryDirectory() as temp_dir:
+        conn = await sdh.create_connection(Path(temp_dir) / "slots.db")
+        if conn is None:
+            e = "Could not open a slots database"
+            raise RuntimeError(e)
+        try:
+            for mode in ("per_window", "per_slot", "batched"):
+                backend = FakeWindowBackend(enumeration_seconds=enumeration_ms / 1000)
+                twm = TerminalWindowManager(backend)
+                placements = twm.refitter.compute_layout(slots_data)
+                opened = open_windows(backend, placements, spread, missing)
+
+                started_at = time.perf_counter()
+                if mode == "per_window":
+                    for p in placements:
+                        await twm.adjuster.adjust_window(
+                            p.title, (p.width, p.height, p.x, p.y)
+                        )
+                elif mode == "per_slot":
+                    await asyncio.gather(
+                        *(
+                            twm.adjuster.apply_layout(
+                                twm.refitter.compute_layout({slot: data})
+                            )
+                            for slot, data in slots_data.items()
+                        )
+                    )
+                else:
+                    await twm.refitter.reset_windows_positions(conn, slots_data)
+                elapsed_ms = (time.perf_counter() - started_at) * 1000
+
+                misplaced = check_positions(backend, opened)
+                if misplaced:
+                    e = f"{misplaced} windows misplaced in {mode} mode"
+                    raise RuntimeError(e)
+                results[mode] = {
+                    "windows": len(placements),
+                    "missing": missing,
+                    "wall_ms": elapsed_ms,
+                    "enumerations": backend.enumerations,
+                    "place_batches": backend.place_batches,
+                }
+        finally:
+            await conn.close()
+    return results
+
+
+def main() -> None:
+    """Parse arguments, run the benchmark and print the results."""
+    parser = argparse.ArgumentParser(
+        description="Compare per window and batched layout application."
+    )
+    parser.add_argument("--windows-per-slot", type=int, default=3)
+    parser.add_argument(
+        "--spread",
+        type=float,
+        default=0.2,
+        help="Seconds over which the windows show up",
+    )
+    parser.add_argument(
+        "--enumeration-ms",
+        type=float,
+        default=2.0,
+        help="Time each enumeration of the desktop's windows takes",
+    )
+    parser.add_argument(
+        "--missing",
+        type=int,
+        default=2,
+        help="Windows of the layout that never show up",
+    )
+    args = cast("Args", cast("object", parser.parse_args()))
+    if not 0 <= args.missing < args.windows_per_slot * sdh.AMOUNT_OF_SLOTS:
+        parser.error("--missing must leave at least one window to place")
+    if not 1 <= args.windows_per_slot <= sdh.MAX_AMOUNT_OF_WINDOWS:
+        parser.error(f"--windows-per-slot must be in 1..{sdh.MAX_AMOUNT_OF_WINDOWS}")
+
+    # Layouts log every slot and pass, which would dwarf the placements' cost.
+    logging.disable(logging.INFO)
+    try:
+        results = asyncio.run(
+            run_benchmark(
+                args.windows_per_slot, args.spread, args.enumeration_ms, args.missing
+            )
+        )
+    except RuntimeError as e:
+        sys.exit(str(e))
+    for mode, stats in results.items():
+        formatted = ", ".join(
+            f"{k} {v:.1f}" if isinstance(v, float) else f"{k} {v}"
+            for k, v in stats.items()
+        )
+        print(f"{mode:>10}: {formatted}")
+    print("Every window that showed up was placed where the layout puts it.")
+
+
+if __name__ == "__main__":
+    main()
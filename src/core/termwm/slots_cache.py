@@ -0,0 +1,160 @@
+"""Read-through, in-memory cache of the slots database tables.
+
+The slots tables are tiny and read far more often than written: every windows refit
+and foreground pass lists the windows again. A `SlotsCache` keeps a snapshot of the
+slots, windows and denied slots tables, and answers reads from it for as long as
+the database is unchanged.
+
+Changes are detected with `PRAGMA data_version`, which changes whenever another
+connection commits to the database. It is asked to a dedicated synchronous
+connection, so checking the cache costs a few microseconds on the calling thread
+instead of a round trip through aiosqlite's worker thread. As that connection never
+writes, commits from the app's own connection are detected like any other.
+"""
+
+import sqlite3
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import cast, final
+
+import aiosqlite
+
+WindowData = list[tuple[str, int, int]]
+
+
+@dataclass(frozen=True)
+class SlotsSnapshot:
+    """The content of the slots tables at a given data version."""
+
+    data_version: int
+    slots: dict[int, bool]
+    """Slot id: whether the slot is open, for every slot."""
+    windows: dict[int, WindowData]
+    """Slot id: windows of the slot, by index, for slots that have windows."""
+    denied_slots: dict[int, bool]
+    """Denied slot id: whether the slot is open, for every denied slot."""
+    names: list[str] = field(default_factory=list)
+    """Every window name, main windows first, then each rank of secondaries."""
+    main_names: dict[str, int] = field(default_factory=dict)
+    """Main window name: id of its slot."""
+
+    @property
+    def free_slots(self) -> list[int]:
+        """Ids of the open slots."""
+        return [slot_id for slot_id, is_open in self.slots.items() if is_open]
+
+    @property
+    def occupied_slots(self) -> list[int]:
+        """Ids of the occupied slots."""
+        return [slot_id for slot_id, is_open in self.slots.items() if not is_open]
+
+
+# The three tables in a single statement, which reads them at a same point in time
+# without a transaction (that the app's connection may already have open), tagged
+# with the table each row comes from.
+SNAPSHOT_SQL = """
+    SELECT 'slots', id, NULL, is_open, NULL, NULL FROM slots
+    UNION ALL
+    SELECT 'windows', slot_id, idx, name, width, height FROM windows
+    UNION ALL
+    SELECT 'denied_slots', id, NULL, is_open, NULL, NULL FROM denied_slots
+    ORDER BY 1, 2, 3"""
+
+
+async def load_snapshot(
+    conn: aiosqlite.Connection, data_version: int = 0
+) -> SlotsSnapshot:
+    """Read the slots tables.
+
+    Args:
+        conn: Connection to the slots database.
+        data_version: The database's data version, read before the tables are.
+
+    Raises:
+        aiosqlite.Error: If the tables cannot be read.
+
+    """
+    slots: dict[int, bool] = {}
+    denied_slots: dict[int, bool] = {}
+    windows: dict[int, WindowData] = {}
+    ranked_names: list[tuple[int, int, str]] = []
+    main_names: dict[str, int] = {}
+    async with conn.execute(SNAPSHOT_SQL) as cur:
+        rows = await cur.fetchall()
+
+    for table, slot_id, idx, value, width, height in rows:
+        if table == "slots":
+            slots[slot_id] = bool(value)
+        elif table == "denied_slots":
+            denied_slots[slot_id] = bool(value)
+        elif value is not None or width is not None or height is not None:
+            window = cast("tuple[str, int, int]", (value, width, height))
+            windows.setdefault(slot_id, []).append(window)
+            if value is not None:
+                ranked_names.append((idx, slot_id, value))
+                if idx == 0:
+                    main_names.setdefault(value, slot_id)
+
+    return SlotsSnapshot(
+        data_version=data_version,
+        slots=slots,
+        windows=windows,
+        denied_slots=denied_slots,
+        names=[name for _, _, name in sorted(ranked_names)],
+        main_names=main_names,
+    )
+
+
+@final
+class SlotsCache:
+    """Snapshot of the slots tables, reloaded when the database changed."""
+
+    def __init__(self, db_file: str | Path, timeout: float) -> None:
+        """Open the connection used to watch the database's data version.
+
+        Args:
+            db_file: Path of the slots database.
+            timeout: Seconds to wait for the database to be unlocked.
+
+        """
+        self._watcher = sqlite3.connect(db_file, timeout=timeout)
+        self._snapshot: SlotsSnapshot | None = None
+        self.hits = 0
+        self.misses = 0
+
+    def data_version(self) -> int:
+        """Return the database's current data version."""
+        row = self._watcher.execute("PRAGMA data_version").fetchone()
+        return int(row[0])
+
+    async def get(self, conn: aiosqlite.Connection) -> SlotsSnapshot:
+        """Return the snapshot of the tables, reloaded through conn if outdated.
+
+        Raises:
+            aiosqlite.Error: If the tables cannot be read.
+
+        """
+        data_version = self.data_version()
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.data_version == data_version:
+            self.hits += 1
+            return snapshot
+        self.misses += 1
+        self._snapshot = await load_snapshot(conn, data_version)
+        return self._snapshot
+
+    def stats(self) -> dict[str, object]:
+        """Return the cache's hit and miss counts."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            "data_version": None
+            if self._snapshot is None
+            else self._snapshot.data_version,
+        }
+
+    def close(self) -> None:
+        """Close the watcher connection."""
+        self._watcher.close()
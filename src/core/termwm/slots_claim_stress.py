@@ -0,0 +1,176 @@
+"""Stress the slots database with many apps claiming slots at the same time.
+
+Every claimer is a separate process with its own connection, like starting apps, and
+they are all released at once by a barrier. Each one claims a slot, accepted or
+denied, and reports it once all of them are done, so that no slot is leased to an
+exited claimer. Over several rounds, the check fails if a slot was handed
+to two claimers, if a free slot was left unclaimed while a claimer went without,
+or if a claimer hit a database error (e.g. "database is locked").
+
+With `--racy`, accepted slots are claimed the way they were before atomic claims:
+read the first free slot, then occupy it, which shows the double allocations.
+
+Usage:
+    python -m src.core.termwm.slots_claim_stress --claimers 48 --rounds 5
+
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import sys
+import tempfile
+from collections import Counter
+from multiprocessing.synchronize import Barrier
+from pathlib import Path
+from typing import Protocol, cast
+
+import src.core.termwm.slots_db_handler as sdh
+
+BARRIER_TIMEOUT = 60.0
+CLAIMER_TIMEOUT = 120.0
+
+
+class Args(Protocol):
+    """Protocol for command-line arguments."""
+
+    claimers: int
+    rounds: int
+    racy: bool
+
+
+async def _claim(db_file: Path, index: int, barrier: Barrier, *, racy: bool) -> str:
+    conn = await sdh.create_connection(db_file)
+    if conn is None:
+        return "error"
+    try:
+        barrier.wait(BARRIER_TIMEOUT)
+        data = [(f"claimer_{index}", 600, 260)]
+        if index % 2:
+            kind = "denied"
+            slot_id = await sdh.occupy_first_free_denied_slot(conn)
+        elif racy:
+            kind = "accepted"
+            slot_id = await sdh.get_first_free_slot(conn)
+            if slot_id is not None:
+                await sdh.occupy_slot_with_data(conn, slot_id, data)
+        else:
+            kind = "accepted"
+            slot_id = await sdh.claim_first_free_slot(conn, data)
+        # Stay alive until every claimer is done, as the slot of a claimer that
+        # exited would rightfully be reclaimed by the next ones
+        barrier.wait(BARRIER_TIMEOUT)
+        return "none" if slot_id is None else f"{kind} {slot_id}"
+    finally:
+        await conn.close()
+
+
+def claimer(
+    db_file: Path,
+    index: int,
+    barrier: Barrier,
+    results: "multiprocessing.Queue[tuple[int, str]]",
+    racy: bool,  # noqa: FBT001
+) -> None:
+    """Process target, claim a slot and put the outcome in the results queue."""
+    try:
+        outcome = asyncio.run(_claim(db_file, index, barrier, racy=racy))
+    except Exception as e:  # noqa: BLE001
+        outcome = f"error {e!r}"
+    results.put((index, outcome))
+
+
+def run_round(db_file: Path, claimers: int, *, racy: bool) -> list[str]:
+    """Free every slot, then have all claimers claim one at the same time.
+
+    Returns:
+        The problems found, empty if the round went fine.
+
+    """
+    asyncio.run(_reset(db_file))
+    barrier = multiprocessing.Barrier(claimers)
+    results: multiprocessing.Queue[tuple[int, str]] = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(
+            target=claimer, args=(db_file, index, barrier, results, racy)
+        )
+        for index in range(claimers)
+    ]
+    for process in processes:
+        process.start()
+    outcomes = dict(results.get(timeout=CLAIMER_TIMEOUT) for _ in processes)
+    for process in processes:
+        process.join()
+
+    problems = [
+        f"claimer {index}: {outcome}"
+        for index, outcome in sorted(outcomes.items())
+        if outcome.startswith("error")
+    ]
+    claims = Counter(
+        o for o in outcomes.values() if o.startswith(("accepted", "denied"))
+    )
+    problems.extend(
+        f"{claim} handed to {count} claimers"
+        for claim, count in claims.items()
+        if count > 1
+    )
+    for kind, available in (
+        ("accepted", sdh.AMOUNT_OF_SLOTS),
+        ("denied", sdh.DENIED_SLOTS_AMOUNT),
+    ):
+        wanted = sum(
+            1 for index in outcomes if (index % 2 == 0) == (kind == "accepted")
+        )
+        granted = sum(1 for claim in claims if claim.startswith(kind))
+        if granted < min(wanted, available):
+            problems.append(
+                f"only {granted} distinct {kind} slots for {wanted} claimers"
+                f" and {available} slots"
+            )
+    return problems
+
+
+async def _reset(db_file: Path) -> None:
+    conn = await sdh.create_connection(db_file)
+    if conn is None:
+        e = f"Could not open the slots database at {db_file}"
+        raise RuntimeError(e)
+    try:
+        await sdh.free_all_slots(conn)
+        await sdh.free_all_denied_slots(conn)
+    finally:
+        await conn.close()
+
+
+def main() -> None:
+    """Parse arguments, run the rounds and exit with an error if any went wrong."""
+    parser = argparse.ArgumentParser(
+        description="Claim slots from many processes at once and check allocations."
+    )
+    parser.add_argument("--claimers", type=int, default=48)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument(
+        "--racy",
+        action="store_true",
+        help="Claim accepted slots with a read then a write, as before atomic claims",
+    )
+    args = cast("Args", cast("object", parser.parse_args()))
+
+    failed_rounds = 0
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_file = Path(temp_dir) / "slots.db"
+        for round_number in range(1, args.rounds + 1):
+            problems = run_round(db_file, args.claimers, racy=args.racy)
+            status = "ok" if not problems else f"{len(problems)} problems"
+            print(f"Round {round_number}: {args.claimers} claimers, {status}")
+            for problem in problems:
+                print(f"  {problem}")
+            failed_rounds += bool(problems)
+    if failed_rounds:
+        sys.exit(f"{failed_rounds}/{args.rounds} rounds had allocation problems")
+    print("No double allocation, every claim went through.")
+
+
+if __name__ == "__main__":
+    main()
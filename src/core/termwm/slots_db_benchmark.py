@@ -0,0 +1,304 @@
+"""Compare the legacy wide-column slots table with the normalised windows table.
+
+The legacy schema stored the windows of a slot in 21 columns of the slots table
+(`name0..name6`, `width0..`, `height0..`), so reading or clearing every window took
+one statement per column group. It is reproduced here as a reference, next to the
+`slots_db_handler` functions working on the `windows` table. Each operation is timed
+on a database with every slot filled with its maximum amount of windows:
+- get_all_names: list every window name, as the foreground manager does.
+- get_slot_by_main_name: find a slot from its main window name.
+- get_full_data: read the windows of a slot, as the refitter does.
+- free_and_occupy: free a slot and write its windows back, as the refitter does.
+
+The normalised operations are timed twice: on a plain connection, where every read
+loads the slots tables from the database in a single query, and on a connection from
+`create_connection`, whose reads are served from its cache while the database does
+not change (see `slots_cache`).
+
+A legacy database is then migrated in place, and its content checked.
+
+Usage:
+    python -m src.core.termwm.slots_db_benchmark --iterations 500
+
+"""
+
+import argparse
+import asyncio
+import logging
+import statistics
+import tempfile
+import time
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+from typing import Protocol, cast
+
+import aiosqlite
+
+import src.core.termwm.slots_db_handler as sdh
+
+WindowData = list[tuple[str, int, int]]
+
+
+class Args(Protocol):
+    """Protocol for command-line arguments."""
+
+    iterations: int
+
+
+def _slot_windows(slot_id: int) -> WindowData:
+    return [
+        (f"slot{slot_id}_window{i}", 600 + i, 260 + i)
+        for i in range(sdh.MAX_AMOUNT_OF_WINDOWS)
+    ]
+
+
+async def create_legacy_database(db_file: Path) -> aiosqlite.Connection:
+    """Create a database with the legacy slots table, every slot filled."""
+    conn = await aiosqlite.connect(db_file)
+    fields = ", ".join(
+        f"name{i} TEXT, width{i} INT, height{i} INT"
+        for i in range(sdh.MAX_AMOUNT_OF_WINDOWS)
+    )
+    await conn.execute(
+        f"CREATE TABLE slots (id INTEGER PRIMARY KEY, is_open BOOLEAN NOT NULL, "
+        f"{fields})"
+    )
+    for slot_id in range(sdh.AMOUNT_OF_SLOTS):
+        await conn.execute(
+            "INSERT INTO slots (id, is_open) VALUES (?, ?)", (slot_id, True)
+        )
+        await legacy_occupy_slot_with_data(conn, slot_id, _slot_windows(slot_id))
+    await conn.commit()
+    return conn
+
+
+async def legacy_occupy_slot_with_data(
+    conn: aiosqlite.Connection, slot_id: int, data: WindowData
+) -> None:
+    """Write the windows of a slot, one UPDATE per window."""
+    async with conn.execute("SELECT is_open FROM slots WHERE id = ?", (slot_id,)):
+        pass
+    await conn.execute("UPDATE slots SET is_open = False WHERE id = ?", (slot_id,))
+    for i, (name, width, height) in enumerate(data):
+        await conn.execute(
+            f"UPDATE slots SET name{i} = ?, width{i} = ?, height{i} = ? WHERE id = ?",
+            (name, width, height, slot_id),
+        )
+    await conn.commit()
+
+
+async def legacy_free_slot(conn: aiosqlite.Connection, slot_id: int) -> None:
+    """Free a slot, one UPDATE per window column group."""
+    async with conn.execute("SELECT is_open FROM slots WHERE id = ?", (slot_id,)):
+        pass
+    await conn.execute("UPDATE slots SET is_open = True WHERE id = ?", (slot_id,))
+    for i in range(sdh.MAX_AMOUNT_OF_WINDOWS):
+        await conn.execute(
+            f"UPDATE slots SET name{i} = ?, width{i} = ?, height{i} = ? WHERE id = ?",
+            (None, None, None, slot_id),
+        )
+    await conn.commit()
+
+
+async def legacy_get_full_data(conn: aiosqlite.Connection, slot_id: int) -> WindowData:
+    """Read the windows of a slot from its 21 columns."""
+    fields = ", ".join(
+        f"name{i}, width{i}, height{i}" for i in range(sdh.MAX_AMOUNT_OF_WINDOWS)
+    )
+    async with conn.execute(
+        f"SELECT {fields} FROM slots WHERE id = ?", (slot_id,)
+    ) as cur:
+        row = await cur.fetchone()
+    assert row is not None  # noqa: S101
+    windows = (tuple(row[i : i + 3]) for i in range(0, len(row), 3))
+    return [window for window in windows if any(v is not None for v in window)]
+
+
+async def legacy_get_slot_by_main_name(
+    conn: aiosqlite.Connection, name: str
+) -> int | None:
+    """Find a slot by its main window name, without an index."""
+    async with conn.execute("SELECT id FROM slots WHERE name0 = ?", (name,)) as cur:
+        row = await cur.fetchone()
+    return row[0] if row else None
+
+
+async def legacy_get_all_names(conn: aiosqlite.Connection) -> list[str]:
+    """List every window name, one SELECT per name column."""
+    names: list[str] = []
+    for i in range(sdh.MAX_AMOUNT_OF_WINDOWS):
+        async with conn.execute(f"SELECT name{i} FROM slots") as cur:
+            names.extend(row[0] for row in await cur.fetchall() if row[0] is not None)
+    return names
+
+
+async def _time_operation(
+    operation: Callable[[], Awaitable[object]], iterations: int
+) -> dict[str, float]:
+    samples: list[float] = []
+    for _ in range(iterations):
+        started_at = time.perf_counter()
+        await operation()
+        samples.append((time.perf_counter() - started_at) * 1000)
+    return {"mean_ms": statistics.fmean(samples), "p50_ms": statistics.median(samples)}
+
+
+async def benchmark_legacy(
+    db_file: Path, iterations: int
+) -> dict[str, dict[str, float]]:
+    """Time the legacy operations on a legacy database."""
+    conn = await create_legacy_database(db_file)
+    slot_id = sdh.AMOUNT_OF_SLOTS - 1
+    main_name = _slot_windows(slot_id)[0][0]
+
+    async def free_and_occupy() -> None:
+        data = await legacy_get_full_data(conn, slot_id)
+        await legacy_free_slot(conn, slot_id)
+        await legacy_occupy_slot_with_data(conn, slot_id, data)
+
+    try:
+        return {
+            "get_all_names": await _time_operation(
+                lambda: legacy_get_all_names(conn), iterations
+            ),
+            "get_slot_by_main_name": await _time_operation(
+                lambda: legacy_get_slot_by_main_name(conn, main_name), iterations
+            ),
+            "get_full_data": await _time_operation(
+                lambda: legacy_get_full_data(conn, slot_id), iterations
+            ),
+            "free_and_occupy": await _time_operation(free_and_occupy, iterations),
+        }
+    finally:
+        await conn.close()
+
+
+async def benchmark_normalised(
+    db_file: Path, iterations: int, *, cached: bool
+) -> dict[str, dict[str, float]]:
+    """Time the `slots_db_handler` operations on a migrated legacy database.
+
+    Args:
+        db_file: Database file to create.
+        iterations: Times each operation is run.
+        cached: Whether to read through the connection's cache, or from the
+            database every time.
+
+    """
+    await (await create_legacy_database(db_file)).close()
+    conn = await sdh.create_connection(db_file)
+    assert conn is not None  # noqa: S101
+    if not cached:
+        # Only the connections of create_connection() get a cache
+        await conn.close()
+        conn = await aiosqlite.connect(db_file)
+    slot_id = sdh.AMOUNT_OF_SLOTS - 1
+    main_name = _slot_windows(slot_id)[0][0]
+
+    async def free_and_occupy() -> None:
+        data = await sdh.get_full_data(conn, slot_id)
+        await sdh.free_slot(conn, slot_id)
+        await sdh.occupy_slot_with_data(conn, slot_id, data)
+
+    try:
+        return {
+            "get_all_names": await _time_operation(
+                lambda: sdh.get_all_names(conn), iterations
+            ),
+            "get_slot_by_main_name": await _time_operation(
+                lambda: sdh.get_slot_by_main_name(conn, main_name), iterations
+            ),
+            "get_full_data": await _time_operation(
+                lambda: sdh.get_full_data(conn, slot_id), iterations
+            ),
+            "free_and_occupy": await _time_operation(free_and_occupy, iterations),
+        }
+    finally:
+        await conn.close()
+
+
+async def check_migration(db_file: Path) -> float:
+    """Migrate a filled legacy database and check nothing was lost on the way.
+
+    Returns:
+        The time taken by the migration, in milliseconds.
+
+    Raises:
+        RuntimeError: If the migrated database does not hold the legacy windows.
+
+    """
+    legacy_conn = await create_legacy_database(db_file)
+    expected_names = await legacy_get_all_names(legacy_conn)
+    expected_data = [
+        await legacy_get_full_data(legacy_conn, slot_id)
+        for slot_id in range(sdh.AMOUNT_OF_SLOTS)
+    ]
+    await legacy_conn.close()
+
+    started_at = time.perf_counter()
+    conn = await sdh.create_connection(db_file)
+    elapsed_ms = (time.perf_counter() - started_at) * 1000
+    assert conn is not None  # noqa: S101
+    try:
+        names = await sdh.get_all_names(conn)
+        data = [
+            await sdh.get_full_data(conn, slot_id)
+            for slot_id in range(sdh.AMOUNT_OF_SLOTS)
+        ]
+        occupied = await sdh.get_all_occupied_slots(conn)
+    finally:
+        await conn.close()
+    if (
+        names != expected_names
+        or data != expected_data
+        or len(occupied) != sdh.AMOUNT_OF_SLOTS
+    ):
+        e = "The migrated database does not hold the same windows as the legacy one"
+        raise RuntimeError(e)
+    return elapsed_ms
+
+
+async def run_benchmark(
+    iterations: int,
+) -> tuple[dict[str, dict[str, dict[str, float]]], float]:
+    """Time both schemas and check the migration, in a temporary directory.
+
+    Returns:
+        The timings of each schema's operations, and the migration time in ms.
+
+    """
+    # The handler logs every freed slot, which would dwarf the queries' cost.
+    sdh.logger.setLevel(logging.WARNING)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        directory = Path(temp_dir)
+        results = {
+            "legacy": await benchmark_legacy(directory / "legacy.db", iterations),
+            "normalised": await benchmark_normalised(
+                directory / "normalised.db", iterations, cached=False
+            ),
+            "normalised_cached": await benchmark_normalised(
+                directory / "normalised_cached.db", iterations, cached=True
+            ),
+        }
+        return results, await check_migration(directory / "migrated.db")
+
+
+def main() -> None:
+    """Parse arguments, run the benchmark and print the results."""
+    parser = argparse.ArgumentParser(
+        description="Compare the legacy and normalised slots database schemas."
+    )
+    parser.add_argument("--iterations", type=int, default=200)
+    args = cast("Args", cast("object", parser.parse_args()))
+
+    results, migration_ms = asyncio.run(run_benchmark(args.iterations))
+    for schema, operations in results.items():
+        print(f"{schema}:")
+        for operation, stats in operations.items():
+            formatted = ", ".join(f"{k} {v:.4f}" for k, v in stats.items())
+            print(f"  {operation:>21}: {formatted}")
+    print(f"Legacy database migrated and checked, migration took {migration_ms:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,10 @@
 import asyncio
+import os
 import sqlite3
+import time
+import weakref
+from collections.abc import Callable
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Optional
 
@@ -8,16 +13,97 @@ import aiosqlite
 from src.core.termwm.core.constants import (
     TERMINAL_WINDOW_SLOTS_DB_FILE_PATH as SLOT_DB,
 )
-from src.utils.helpers import construct_script_name
+from src.core.termwm.slots_cache import (
+    SlotsCache,
+    SlotsSnapshot,
+    WindowData,
+    load_snapshot,
+)
+from src.utils.helpers import construct_script_name, pid_is_alive
 from src.utils.logging_utils import setup_logger
+from src.utils.metrics import registry, timed
 
 AMOUNT_OF_SLOTS = 8
 MAX_AMOUNT_OF_WINDOWS = 7  # main and secondaries included
 DENIED_SLOTS_AMOUNT = 10
+SCHEMA_VERSION = 2  # stored in the database's user_version pragma
+# Occupied slots are leased to their owner process, which renews the lease while it
+# runs. Slots whose lease expired or whose owner is gone are reclaimed on allocation.
+LEASE_DURATION_SECONDS = 30.0
+LEASE_COLUMNS = {"owner_pid": "INTEGER", "lease_expires_at": "REAL"}
+# Apps starting together write to the database at the same time: with WAL, readers
+# never block and writers queue up for this long instead of failing right away.
+BUSY_TIMEOUT_SECONDS = 10.0
+
+# Windows of a slot, one row per window: idx 0 is the main window, the others are
+# its secondaries. Rows only exist for written windows.
+CREATE_WINDOWS_TABLE_SQL = f"""CREATE TABLE IF NOT EXISTS windows (
+    slot_id INTEGER NOT NULL REFERENCES slots (id) ON DELETE CASCADE,
+    idx INTEGER NOT NULL CHECK (idx >= 0 AND idx < {MAX_AMOUNT_OF_WINDOWS}),
+    name TEXT,
+    width INT,
+    height INT,
+    PRIMARY KEY (slot_id, idx)
+) WITHOUT ROWID"""
+# Slot lookups by main window name, the primary key covers lookups by slot
+CREATE_MAIN_NAME_INDEX_SQL = (
+    "CREATE INDEX IF NOT EXISTS windows_main_name ON windows (name) WHERE idx = 0"
+)
+# Opening a slot drops its windows and its lease, so that freeing slots is a single
+# UPDATE.
+CREATE_SLOT_OPENED_TRIGGER_SQL = """CREATE TRIGGER IF NOT EXISTS slot_opened
+    AFTER UPDATE OF is_open ON slots WHEN NEW.is_open
+    BEGIN
+        DELETE FROM windows WHERE slot_id = NEW.id;
+        UPDATE slots SET owner_pid = NULL, lease_expires_at = NULL WHERE id = NEW.id;
+    END"""
+CREATE_DENIED_SLOT_OPENED_TRIGGER_SQL = """CREATE TRIGGER IF NOT EXISTS
+    denied_slot_opened AFTER UPDATE OF is_open ON denied_slots WHEN NEW.is_open
+    BEGIN
+        UPDATE denied_slots SET owner_pid = NULL, lease_expires_at = NULL
+        WHERE id = NEW.id;
+    END"""
 
 SCRIPT_NAME = construct_script_name(__file__)
 logger = setup_logger(SCRIPT_NAME)
 
+db_operation_seconds = registry.histogram(
+    "termwm_db_operation_seconds",
+    "Time spent in slots database operations",
+    ("operation",),
+)
+
+
+def _timed_operation[**P, R](func: Callable[P, R]) -> Callable[P, R]:
+    """Observe the duration of a database operation, labelled with its name."""
+    return timed(db_operation_seconds.labels(operation=func.__name__))(func)
+
+
+# Read-through caches of the connections opened by create_connection(), reads on
+# other connections go to the database every time
+_caches: "weakref.WeakKeyDictionary[aiosqlite.Connection, SlotsCache]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+@dataclass
+class LayoutPlan:
+    """
+    Changes to the slots applied together by apply_layout_plan(): frees first, then
+    moves, then claims.
+    """
+
+    frees: list[int] = field(default_factory=list)
+    moves: dict[int, int] = field(default_factory=dict)
+    """Occupied slot id: free slot id its windows and lease move to."""
+    claims: dict[int, WindowData] = field(default_factory=dict)
+    """Free slot id: windows to occupy it with."""
+    claim_owner_pid: Optional[int] = None
+    """Process the claimed slots are leased to, this process by default."""
+
+    def __bool__(self) -> bool:
+        return bool(self.frees or self.moves or self.claims)
+
 
 async def create_connection(db_file: str | Path) -> aiosqlite.Connection | None:
     """Create a database connection to the SQLite database."""
@@ -25,9 +111,17 @@ async def create_connection(db_file: str | Path) -> aiosqlite.Connection | None:
     if isinstance(db_file, Path):
         db_file = str(db_file)
     try:
-        db_conn = await aiosqlite.connect(db_file)
+        db_conn = await aiosqlite.connect(db_file, timeout=BUSY_TIMEOUT_SECONDS)
         logger.debug(f"obtained conn {db_conn} to database {db_file}")
 
+        # WAL is persisted in the database file, synchronous only lasts for the
+        # connection and NORMAL is safe with WAL
+        await db_conn.execute("PRAGMA journal_mode = WAL")
+        await db_conn.execute("PRAGMA synchronous = NORMAL")
+
+        # Databases created before the windows table are migrated in place
+        await migrate_slots_schema(db_conn)
+
         # create the slots tables if they do not exist
         await create_slots_table(db_conn)
         await create_denied_slots_table(db_conn)
@@ -46,7 +140,9 @@ async def create_connection(db_file: str | Path) -> aiosqlite.Connection | None:
             if count and count[0] == 0:
                 await initialize_denied_slots(db_conn)
 
-    except aiosqlite.Error:
+        _caches[db_conn] = SlotsCache(db_file, BUSY_TIMEOUT_SECONDS)
+
+    except (aiosqlite.Error, sqlite3.Error):
         logger.exception("Error creating database connection")
         if db_conn:
             await db_conn.close()
@@ -55,21 +151,114 @@ async def create_connection(db_file: str | Path) -> aiosqlite.Connection | None:
         return db_conn
 
 
+async def _get_snapshot(conn: aiosqlite.Connection) -> SlotsSnapshot:
+    """
+    Get the content of the slots tables, from the connection's cache when the
+    database did not change since it was last read.
+    """
+    cache = _caches.get(conn)
+    if cache is None:
+        return await load_snapshot(conn)
+    return await cache.get(conn)
+
+
+def get_cache_stats(conn: aiosqlite.Connection) -> dict[str, object] | None:
+    """Get the hit and miss counts of the connection's cache, if it has one"""
+    cache = _caches.get(conn)
+    return None if cache is None else cache.stats()
+
+
+async def migrate_slots_schema(conn: aiosqlite.Connection):
+    """
+    Bring an existing database up to SCHEMA_VERSION in a single transaction, does
+    nothing if it is already up to date or empty:
+    - version 1 moves the windows of a legacy slots table, stored in name0..name6,
+      width0..width6 and height0..height6 columns, to the windows table.
+    - version 2 adds the lease columns to the slots and denied_slots tables.
+    """
+    async with conn.execute("PRAGMA user_version") as cur:
+        row = await cur.fetchone()
+    if row and row[0] >= SCHEMA_VERSION:
+        return
+
+    try:
+        # Taking the write lock before checking the schema keeps two apps starting
+        # together from both migrating it
+        await conn.execute("BEGIN IMMEDIATE")
+        columns = {
+            table: await _get_column_names(conn, table)
+            for table in ("slots", "denied_slots")
+        }
+        if not columns["slots"]:
+            await conn.rollback()
+            return
+
+        if "name0" in columns["slots"]:
+            await _migrate_legacy_windows(conn)
+            columns["slots"] = await _get_column_names(conn, "slots")
+        for table, table_columns in columns.items():
+            if not table_columns:
+                continue  # Created with every column by create_connection()
+            for column, column_type in LEASE_COLUMNS.items():
+                if column not in table_columns:
+                    await conn.execute(
+                        f"ALTER TABLE {table} ADD COLUMN {column} {column_type}"
+                    )
+
+        # Recreated up to date by create_slots_table()
+        await conn.execute("DROP TRIGGER IF EXISTS slot_opened")
+        await conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        await conn.commit()
+        logger.info(f"Migrated the slots database to schema version {SCHEMA_VERSION}")
+    except aiosqlite.Error:
+        logger.exception("Error migrating the slots database, it was left untouched")
+        await conn.rollback()
+        raise
+
+
+async def _get_column_names(conn: aiosqlite.Connection, table: str) -> set[str]:
+    async with conn.execute("SELECT name FROM pragma_table_info(?)", (table,)) as cur:
+        return {row[0] for row in await cur.fetchall()}
+
+
+async def _migrate_legacy_windows(conn: aiosqlite.Connection):
+    legacy_windows = " UNION ALL ".join(
+        f"SELECT id, {i}, name{i}, width{i}, height{i} FROM slots"
+        f" WHERE COALESCE(name{i}, width{i}, height{i}) IS NOT NULL"
+        for i in range(MAX_AMOUNT_OF_WINDOWS)
+    )
+    await conn.execute(CREATE_WINDOWS_TABLE_SQL)
+    await conn.execute(
+        f"INSERT INTO windows (slot_id, idx, name, width, height) {legacy_windows}"
+    )
+    await conn.execute(
+        """CREATE TABLE slots_v1 (
+            id INTEGER PRIMARY KEY,
+            is_open BOOLEAN NOT NULL
+        )"""
+    )
+    await conn.execute(
+        "INSERT INTO slots_v1 (id, is_open) SELECT id, is_open FROM slots"
+    )
+    await conn.execute("DROP TABLE slots")
+    await conn.execute("ALTER TABLE slots_v1 RENAME TO slots")
+
+
 async def create_slots_table(conn: aiosqlite.Connection):
     try:
         async with conn.cursor() as cur:
-            fields = ", ".join(
-                f"name{i} TEXT, width{i} INT, height{i} INT"
-                for i in range(MAX_AMOUNT_OF_WINDOWS)
-            )
-
-            sql = f"""CREATE TABLE IF NOT EXISTS slots (
+            await cur.execute(
+                """CREATE TABLE IF NOT EXISTS slots (
                                 id INTEGER PRIMARY KEY,
                                 is_open BOOLEAN NOT NULL,
-                                {fields}
+                                owner_pid INTEGER,
+                                lease_expires_at REAL
                                 )"""
-
-            await cur.execute(sql)
+            )
+            await cur.execute(CREATE_WINDOWS_TABLE_SQL)
+            await cur.execute(CREATE_MAIN_NAME_INDEX_SQL)
+            await cur.execute(CREATE_SLOT_OPENED_TRIGGER_SQL)
+            await cur.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
             await conn.commit()
     except aiosqlite.Error as e:
         logger.error(e)
@@ -78,6 +267,7 @@ async def create_slots_table(conn: aiosqlite.Connection):
 async def delete_slots_table(conn: aiosqlite.Connection):
     try:
         async with conn.cursor() as cursor:
+            await cursor.execute("DROP TABLE IF EXISTS windows")
             sql = "DROP TABLE IF EXISTS slots"
             await cursor.execute(sql)
             await conn.commit()
@@ -91,16 +281,17 @@ async def delete_slots_table(conn: aiosqlite.Connection):
 async def initialize_slots(conn: aiosqlite.Connection):
     """populate the table with slots id and their "is_open" bool value"""
     try:
-        sql = """INSERT INTO slots (id, is_open)
+        # Apps starting together may both find the table empty
+        sql = """INSERT OR IGNORE INTO slots (id, is_open)
         VALUES (?, ?)"""
-        for i in range(0, AMOUNT_OF_SLOTS):
-            await conn.execute(sql, (i, True))
+        await conn.executemany(sql, ((i, True) for i in range(AMOUNT_OF_SLOTS)))
         await conn.commit()
     except aiosqlite.Error as e:
         logger.error(e)
         await conn.rollback()
 
 
+@_timed_operation
 async def occupy_slot_with_data(
     conn: Optional[aiosqlite.Connection],
     slot_id: int,
@@ -111,35 +302,37 @@ async def occupy_slot_with_data(
     if conn:
         try:
             async with conn.cursor() as cur:
-                await cur.execute("SELECT is_open FROM slots WHERE id = ?", (slot_id,))
-                row = await cur.fetchone()
-
-                if not row:
-                    logger.error(f"Slot {slot_id} does not exist.")
-                    return
-                if not row[0] and start_index == 0:
-                    logger.warning(
-                        f"Slot {slot_id} is already occupied and start_index is "
-                        "{start_index}, data will be overriden."
-                    )
-                else:
-                    # Only set is_open to False on first write
-                    await cur.execute(
-                        "UPDATE slots SET is_open = False WHERE id = ?", (slot_id,)
-                    )
+                # Only set is_open to False on first write
+                await cur.execute(
+                    "UPDATE slots SET is_open = False WHERE id = ? AND is_open",
+                    (slot_id,),
+                )
+                if cur.rowcount == 0:
+                    await cur.execute("SELECT 1 FROM slots WHERE id = ?", (slot_id,))
+                    if not await cur.fetchone():
+                        logger.error(f"Slot {slot_id} does not exist.")
+                        return
+                    if start_index == 0:
+                        logger.warning(
+                            f"Slot {slot_id} is already occupied and start_index is "
+                            f"{start_index}, data will be overriden."
+                        )
 
                 if data is not None:
-                    for i, (name, width, height) in enumerate(data, start=start_index):
-                        await cur.execute(
-                            f"UPDATE slots SET name{i}= ?, width{i}=?, "
-                            f"height{i}=? WHERE id = ?",
-                            (
-                                name,
-                                width,
-                                height,
-                                slot_id,
-                            ),
-                        )
+                    await cur.executemany(
+                        """INSERT INTO windows (slot_id, idx, name, width, height)
+                        VALUES (?, ?, ?, ?, ?)
+                        ON CONFLICT (slot_id, idx) DO UPDATE SET
+                            name = excluded.name,
+                            width = excluded.width,
+                            height = excluded.height""",
+                        (
+                            (slot_id, i, name, width, height)
+                            for i, (name, width, height) in enumerate(
+                                data, start=start_index
+                            )
+                        ),
+                    )
                 await conn.commit()
                 logger.debug(
                     f"Slot {slot_id} data written starting at index {start_index}."
@@ -150,54 +343,238 @@ async def occupy_slot_with_data(
             await conn.rollback()
 
 
-async def get_first_free_slot(conn: Optional[aiosqlite.Connection]) -> int | None:
+@_timed_operation
+async def claim_first_free_slot(
+    conn: Optional[aiosqlite.Connection],
+    data: Optional[list[tuple[str, int, int]]] = None,
+    owner_pid: Optional[int] = None,
+) -> int | None:
     """
-    Populate the first free open slot in the database and return it. If no free slots
-    are found, return None.
+    Occupy the first free slot with the given windows and return its id, or None if
+    no slot is free. The slot is found and occupied by a single UPDATE under the
+    database's write lock, so concurrent claimers can never get the same slot. The
+    slot is leased to owner_pid (this process by default), stale slots are reclaimed
+    first.
     """
-
     if conn:
         try:
             async with conn.cursor() as cur:
-                await cur.execute("SELECT id FROM slots WHERE is_open = True LIMIT 1")
+                # The write lock is taken upfront so that the reclaim, the claim and
+                # the windows are written in the same transaction
+                await cur.execute("BEGIN IMMEDIATE")
+                await _reclaim_stale_slots(cur, "slots")
+                await cur.execute(
+                    """UPDATE slots SET is_open = False, owner_pid = ?,
+                        lease_expires_at = ?
+                    WHERE id = (
+                        SELECT id FROM slots WHERE is_open ORDER BY id LIMIT 1
+                    ) RETURNING id""",
+                    (_lease_owner(owner_pid), _lease_expiry()),
+                )
                 row = await cur.fetchone()
 
                 if not row:
+                    await conn.rollback()
                     print("No free slot available.")
-                    await conn.commit()
-                    return
+                    return None
 
                 slot_id = row[0]
+                if data:
+                    await cur.executemany(
+                        """INSERT OR REPLACE INTO windows
+                        (slot_id, idx, name, width, height) VALUES (?, ?, ?, ?, ?)""",
+                        (
+                            (slot_id, i, name, width, height)
+                            for i, (name, width, height) in enumerate(data)
+                        ),
+                    )
                 await conn.commit()
-                logger.debug(f"Slot {slot_id} is the first available")
+                logger.debug(f"Slot {slot_id} claimed")
                 return slot_id
 
         except aiosqlite.Error as e:
             logger.error(e)
+            await conn.rollback()
+    return None
+
+
+def _lease_owner(owner_pid: Optional[int]) -> int:
+    return os.getpid() if owner_pid is None else owner_pid
+
+
+def _lease_expiry() -> float:
+    return time.time() + LEASE_DURATION_SECONDS
+
+
+async def _reclaim_stale_slots(cur: aiosqlite.Cursor, table: str) -> list[int]:
+    """Free the leased slots whose lease expired or whose owner is gone."""
+    await cur.execute(
+        f"SELECT id, owner_pid, lease_expires_at FROM {table}"
+        " WHERE NOT is_open AND owner_pid IS NOT NULL"
+    )
+    now = time.time()
+    stale_slots = [
+        slot_id
+        for slot_id, owner_pid, lease_expires_at in await cur.fetchall()
+        if (lease_expires_at is not None and lease_expires_at < now)
+        or not pid_is_alive(owner_pid)
+    ]
+    if stale_slots:
+        await cur.executemany(
+            f"UPDATE {table} SET is_open = True WHERE id = ?",
+            ((slot_id,) for slot_id in stale_slots),
+        )
+        logger.warning(f"Reclaimed stale {table}: {stale_slots}")
+    return stale_slots
 
 
-async def free_slot(conn: aiosqlite.Connection, slot_id: int):
-    """Depopulate a slot and removes all the data inserted into it"""
+@_timed_operation
+async def renew_leases(
+    conn: aiosqlite.Connection, owner_pid: Optional[int] = None
+) -> Optional[int]:
+    """
+    Extend the lease of every slot and denied slot owned by owner_pid (this process
+    by default), return how many were renewed, or None if the database could not be
+    updated (e.g. locked), in which case the leases are left as they were. Renewing
+    by owner rather than by slot keeps the lease valid when a refit moves the owner
+    to another slot.
+    """
+    owner_pid = _lease_owner(owner_pid)
+    lease_expires_at = _lease_expiry()
+    renewed = 0
     try:
         async with conn.cursor() as cur:
-            await cur.execute("SELECT is_open FROM slots WHERE id = ?", (slot_id,))
-            row = await cur.fetchone()
-
-            if row and not row[0]:  # Ensure the slot is not already open
+            for table in ("slots", "denied_slots"):
                 await cur.execute(
-                    "UPDATE slots SET is_open = True WHERE id = ?", (slot_id,)
+                    f"UPDATE {table} SET lease_expires_at = ?"
+                    " WHERE owner_pid = ? AND NOT is_open",
+                    (lease_expires_at, owner_pid),
                 )
-                for i in range(MAX_AMOUNT_OF_WINDOWS):
-                    await cur.execute(
-                        f"UPDATE slots SET name{i}= ?, width{i}=?, "
-                        f"height{i}=? WHERE id = ?",
-                        (
-                            None,
-                            None,
-                            None,
-                            slot_id,
-                        ),
+                renewed += cur.rowcount
+            await conn.commit()
+    except aiosqlite.Error as e:
+        logger.error(e)
+        await conn.rollback()
+        return None
+    return renewed
+
+
+@_timed_operation
+async def apply_layout_plan(conn: aiosqlite.Connection, plan: LayoutPlan) -> bool:
+    """
+    Apply a whole layout plan in a single transaction, one executemany per kind of
+    change. Nothing is applied if a move or claim targets a slot that is not free.
+    Return whether the plan was applied.
+    """
+    targets = list(plan.moves.values()) + list(plan.claims)
+    if len(set(targets)) != len(targets) or set(targets) & set(plan.moves):
+        e = f"Layout plan targets a slot twice or moves into a moved slot: {plan}"
+        raise ValueError(e)
+
+    try:
+        async with conn.cursor() as cur:
+            await cur.execute("BEGIN IMMEDIATE")
+            await cur.executemany(
+                "UPDATE slots SET is_open = True WHERE id = ?",
+                ((slot_id,) for slot_id in plan.frees),
+            )
+
+            # Occupy the targets first, as opening the moved slots drops their
+            # windows and lease
+            await cur.executemany(
+                """UPDATE slots SET is_open = False,
+                    (owner_pid, lease_expires_at) = (
+                        SELECT owner_pid, lease_expires_at FROM slots WHERE id = ?
                     )
+                WHERE id = ? AND is_open""",
+                plan.moves.items(),
+            )
+            occupied = cur.rowcount if plan.moves else 0
+            await cur.executemany(
+                "UPDATE windows SET slot_id = ? WHERE slot_id = ?",
+                ((new_slot_id, slot_id) for slot_id, new_slot_id in plan.moves.items()),
+            )
+            await cur.executemany(
+                "UPDATE slots SET is_open = True WHERE id = ?",
+                ((slot_id,) for slot_id in plan.moves),
+            )
+
+            # Claims are leased like claim_first_free_slot() leases, so that they
+            # get reclaimed once their owner is gone
+            owner_pid = _lease_owner(plan.claim_owner_pid)
+            lease_expires_at = _lease_expiry()
+            await cur.executemany(
+                """UPDATE slots SET is_open = False, owner_pid = ?,
+                    lease_expires_at = ?
+                WHERE id = ? AND is_open""",
+                ((owner_pid, lease_expires_at, slot_id) for slot_id in plan.claims),
+            )
+            occupied += cur.rowcount if plan.claims else 0
+            if occupied != len(targets):
+                await conn.rollback()
+                logger.error(f"Layout plan targets occupied slots, not applied: {plan}")
+                return False
+            await cur.executemany(
+                """INSERT OR REPLACE INTO windows (slot_id, idx, name, width, height)
+                VALUES (?, ?, ?, ?, ?)""",
+                (
+                    (slot_id, i, name, width, height)
+                    for slot_id, data in plan.claims.items()
+                    for i, (name, width, height) in enumerate(data)
+                ),
+            )
+            await conn.commit()
+            logger.info(f"Layout plan applied: {plan}")
+            return True
+    except aiosqlite.Error as e:
+        logger.error(e)
+        await conn.rollback()
+        return False
+
+
+async def move_slot(conn: aiosqlite.Connection, slot_id: int, new_slot_id: int) -> bool:
+    """
+    Move the windows and the lease of an occupied slot to a free one, then free the
+    former. Return whether the move was done.
+    """
+    return await apply_layout_plan(conn, LayoutPlan(moves={slot_id: new_slot_id}))
+
+
+async def get_first_free_slot(conn: Optional[aiosqlite.Connection]) -> int | None:
+    """
+    Return the first free slot in the database without occupying it, or None if no
+    slots are free. Use claim_first_free_slot() to get a slot to occupy: another app
+    may take the slot returned here before it is occupied.
+    """
+
+    if conn:
+        try:
+            free_slots = (await _get_snapshot(conn)).free_slots
+            if not free_slots:
+                print("No free slot available.")
+                return None
+
+            slot_id = free_slots[0]
+            logger.debug(f"Slot {slot_id} is the first available")
+            return slot_id
+
+        except aiosqlite.Error as e:
+            logger.error(e)
+    return None
+
+
+@_timed_operation
+async def free_slot(conn: aiosqlite.Connection, slot_id: int):
+    """Depopulate a slot and removes all the data inserted into it"""
+    try:
+        async with conn.cursor() as cur:
+            # Only matches a slot that is not already open, its windows are dropped
+            # by the slot_opened trigger
+            await cur.execute(
+                "UPDATE slots SET is_open = True WHERE id = ? AND NOT is_open",
+                (slot_id,),
+            )
+            if cur.rowcount:
                 await conn.commit()
                 logger.info(f"Slot {slot_id} is now free.")
             else:
@@ -216,19 +593,20 @@ def free_slot_by_name_sync(name: str):
     conn = None
     cursor = None
     try:
-        conn = sqlite3.connect(SLOT_DB)
+        conn = sqlite3.connect(SLOT_DB, timeout=BUSY_TIMEOUT_SECONDS)
         cursor = conn.cursor()
-        cursor.execute("SELECT id, is_open FROM slots WHERE name0 = ?", (name,))
-        row = cursor.fetchone()
-        if row:
-            slot_id, is_open = row
-            if not is_open:
-                free_slot_sync(conn, slot_id)
-                conn.commit()
-            else:
-                logger.debug(f"Slot {slot_id} is already free.")
+        cursor.execute(
+            """UPDATE slots SET is_open = True WHERE NOT is_open AND id = (
+                SELECT slot_id FROM windows WHERE idx = 0 AND name = ?
+            )""",
+            (name,),
+        )
+        conn.commit()
+        if cursor.rowcount:
+            logger.debug(f"Slot named {name} is now free.")
         else:
-            logger.error(f"Slot named {name} does not exist.")
+            # Freeing a slot drops its windows, so a freed slot has no name anymore
+            logger.error(f"Slot named {name} does not exist or is already free.")
     except sqlite3.Error as e:
         if conn:
             conn.rollback()
@@ -246,16 +624,6 @@ def free_slot_sync(conn: sqlite3.Connection, slot_id: int):
     try:
         cursor = conn.cursor()
         cursor.execute("UPDATE slots SET is_open = True WHERE id = ?", (slot_id,))
-        for i in range(MAX_AMOUNT_OF_WINDOWS):
-            cursor.execute(
-                f"UPDATE slots SET name{i}= ?, width{i}=?, height{i}=? WHERE id = ?",
-                (
-                    None,
-                    None,
-                    None,
-                    slot_id,
-                ),
-            )
         conn.commit()
     except sqlite3.Error as e:
         conn.rollback()
@@ -265,22 +633,12 @@ def free_slot_sync(conn: sqlite3.Connection, slot_id: int):
             cursor.close()
 
 
+@_timed_operation
 async def free_all_slots(conn: aiosqlite.Connection, verbose: bool = False):
     """Free all slots and remove all their data"""
     try:
         async with conn.cursor() as cur:
             await cur.execute("UPDATE slots SET is_open = True")
-
-            for i in range(MAX_AMOUNT_OF_WINDOWS):
-                await cur.execute(
-                    f"UPDATE slots SET name{i}= ?, width{i}=?, height{i}=?",
-                    (
-                        None,
-                        None,
-                        None,
-                    ),
-                )
-
             await conn.commit()
             if verbose:
                 print("All slots are now free.")
@@ -290,6 +648,7 @@ async def free_all_slots(conn: aiosqlite.Connection, verbose: bool = False):
         await conn.rollback()
 
 
+@_timed_operation
 async def get_full_data(
     conn: aiosqlite.Connection, slot_id
 ) -> list[tuple[str, int, int]] | None:
@@ -298,24 +657,11 @@ async def get_full_data(
     field.
     """
     try:
-        async with conn.cursor() as cur:
-            fields = ", ".join(
-                [f"name{i}, width{i}, height{i}" for i in range(MAX_AMOUNT_OF_WINDOWS)]
-            )
-            sql = f"SELECT {fields} FROM slots WHERE id = ?"
-            await cur.execute(sql, (slot_id,))
-            row = await cur.fetchone()
-
-            if not row:
-                logger.error(f"No slot found with the id: {slot_id}")
-                return None
-
-            data = []
-            for i in range(0, len(row), 3):
-                data_tuple = (row[i], row[i + 1], row[i + 2])
-                if not all(element is None for element in data_tuple):
-                    data.append(data_tuple)
-            return data
+        snapshot = await _get_snapshot(conn)
+        if slot_id not in snapshot.slots:
+            logger.error(f"No slot found with the id: {slot_id}")
+            return None
+        return list(snapshot.windows.get(slot_id, []))
 
     except aiosqlite.Error as e:
         logger.error(e)
@@ -325,36 +671,40 @@ async def get_full_data(
 async def get_slot_by_main_name(conn: aiosqlite.Connection, name: str) -> int | None:
     """Get the slot id by the main name"""
     try:
-        async with conn.cursor() as cur:
-            await cur.execute("SELECT id FROM slots WHERE name0 = ?", (name,))
-            row = await cur.fetchone()
+        slot_id = (await _get_snapshot(conn)).main_names.get(name)
+        if slot_id is None:
+            logger.error(f"No slot found with the main name: {name}")
+        return slot_id
 
-            if not row:
-                logger.error(f"No slot found with the main name: {name}")
-                return None
+    except aiosqlite.Error as e:
+        logger.error(e)
+        return None
 
-            return row[0]
+
+@_timed_operation
+async def get_all_slots_data(conn: aiosqlite.Connection) -> dict[int, WindowData]:
+    """
+    Get the windows of every occupied slot, by slot id. Occupied slots without
+    windows are mapped to an empty list.
+    """
+    try:
+        snapshot = await _get_snapshot(conn)
+        return {
+            slot_id: list(snapshot.windows.get(slot_id, []))
+            for slot_id in snapshot.occupied_slots
+        }
 
     except aiosqlite.Error as e:
         logger.error(e)
-        return None
+        return {}
 
 
 async def get_all_names(conn: aiosqlite.Connection) -> list[str]:
     """Get a list of all the names, main and secondary,
     in the entire database"""
     try:
-        async with conn.cursor() as cur:
-            names = []
-            for i in range(MAX_AMOUNT_OF_WINDOWS):
-                await cur.execute(f"SELECT name{i} FROM slots")
-                rows = await cur.fetchall()
-
-                for row in rows:
-                    name = row[0]
-                    if name is not None:
-                        names.append(name)
-            return names
+        # Main windows first, then each rank of secondaries
+        return list((await _get_snapshot(conn)).names)
 
     except aiosqlite.Error as e:
         logger.error(e)
@@ -364,12 +714,9 @@ async def get_all_names(conn: aiosqlite.Connection) -> list[str]:
 async def get_all_occupied_slots(conn: aiosqlite.Connection) -> list:
     """Get a list of all the occupied slots ids"""
     try:
-        async with conn.cursor() as cur:
-            await cur.execute("SELECT id FROM slots WHERE is_open = False")
-            rows = await cur.fetchall()
-            slot_ids = [row[0] for row in rows] if rows else []
-            logger.info(f"obtained occupied slots: {slot_ids}")
-            return slot_ids
+        slot_ids = (await _get_snapshot(conn)).occupied_slots
+        logger.info(f"obtained occupied slots: {slot_ids}")
+        return slot_ids
 
     except aiosqlite.Error as e:
         logger.error(f"Error retrieving occupied slots: {e}")
@@ -379,27 +726,38 @@ async def get_all_occupied_slots(conn: aiosqlite.Connection) -> list:
 async def get_all_free_slots(conn: aiosqlite.Connection) -> list[int]:
     """Get a list of all the free slots ids"""
     try:
-        async with conn.cursor() as cur:
-            await cur.execute("SELECT id FROM slots WHERE is_open = True")
-            rows = await cur.fetchall()
-            slot_ids = [row[0] for row in rows] if rows else []
-            logger.info(f"obtained free slots: {slot_ids}")
-            return slot_ids
+        slot_ids = (await _get_snapshot(conn)).free_slots
+        logger.info(f"obtained free slots: {slot_ids}")
+        return slot_ids
 
     except aiosqlite.Error as e:
         logger.error(f"Error retrieving free slots: {e}")
         return []
 
 
+async def get_all_free_denied_slots(conn: aiosqlite.Connection) -> list[int]:
+    """Get a list of all the free denied slots ids"""
+    try:
+        denied_slots = (await _get_snapshot(conn)).denied_slots
+        return [slot_id for slot_id, is_open in denied_slots.items() if is_open]
+
+    except aiosqlite.Error as e:
+        logger.error(f"Error retrieving free denied slots: {e}")
+        return []
+
+
 async def create_denied_slots_table(conn: aiosqlite.Connection):
     try:
         async with conn.cursor() as cur:
             await cur.execute(
                 """CREATE TABLE IF NOT EXISTS denied_slots (
                                     id INTEGER PRIMARY KEY,
-                                    is_open BOOLEAN NOT NULL
+                                    is_open BOOLEAN NOT NULL,
+                                    owner_pid INTEGER,
+                                    lease_expires_at REAL
                                );"""
             )
+            await cur.execute(CREATE_DENIED_SLOT_OPENED_TRIGGER_SQL)
             await conn.commit()
     except aiosqlite.Error as e:
         logger.error(e)
@@ -408,10 +766,10 @@ async def create_denied_slots_table(conn: aiosqlite.Connection):
 async def initialize_denied_slots(conn: aiosqlite.Connection):
     try:
         async with conn.cursor() as cur:
-            for i in range(0, DENIED_SLOTS_AMOUNT):
-                await cur.execute(
-                    """INSERT INTO denied_slots (id, is_open) VALUES(?, ?)""", (i, True)
-                )
+            await cur.executemany(
+                """INSERT OR IGNORE INTO denied_slots (id, is_open) VALUES(?, ?)""",
+                ((i, True) for i in range(DENIED_SLOTS_AMOUNT)),
+            )
             await conn.commit()
     except aiosqlite.Error as e:
         logger.error(e)
@@ -430,32 +788,38 @@ async def delete_denied_slots_table(conn: aiosqlite.Connection):
         logger.error(e)
 
 
+@_timed_operation
 async def occupy_first_free_denied_slot(
     conn: Optional[aiosqlite.Connection],
+    owner_pid: Optional[int] = None,
 ) -> int | None:
     """
     Find the first free open slot in the database, populate it and return the
     slot id number as an integer. If there are no free slots, return None.
+    The slot is leased to owner_pid like in claim_first_free_slot().
     """
     if conn:
         try:
             async with conn.cursor() as cur:
+                # Found and occupied in one statement, see claim_first_free_slot()
+                await cur.execute("BEGIN IMMEDIATE")
+                await _reclaim_stale_slots(cur, "denied_slots")
                 await cur.execute(
-                    "SELECT id FROM denied_slots WHERE is_open = True LIMIT 1"
+                    """UPDATE denied_slots SET is_open = False, owner_pid = ?,
+                        lease_expires_at = ?
+                    WHERE id = (
+                        SELECT id FROM denied_slots WHERE is_open ORDER BY id LIMIT 1
+                    ) RETURNING id""",
+                    (_lease_owner(owner_pid), _lease_expiry()),
                 )
                 row = await cur.fetchone()
+                await conn.commit()
 
                 if not row:
                     print("No free slot available.")
-                    await conn.commit()
                     return None
 
                 slot_id = row[0]
-                await cur.execute(
-                    "UPDATE denied_slots SET is_open = False WHERE id = ?",
-                    (slot_id,),
-                )
-                await conn.commit()
                 print(f"Slot {slot_id} is now populated.")
                 return slot_id
 
@@ -464,21 +828,17 @@ async def occupy_first_free_denied_slot(
             await conn.rollback()
 
 
+@_timed_operation
 async def free_denied_slot(conn: aiosqlite.Connection, slot_id: int):
     """Depopulate a slot"""
     try:
-        await conn.execute("BEGIN")
-
         async with conn.cursor() as cur:
+            # Only matches a slot that is not already open
             await cur.execute(
-                "SELECT is_open FROM denied_slots WHERE id = ?", (slot_id,)
+                "UPDATE denied_slots SET is_open = True WHERE id = ? AND NOT is_open",
+                (slot_id,),
             )
-            row = await cur.fetchone()
-
-            if row and not row[0]:  # Ensure the slot is not already open
-                await cur.execute(
-                    "UPDATE denied_slots SET is_open = True WHERE id = ?", (slot_id,)
-                )
+            if cur.rowcount:
                 await conn.commit()
                 print(f"Slot {slot_id} is now free.")
             else:
@@ -493,7 +853,7 @@ def free_denied_slot_sync(slot_id: int):
     conn = None
     cursor = None
     try:
-        conn = sqlite3.connect(SLOT_DB)
+        conn = sqlite3.connect(SLOT_DB, timeout=BUSY_TIMEOUT_SECONDS)
         cursor = conn.cursor()
         cursor.execute(
             "UPDATE denied_slots SET is_open = True WHERE id = ?", (slot_id,)
@@ -510,6 +870,7 @@ def free_denied_slot_sync(slot_id: int):
             conn.close()
 
 
+@_timed_operation
 async def free_all_denied_slots(conn: aiosqlite.Connection):
     """Depopulate all occupied slots"""
     try:
@@ -0,0 +1,161 @@
+"""Pool of pre-warmed app workers the supervisor hands app starts off to.
+
+The pool keeps one idle `warm_worker` process per app, already done importing the
+app's heavy dependencies. Starting an app then only costs a line written to the
+worker's stdin. Once handed off, the worker becomes the app's process and a new worker
+is spawned for the next start, after a delay so that warming it up does not compete
+for the CPU with the app that is just starting.
+"""
+
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from collections.abc import Iterable
+from logging import Logger
+from typing import final
+
+from src.config.settings import PROJECT_ROOT_PATH
+from src.core.warm_worker import HANDOFF_COMMAND
+from src.utils.helpers import construct_script_name
+from src.utils.logging_utils import setup_logger
+
+SCRIPT_NAME = construct_script_name(__file__)
+
+WARM_WORKER_APPS = ("shopwatcher", "pregamespy", "robeau")
+"""Apps worth keeping a warm worker for, those with a heavy startup."""
+WARM_WORKER_MODULE = "src.core.warm_worker"
+REPLENISH_DELAY = 10.0
+"""Seconds to wait after a handoff before warming up the app's next worker."""
+WORKER_EXIT_TIMEOUT = 5.0
+SW_HIDE = 0
+
+
+@final
+class WarmWorkerPool:
+    """Keeps one warm worker per app, ready to be handed off the app."""
+
+    def __init__(
+        self,
+        apps: Iterable[str] = WARM_WORKER_APPS,
+        logger: Logger | None = None,
+        python_executable: str = sys.executable,
+        replenish_delay: float = REPLENISH_DELAY,
+    ) -> None:
+        """Initialize the pool, no worker is spawned until `start()`.
+
+        Args:
+            apps: Names of the apps to keep a warm worker for.
+            logger: Logger instance, defaults to this module's logger.
+            python_executable: Interpreter used to run the workers.
+            replenish_delay: Seconds to wait before replacing a handed off worker.
+
+        """
+        self.apps = tuple(apps)
+        self.logger = logger if logger is not None else setup_logger(SCRIPT_NAME)
+        self.python_executable = python_executable
+        self.replenish_delay = replenish_delay
+        self.handoffs = 0
+        self._workers: dict[str, asyncio.subprocess.Process] = {}
+        self._replenish_tasks: set[asyncio.Task[None]] = set()
+
+    async def start(self) -> None:
+        """Spawn a warm worker for every app."""
+        for app in self.apps:
+            await self._spawn(app)
+
+    def has_worker(self, app: str) -> bool:
+        """Tell if an idle worker is available for the app."""
+        worker = self._workers.get(app)
+        return worker is not None and worker.returncode is None
+
+    async def hand_off(self, app: str) -> asyncio.subprocess.Process | None:
+        """Hand the app off to its warm worker, which becomes the app's process.
+
+        Returns:
+            The app's process, or None if no worker was available.
+
+        """
+        worker = self._workers.pop(app, None)
+        if worker is None or worker.returncode is not None or worker.stdin is None:
+            return None
+        try:
+            worker.stdin.write(f"{HANDOFF_COMMAND} {time.time()!r}\n".encode())
+            await worker.stdin.drain()
+            worker.stdin.close()
+        except ConnectionError:
+            self.logger.warning(f"Warm worker of {app} died before its handoff")
+            return None
+        self.handoffs += 1
+        self.logger.info(f"Handed {app} off to warm worker {worker.pid}")
+        self._schedule_replenish(app)
+        return worker
+
+    def stats(self) -> dict[str, object]:
+        """Return the pool's state, as a JSON serializable dictionary."""
+        return {
+            "idle_workers": {
+                app: worker.pid
+                for app, worker in self._workers.items()
+                if worker.returncode is None
+            },
+            "handoffs": self.handoffs,
+        }
+
+    async def close(self) -> None:
+        """Make every idle worker exit."""
+        for task in self._replenish_tasks:
+            task.cancel()
+        await asyncio.gather(*self._replenish_tasks, return_exceptions=True)
+        workers = list(self._workers.values())
+        self._workers.clear()
+        for worker in workers:
+            if worker.stdin is not None:
+                worker.stdin.close()
+        for worker in workers:
+            try:
+                await asyncio.wait_for(worker.wait(), WORKER_EXIT_TIMEOUT)
+            except TimeoutError:
+                worker.kill()
+                await worker.wait()
+
+    def _schedule_replenish(self, app: str) -> None:
+        async def replenish() -> None:
+            await asyncio.sleep(self.replenish_delay)
+            await self._spawn(app)
+
+        task = asyncio.create_task(replenish(), name=f"replenish-{app}")
+        self._replenish_tasks.add(task)
+        task.add_done_callback(self._replenish_tasks.discard)
+
+    async def _spawn(self, app: str) -> None:
+        if self.has_worker(app):
+            return
+        env = os.environ.copy()
+        env["PYTHONPATH"] = str(PROJECT_ROOT_PATH)
+        kwargs: dict[str, object] = {}
+        if sys.platform == "win32":
+            # Each app needs its own console for the terminal window manager, kept
+            # hidden until the worker is handed off the app.
+            startupinfo = subprocess.STARTUPINFO()
+            startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+            startupinfo.wShowWindow = SW_HIDE
+            kwargs["creationflags"] = subprocess.CREATE_NEW_CONSOLE
+            kwargs["startupinfo"] = startupinfo
+        try:
+            worker = await asyncio.create_subprocess_exec(
+                self.python_executable,
+                "-m",
+                WARM_WORKER_MODULE,
+                app,
+                stdin=asyncio.subprocess.PIPE,
+                cwd=PROJECT_ROOT_PATH,
+                env=env,
+                **kwargs,  # pyright: ignore[reportArgumentType]
+            )
+        except OSError:
+            self.logger.exception(f"Could not spawn a warm worker for {app}")
+            return
+        self._workers[app] = worker
+        self.logger.info(f"Spawned warm worker {worker.pid} for {app}")
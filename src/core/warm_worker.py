@@ -0,0 +1,126 @@
+"""Pre-warmed interpreter an app is handed off to, to skip most of its startup cost.
+
+A fresh interpreter spends seconds importing cv2, skimage, numpy, sentence
+transformers... and running the apps' module level setup before doing anything useful.
+A warm worker does all of that ahead of time: it imports the app's entry module (and
+runs its optional `warm_up()` function), then blocks until it is handed off the app
+through its stdin, at which point it runs the entry module as `__main__`. Everything
+the entry module imports is already in `sys.modules` by then.
+
+Windows has no `fork()`, so each worker is a regular process dedicated to one app,
+spawned by the `WarmWorkerPool` with a hidden console that is shown on hand-off.
+
+Handoff protocol, one line on stdin:
+    run <launch timestamp> [<launch mode>]
+
+End of file on stdin means the worker is not needed anymore and makes it exit.
+
+Usage:
+    python -m src.core.warm_worker shopwatcher
+
+"""
+
+import argparse
+import importlib
+import json
+import os
+import runpy
+import sys
+from typing import Protocol, cast
+
+from src.connection.constants import APP_ENTRY_MODULES
+from src.utils.startup_timing import mark_launch, seconds_since_launch
+
+HANDOFF_COMMAND = "run"
+READY_ANNOUNCEMENT = "WARM_WORKER_READY"
+DEFAULT_LAUNCH_MODE = "warm"
+MIN_HANDOFF_PARTS = 2
+WARM_UP_FUNCTION_NAME = "warm_up"
+SW_SHOWNOACTIVATE = 4
+
+
+class Args(Protocol):
+    """Protocol for command-line arguments."""
+
+    app: str
+    announce_ready: bool
+    dry_run: bool
+
+
+def warm_up(module_name: str) -> None:
+    """Import an entry module and run its optional `warm_up()` function."""
+    module = importlib.import_module(module_name)
+    warm_up_function = getattr(module, WARM_UP_FUNCTION_NAME, None)
+    if callable(warm_up_function):
+        warm_up_function()
+
+
+def wait_for_handoff() -> tuple[float, str] | None:
+    """Block until the app is handed off.
+
+    Returns:
+        The launch timestamp and mode sent along with the handoff, or None if the
+        worker should exit instead.
+
+    """
+    parts = sys.stdin.readline().split()
+    if len(parts) < MIN_HANDOFF_PARTS or parts[0] != HANDOFF_COMMAND:
+        return None
+    try:
+        launched_at = float(parts[1])
+    except ValueError:
+        return None
+    mode = parts[2] if len(parts) > MIN_HANDOFF_PARTS else DEFAULT_LAUNCH_MODE
+    return launched_at, mode
+
+
+def _take_over_console() -> None:
+    # stdin was the handoff pipe, give the app the same stdin a fresh one would get.
+    if sys.platform == "win32":
+        import ctypes
+
+        hwnd = ctypes.windll.kernel32.GetConsoleWindow()
+        if hwnd:
+            ctypes.windll.user32.ShowWindow(hwnd, SW_SHOWNOACTIVATE)
+        sys.stdin = open("CONIN$", encoding="utf-8")  # noqa: SIM115, PTH123
+    else:
+        sys.stdin = open(os.devnull, encoding="utf-8")  # noqa: SIM115, PTH123
+
+
+def main() -> None:
+    """Warm up, wait for the handoff and run the app."""
+    parser = argparse.ArgumentParser(description="Pre-warmed app worker.")
+    parser.add_argument("app", choices=sorted(APP_ENTRY_MODULES))
+    parser.add_argument(
+        "--announce-ready",
+        action="store_true",
+        help=f"Print {READY_ANNOUNCEMENT} on stdout once warmed up",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Print the launch to main() time as JSON instead of running the app",
+    )
+    args = cast("Args", cast("object", parser.parse_args()))
+    module_name = APP_ENTRY_MODULES[args.app]
+
+    warm_up(module_name)
+    if args.announce_ready:
+        print(READY_ANNOUNCEMENT, flush=True)
+
+    handoff = wait_for_handoff()
+    if handoff is None:
+        return
+    launched_at, mode = handoff
+    mark_launch(os.environ, mode, launched_at)
+    _take_over_console()
+
+    if args.dry_run:
+        print(json.dumps({"launch_to_main_seconds": seconds_since_launch()}))
+        return
+    sys.argv = [module_name]
+    runpy.run_module(module_name, run_name="__main__", alter_sys=True)
+
+
+if __name__ == "__main__":
+    main()
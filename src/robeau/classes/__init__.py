@@ -1 +0,0 @@
-print("reached robeau classes __init__")
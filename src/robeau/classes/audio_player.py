@@ -2,6 +2,7 @@ import json
 import os
 import random
 import threading
+import time
 from logging import Logger
 from threading import Event, Thread
 from typing import Literal, Optional
@@ -9,12 +10,18 @@ from typing import Literal, Optional
 import pygame
 
 from src.robeau.core.robeau_constants import ROBEAU_DIR_PATH
+from src.utils.metrics import registry
 
+audio_start_seconds = registry.histogram(
+    "robeau_audio_start_seconds",
+    "Time between asking for a response's audio and its sound starting to play",
+)
 
-class AudioPlayer:
-    pygame.mixer.init()
 
+class AudioPlayer:
     def __init__(self, mappings_file, logger: Logger):
+        if not pygame.mixer.get_init():
+            pygame.mixer.init()
         with open(mappings_file, "r") as file:
             self.audio_mappings = json.load(file)["nodes"]
         self.logger = logger
@@ -53,7 +60,7 @@ class AudioPlayer:
         thread_name = f"AudioThread-{response_string}-{len(self.playing_threads) + 1}"
         thread = threading.Thread(
             target=self._play_audio,
-            args=(response_string, stop_event),
+            args=(response_string, stop_event, time.perf_counter()),
             name=thread_name,
             daemon=True,
         )
@@ -64,7 +71,7 @@ class AudioPlayer:
         thread.start()
         self.logger.info(f"Started thread {thread_name}")
 
-    def _play_audio(self, response_string: str, stop_event):
+    def _play_audio(self, response_string: str, stop_event, requested_at: float):
         try:
             audio_files = self._get_audio_files(response_string)
             if not audio_files:
@@ -92,6 +99,7 @@ class AudioPlayer:
 
             sound = pygame.mixer.Sound(audio_file)
             channel = sound.play()
+            audio_start_seconds.observe(time.perf_counter() - requested_at)
 
             self.logger.info(f"Playing audio file: {audio_file}")
             while channel.get_busy():
@@ -2,6 +2,7 @@ import random
 import threading
 import time
 from collections import defaultdict
+from functools import cache
 from logging import Logger
 from threading import Thread
 from typing import Literal, Optional
@@ -37,14 +38,29 @@ from src.robeau.core.graph_logic_network_constants import (
     QuerySource,
     transmission_output_nodes,
 )
+from src.robeau.core.graph_tracer import (
+    GraphTracer,
+    LazyFormat,
+    connections_summary,
+    format_connections,
+)
 from src.robeau.core.robeau_constants import (
     ROBEAU_RESPONSES_JSON_FILE_PATH as ROBEAU_RESPONSES,
 )
 from src.utils.helpers import construct_script_name
 from src.utils.logging_utils import log_empty_lines, setup_logger
+from src.utils.metrics import registry
 
 SCRIPT_NAME = construct_script_name(__file__)
 logger = setup_logger(SCRIPT_NAME)
+tracer = GraphTracer(logger)
+nodes_processed = registry.counter(
+    "robeau_nodes_processed_total", "Nodes processed by the graph engine"
+)
+node_chain_seconds = registry.histogram(
+    "robeau_node_chain_seconds",
+    "Time to process an input node and the chain of nodes it leads to",
+)
 
 
 class TypingDetector:
@@ -368,6 +384,9 @@ class ConversationState:
                 self.logger.info(f"Removed {definition_type}: <{node}>")
 
     def log_conversation_state(self):
+        self.logger.info("%s", LazyFormat(self.format_conversation_state))
+
+    def format_conversation_state(self) -> str:
         log_message = []
 
         states = {"stubborn": self.stubborn, "unresponsive": self.unresponsive}
@@ -404,10 +423,13 @@ class ConversationState:
         log_message.extend(sorted(attitude_messages))
         log_message.extend(listening_context_message)
 
-        self.logger.info("\n".join(log_message))
+        return "\n".join(log_message)
 
 
-audio_player = AudioPlayer(ROBEAU_RESPONSES, logger=logger)
+@cache
+def get_audio_player() -> AudioPlayer:
+    """Return the shared audio player, created on first use."""
+    return AudioPlayer(ROBEAU_RESPONSES, logger=logger)
 
 processing_nodes_audio = threading.Event()
 audio_player_first_callback = threading.Event()
@@ -451,7 +473,7 @@ def reset_audio_events():
 
 
 def interrupt_robeau():
-    audio_player.stop_audio()
+    get_audio_player().stop_audio()
     if node_thread:
         node_thread.join()
 
@@ -503,6 +525,7 @@ def play_audio(
         audio_finished_event.set()
         conversation_state.cutoff = False
 
+    audio_player = get_audio_player()
     audio_player.set_callbacks(
         on_start=on_start,
         on_stop=on_stop,
@@ -652,12 +675,21 @@ def filter_logic_connections(
     if not then_conns:
         logger.error(f'No "THEN" connection found for LogicGate: <{logic_gate}>')
 
-    formatted_and_conns = "\nAnd: ".join([str(and_conn) for and_conn in and_conns])
-    formatted_then_conns = "\nThen: ".join([str(then_conn) for then_conn in then_conns])
-
+    tracer.record(
+        "logic-gate",
+        logic_gate,
+        {
+            "initial": initial_conn[0]["relationship"] if initial_conn else None,
+            "and": len(and_conns),
+            "then": tuple(conn["end_node"] for conn in then_conns),
+        },
+    )
     logger.info(
-        f"LogicGate <{logic_gate}> connections: \nInitial: {initial_conn} "
-        f"\nAnd: {formatted_and_conns} \nThen: {formatted_then_conns}"
+        "LogicGate <%s> connections: \nInitial: %s \nAnd: %s \nThen: %s",
+        logic_gate,
+        initial_conn,
+        LazyFormat(format_connections, and_conns, "\nAnd: "),
+        LazyFormat(format_connections, then_conns, "\nThen: "),
     )
     return initial_conn, and_conns, then_conns
 
@@ -870,15 +902,23 @@ def define_random_pools(connections: list[dict]) -> list[list[dict]]:
     result = list(grouped_data.values())
 
     if result:
-        formatted_pools = "\n".join(
-            f"\ngroup{index}:\n" + "\n".join(map(str, group))
-            for index, group in enumerate(result)
+        tracer.record(
+            "random-pools",
+            result[0][0]["start_node"],
+            {pool_id: len(group) for pool_id, group in grouped_data.items()},
         )
-        logger.info(f"Random pools defined: {formatted_pools}")
+        logger.info("Random pools defined: %s", LazyFormat(format_random_pools, result))
 
     return result
 
 
+def format_random_pools(random_pools: list[list[dict]]) -> str:
+    return "\n".join(
+        f"\ngroup{index}:\n" + format_connections(group)
+        for index, group in enumerate(random_pools)
+    )
+
+
 def process_random_connections(
     random_connection: list[dict], conversation_state: ConversationState
 ) -> list[dict]:
@@ -1075,36 +1115,37 @@ def process_relationships(
     cutoff: Optional[bool] = False,
 ) -> list[str]:
     def log_formatted_connections(relationships_map: dict[str, list[dict]]):
-        conns_from_map = []
+        conns_from_map = any(relationships_map.values())
         cutoff_status = "(cutoff)" if cutoff else ""
-        for connection in relationships_map.values():
-            conns_from_map.extend(connection)
 
-        formatted_connections = "\n".join(
-            [str(connection) for connection in connections]
-        )
-        formatted_silent_connections = "\n".join(
-            [
-                str(connection)
+        if silent and conns_from_map:
+            silent_connections = [
+                connection
                 for connection in connections
                 if connection["relationship"]
                 not in ("CHECKS", "ATTEMPTS", "TRIGGERS", "DEFAULTS", "CUTSOFF")
             ]
-        )
-        if silent and conns_from_map:
             logger.info(
-                f"Processing SILENT connections {cutoff_status} (activation relationships were not applied) "
-                f"for node <{node}> ({source.name}):\n{formatted_silent_connections}"
+                "Processing SILENT connections %s (activation relationships were not "
+                "applied) for node <%s> (%s):\n%s",
+                cutoff_status,
+                node,
+                source.name,
+                LazyFormat(format_connections, silent_connections),
             )
         elif conns_from_map:
             logger.info(
-                f"Processing connections for node <{node}> from source "
-                f"{source.name} {cutoff_status}:\n{formatted_connections}"
+                "Processing connections for node <%s> from source %s %s:\n%s",
+                node,
+                source.name,
+                cutoff_status,
+                LazyFormat(format_connections, connections),
             )
-        elif not conns_from_map:
+        else:
             logger.warning(
-                f"No connections found to process in: \n{formatted_connections}\n "
-                f"Must not be bound to a valid key in the relationships_map"
+                "No connections found to process in: \n%s\n "
+                "Must not be bound to a valid key in the relationships_map",
+                LazyFormat(format_connections, connections),
             )
 
     relationships_map: dict[str, list[dict]] = {
@@ -1142,6 +1183,11 @@ def process_relationships(
         if relationship in relationships_map:
             relationships_map[relationship].append(connection)
 
+    tracer.record(
+        "silent-connections" if silent else "connections",
+        node,
+        connections_summary(connections),
+    )
     conversation_state.log_conversation_state()
 
     log_formatted_connections(relationships_map)
@@ -1454,6 +1500,9 @@ def process_node(
     input_node: Optional[bool] = False,
 ):
     log_empty_lines(logger=logger, lines=7 if main_call else 0)
+    started_at = time.perf_counter()
+    nodes_processed.inc()
+    tracer.record("start", node, source.name + (" (OG)" if main_call else ""))
 
     if input_node:
         logger.info(f">>> Start of intermediary input process for: <{node}>")
@@ -1473,9 +1522,12 @@ def process_node(
     )
 
     if not connections:
+        tracer.record("no-connections", node, source.name)
         logger.info(
             f"No connection obtained for node: <{node}> from source {source.name}"
         )
+        if main_call:
+            node_chain_seconds.observe(time.perf_counter() - started_at)
         return
 
     response_nodes_reached = process_relationships(
@@ -1506,6 +1558,9 @@ def process_node(
             cutoff=conversation_state.cutoff,
         )
 
+    tracer.record("end", node, tuple(response_nodes_reached))
+    if main_call:
+        node_chain_seconds.observe(time.perf_counter() - started_at)
     logger.info(
         f"End of process for node: <{node}> from source {source.name}"
         + (" (OG)" if main_call else "")
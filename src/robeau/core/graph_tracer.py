@@ -0,0 +1,116 @@
+"""Tracing of the graph engine's node processing, cheap enough for every node.
+
+Two things make tracing a node cheap:
+- Log messages that describe connections, pools or the conversation state are
+  passed as `LazyFormat` arguments, so that they are only built when the logger's
+  level lets the record through, instead of `str()`-ing every connection anyway.
+- Each step of the processing is also recorded as a `NodeEvent` in a fixed size
+  ring buffer, which holds references to the data rather than formatted text. The
+  recent history of the engine can then be dumped on demand, e.g. with the
+  `trace-dump` command, whatever the logging level.
+"""
+
+import time
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass
+from logging import Logger
+from typing import final
+
+EVENT_BUFFER_SIZE = 512
+
+
+@final
+class LazyFormat:
+    """Log argument built by calling `build(*args)`, only if the record is emitted.
+
+    Usage:
+        logger.info("Random pools defined: %s", LazyFormat(format_pools, pools))
+
+    """
+
+    __slots__ = ("args", "build")
+
+    def __init__(self, build: Callable[..., str], *args: object) -> None:
+        """Keep the function building the text and its arguments."""
+        self.build = build
+        self.args = args
+
+    def __str__(self) -> str:
+        """Build the text."""
+        return self.build(*self.args)
+
+
+@dataclass(frozen=True, slots=True)
+class NodeEvent:
+    """A step of the graph engine's processing."""
+
+    timestamp: float
+    kind: str
+    node: str
+    detail: object = None
+
+    def format(self) -> str:
+        """Format the event as a single line."""
+        clock = time.strftime("%H:%M:%S", time.localtime(self.timestamp))
+        millis = int(self.timestamp % 1 * 1000)
+        line = f"{clock}.{millis:03d} {self.kind:<16} <{self.node}>"
+        return line if self.detail is None else f"{line} {self.detail}"
+
+
+@final
+class GraphTracer:
+    """Ring buffer of the graph engine's recent node events."""
+
+    def __init__(self, logger: Logger, capacity: int = EVENT_BUFFER_SIZE) -> None:
+        """Start with an empty buffer.
+
+        Args:
+            logger: Logger the dumps are written to.
+            capacity: Amount of events kept, the oldest ones are dropped first.
+
+        """
+        self.logger = logger
+        self.events: deque[NodeEvent] = deque(maxlen=capacity)
+        self.recorded = 0
+
+    def record(self, kind: str, node: str, detail: object = None) -> None:
+        """Record an event, `detail` is only formatted if the event is dumped.
+
+        Details should be immutable, or not mutated afterwards, e.g. tuples of the
+        connections' relationships and end nodes.
+        """
+        self.events.append(NodeEvent(time.time(), kind, node, detail))
+        self.recorded += 1
+
+    def dump(self, limit: int | None = None) -> list[str]:
+        """Format the most recent events, oldest first, and write them to the log.
+
+        Args:
+            limit: Amount of events to dump, all of the buffer's by default.
+
+        Returns:
+            The formatted events.
+
+        """
+        events = list(self.events.copy())  # Copied atomically, nodes keep recording
+        if limit is not None:
+            events = events[-limit:] if limit > 0 else []
+        lines = [event.format() for event in events]
+        self.logger.info(
+            "Graph trace dump, %d of %d recorded events:\n%s",
+            len(lines),
+            self.recorded,
+            "\n".join(lines),
+        )
+        return lines
+
+
+def format_connections(connections: list, separator: str = "\n") -> str:
+    """Format connections one per line, each line after the first led by `separator`."""
+    return separator.join(map(str, connections))
+
+
+def connections_summary(connections: list[dict]) -> tuple[tuple[str, str], ...]:
+    """Return the relationship and end node of each connection, for an event."""
+    return tuple((conn["relationship"], conn["end_node"]) for conn in connections)
@@ -0,0 +1,27 @@
+"""Lazy access to the SBERT matcher shared by the Robeau modules.
+
+Loading the sentence transformers model and embedding all the prompts takes seconds,
+so it is only done the first time the matcher is actually needed.
+"""
+
+from functools import cache
+from typing import TYPE_CHECKING
+
+from src.robeau.core.robeau_constants import (
+    ROBEAU_PROMPTS_JSON_FILE_PATH as ROBEAU_PROMPTS,
+)
+
+if TYPE_CHECKING:
+    from src.robeau.classes.sbert_matcher import SBERTMatcher
+
+SIMILARITY_THRESHOLD = 0.65
+
+
+@cache
+def get_sbert_matcher() -> "SBERTMatcher":
+    """Return the shared matcher, loading the model and embeddings on first use."""
+    from src.robeau.classes.sbert_matcher import SBERTMatcher  # type: ignore
+
+    return SBERTMatcher(
+        file_path=ROBEAU_PROMPTS, similarity_threshold=SIMILARITY_THRESHOLD
+    )
@@ -0,0 +1,7 @@
+"""Socket handler for the Robeau app."""
+
+from src.connection.socket_server import BaseHandler
+
+
+class RobeauSocketHandler(BaseHandler):
+    """Handles the control socket connections for the Robeau app."""
@@ -1,7 +1,7 @@
 import os
 import queue
 import threading
-from typing import Optional
+from typing import Callable, Optional
 
 import pyaudio
 from google.cloud import speech
@@ -95,7 +95,16 @@ async def listen_print_loop(
 
 # noinspection PyTypeChecker, PyArgumentList
 # Really no idea why there are so many type errors here, but it works totally fine
-async def recognize_speech(handler, pause_event: Optional[threading.Event] = None):
+async def recognize_speech(
+    handler,
+    pause_event: Optional[threading.Event] = None,
+    on_listening: Optional[Callable[[], None]] = None,
+):
+    """Stream the microphone to Google and hand the final transcripts to `handler`.
+
+    `on_listening` is called once the microphone stream and the recognition stream
+    are open.
+    """
     client = speech.SpeechClient()
     config = speech.RecognitionConfig(
         encoding=speech.RecognitionConfig.AudioEncoding.LINEAR16,
@@ -120,4 +129,6 @@ async def recognize_speech(handler, pause_event: Optional[threading.Event] = Non
             config=streaming_config,
             requests=requests,
         )  # type: ignore
+        if on_listening is not None:
+            on_listening()
         await listen_print_loop(responses, handler, pause_event)
@@ -1,34 +1,55 @@
 import asyncio
+import contextlib
+import json
 import logging
 import re
+import threading
+import time
 
 from neo4j import Session
 
-from src.robeau.classes.sbert_matcher import SBERTMatcher  # type: ignore
+from src.connection.constants import (
+    STOP_SUBPROCESS_MESSAGE,
+    SUBPROCESSES_PORTS,
+    TRACE_DUMP_COMMAND,
+)
+from src.connection.control_protocol import ReadinessStage
+from src.connection.ipc import subprocess_socket_path
+from src.connection.socket_server import MAX_RESULT_BYTES
 from src.robeau.core.graph_logic_network import (
     ConversationState,
     cleanup,
+    get_audio_player,
     initialize,
     interrupt_robeau,
     launch_specified_query,
     robeau_is_listening,
     robeau_is_talking,
+    tracer,
 )
-from src.robeau.core.robeau_constants import (
-    ROBEAU_PROMPTS_JSON_FILE_PATH as ROBEAU_PROMPTS,
-)
+from src.robeau.core.sbert import get_sbert_matcher
+from src.robeau.core.socket_handler import RobeauSocketHandler
 from src.robeau.core.speech_recognition import recognize_speech
+from src.utils.frame_stats import FrameStats
 from src.utils.helpers import construct_script_name
 from src.utils.logging_utils import setup_logger
 from src.utils.script_initializer import setup_script
+from src.utils.startup_timing import report_startup_milestone
 
 SCRIPT_NAME = construct_script_name(__file__)
-
+PORT = SUBPROCESSES_PORTS["robeau"]
+SOCKET_PATH = subprocess_socket_path("robeau")
 
 logger = setup_logger(SCRIPT_NAME)
 
+STATUS_LOCK_TIMEOUT = 0.2
+"""Seconds a status request waits for the message being processed to be done."""
 
-sbert_matcher = SBERTMatcher(file_path=ROBEAU_PROMPTS, similarity_threshold=0.65)
+
+def warm_up():
+    """Load the heavy models ahead of time, called by `warm_worker` processes."""
+    get_sbert_matcher()
+    get_audio_player()
 
 
 def check_greeting_in_message(msg: str):
@@ -36,7 +57,7 @@ def check_greeting_in_message(msg: str):
     words = msg.split()
     segments = [" ".join(words[:i]) for i in range(2, 5)]
     for segment in segments:
-        greeting, _ = sbert_matcher.check_for_best_matching_synonym(
+        greeting, _ = get_sbert_matcher().check_for_best_matching_synonym(
             segment, show_details=True, labels=["Greeting"]
         )
         if greeting and "hey robeau" in greeting.lower():
@@ -45,7 +66,7 @@ def check_greeting_in_message(msg: str):
 
 
 def check_for_stop_command(message: str):
-    stop_command, data = sbert_matcher.check_for_best_matching_synonym(
+    stop_command, data = get_sbert_matcher().check_for_best_matching_synonym(
         message,
         show_details=True,
         labels=["StopCommand", "StopCommandRude", "StopCommandPolite"],
@@ -83,13 +104,88 @@ class RobeauHandler:
         self,
         session: Session,
         conversation_state: ConversationState,
+        socket_handler: RobeauSocketHandler,
     ):
-        self.stop_event = asyncio.Event()
+        self.stop_event = socket_handler.stop_event
         self.session = session
         self.conversation_state = conversation_state
+        self.message_stats = FrameStats()
+        self.speech_error: Exception | None = None
+        self._register_control_hooks(socket_handler)
+        report_startup_milestone("ready to listen", logger)
         print("Waiting for greeting...")
 
+    def _register_control_hooks(self, socket_handler: RobeauSocketHandler):
+        socket_handler.add_status_provider(self.get_status)
+        socket_handler.add_metrics_provider(self.get_metrics)
+        socket_handler.register_config_option(
+            "similarity_threshold",
+            lambda: get_sbert_matcher().similarity_threshold,
+            lambda value: setattr(get_sbert_matcher(), "similarity_threshold", value),
+        )
+        socket_handler.register_command(TRACE_DUMP_COMMAND, self.dump_trace)
+
+    def get_status(self) -> dict[str, object]:
+        status: dict[str, object] = {
+            "talking": robeau_is_talking.is_set(),
+            "speech_recognition": (
+                "running" if self.speech_error is None else f"{self.speech_error!r}"
+            ),
+        }
+        # The state is changed by the speech recognition thread, under its lock
+        state = self.conversation_state
+        if not state.lock.acquire(timeout=STATUS_LOCK_TIMEOUT):
+            status["processing_message"] = True
+            return status
+        try:
+            status.update(
+                {
+                    "listening": bool(robeau_is_listening(state)),
+                    "stubborn": state.stubborn["state"],
+                    "unresponsive": state.unresponsive["state"],
+                    "attitude_levels": dict(state.attitude_levels),
+                    "listening_context": state.listening_context,
+                    "context": {
+                        key: len(items) for key, items in state.context.items()
+                    },
+                }
+            )
+        finally:
+            state.lock.release()
+        return status
+
+    def get_metrics(self) -> dict[str, object]:
+        return {
+            "messages_handled": self.message_stats.frames,
+            "avg_message_handling_ms": round(self.message_stats.avg_processing_ms, 3),
+            "last_message_handling_ms": round(
+                self.message_stats.last_processing_ms, 3
+            ),
+        }
+
+    async def dump_trace(self, params: dict[str, object]) -> dict[str, object]:
+        limit = params.get("limit")
+        if limit is not None and not isinstance(limit, int):
+            e = f"limit must be an integer, got {limit!r}"
+            raise ValueError(e)
+        lines = tracer.dump(limit)
+        # The log gets the whole dump, the reply the most recent events fitting in it
+        events = _most_recent_within(lines, MAX_RESULT_BYTES)
+        return {
+            "recorded": tracer.recorded,
+            "events": events,
+            "omitted": len(lines) - len(events),
+        }
+
     async def handle_message(self, message: str):
+        start_time = time.perf_counter()
+        try:
+            with self.conversation_state.lock:
+                await self._handle_message(message)
+        finally:
+            self.message_stats.record(time.perf_counter() - start_time)
+
+    async def _handle_message(self, message: str):
         if robeau_is_talking.is_set():
             print("Robeau is talking.")
             stop_command, rudeness_points = check_for_stop_command(message)
@@ -120,7 +216,7 @@ class RobeauHandler:
             self.greet(silent=False)
 
     def handle_remaining_message(self, remaining_message: str):
-        matched_message, _ = sbert_matcher.check_for_best_matching_synonym(
+        matched_message, _ = get_sbert_matcher().check_for_best_matching_synonym(
             remaining_message, show_details=True, labels=["Prompt"]
         )
         log_matching_synonym(matched_message, remaining_message)
@@ -129,7 +225,7 @@ class RobeauHandler:
 
     def process_message(self, message: str):
         labels = self.determine_labels()
-        matched_message, _ = sbert_matcher.check_for_best_matching_synonym(
+        matched_message, _ = get_sbert_matcher().check_for_best_matching_synonym(
             message, show_details=True, labels=labels
         )
         log_matching_synonym(matched_message, message)
@@ -171,21 +267,88 @@ class RobeauHandler:
         )
 
 
+def _most_recent_within(lines: list[str], max_bytes: int) -> list[str]:
+    """Return the last lines whose JSON encoding fits in max_bytes, in order."""
+    kept: list[str] = []
+    size = 0
+    for line in reversed(lines):
+        size += len(json.dumps(line)) + 2  # With the ", " separator
+        if size > max_bytes:
+            break
+        kept.append(line)
+    kept.reverse()
+    return kept
+
+
+def run_speech_recognition(
+    handler: RobeauHandler,
+    pause_event: threading.Event,
+    socket_handler: RobeauSocketHandler,
+):
+    """Run the (blocking) speech recognition loop in its own thread and event loop,
+    leaving the main event loop free to serve the control socket.
+
+    The app is reported listening once the microphone stream is open. If the loop
+    fails or ends, its error is kept in `handler.speech_error` and the app stops.
+    """
+    loop = asyncio.get_running_loop()
+
+    def call_in_main_loop(callback, *args) -> None:
+        # The main loop is closed if the app stopped before the thread ended
+        with contextlib.suppress(RuntimeError):
+            loop.call_soon_threadsafe(callback, *args)
+
+    def recognize() -> None:
+        try:
+            asyncio.run(
+                recognize_speech(
+                    handler,
+                    pause_event,
+                    on_listening=lambda: call_in_main_loop(
+                        socket_handler.mark_ready, ReadinessStage.LISTENING
+                    ),
+                )
+            )
+        except Exception as e:
+            handler.speech_error = e
+            logger.exception("Speech recognition failed")
+        finally:
+            call_in_main_loop(handler.stop_event.set)
+
+    thread = threading.Thread(
+        target=recognize, name="SpeechRecognitionThread", daemon=True
+    )
+    thread.start()
+    return thread
+
+
 async def main():
     db_conn = None
     driver = None
     stop_event = None
     update_thread = None
+    socket_server_task = None
 
     try:
         db_conn, _ = await setup_script(SCRIPT_NAME)
+        socket_handler = RobeauSocketHandler(
+            port=PORT,
+            stop_message=STOP_SUBPROCESS_MESSAGE,
+            logger=logger,
+            socket_path=SOCKET_PATH,
+            readiness_stages=(ReadinessStage.SOCKET_SERVER, ReadinessStage.LISTENING),
+        )
+        socket_server_task = asyncio.create_task(socket_handler.run_socket_server())
+
         driver, session, conversation_state, stop_event, update_thread, pause_event = (
             initialize()
         )
-        handler = RobeauHandler(session, conversation_state)
-        recognize_task = asyncio.create_task(recognize_speech(handler, pause_event))
+        get_sbert_matcher()  # Load the model before listening, not on the first message
+        handler = RobeauHandler(session, conversation_state, socket_handler)
+        run_speech_recognition(handler, pause_event, socket_handler)
         await handler.stop_event.wait()
-        await recognize_task
+        if handler.speech_error is not None:
+            raise handler.speech_error
 
     except Exception as e:
         logging.exception(f"Unexpected error: {e}")
@@ -193,6 +356,9 @@ async def main():
         raise
 
     finally:
+        if socket_server_task:
+            socket_server_task.cancel()
+            await socket_server_task
         if db_conn:
             await db_conn.close()
         cleanup(driver, session, stop_event, update_thread)
@@ -0,0 +1,70 @@
+"""Lightweight running statistics for detection loops."""
+
+import time
+from typing import final
+
+from src.utils.metrics import HistogramValue, registry
+
+SMOOTHING_FACTOR = 0.1
+"""Weight of the newest sample in the exponential moving averages."""
+
+frame_seconds = registry.histogram(
+    "detection_frame_seconds", "Processing time of a detection loop frame", ("loop",)
+)
+frames_per_second = registry.gauge(
+    "detection_fps", "Frame rate of a detection loop", ("loop",)
+)
+
+
+@final
+class FrameStats:
+    """Track the frame rate and processing time of a detection loop.
+
+    Uses exponential moving averages so recording a frame is O(1) and allocation free,
+    which keeps it cheap enough to be called on every iteration of a scanning loop.
+    """
+
+    def __init__(self, loop: str | None = None) -> None:
+        """Initialize empty statistics.
+
+        Args:
+            loop: Name the loop's frames are exported under in the metrics registry,
+                they are not exported if None.
+
+        """
+        self.frames = 0
+        self.fps = 0.0
+        self.avg_processing_ms = 0.0
+        self.last_processing_ms = 0.0
+        self._last_frame_time: float | None = None
+        self._frame_seconds: HistogramValue | None = None
+        if loop is not None:
+            self._frame_seconds = frame_seconds.labels(loop=loop)
+            frames_per_second.labels(loop=loop).set_function(lambda: self.fps)
+
+    def record(self, processing_seconds: float) -> None:
+        """Record a processed frame and the time it took to process it."""
+        now = time.perf_counter()
+        self.frames += 1
+        self.last_processing_ms = processing_seconds * 1000
+        if self._last_frame_time is None:
+            self.avg_processing_ms = self.last_processing_ms
+        else:
+            interval = now - self._last_frame_time
+            if interval > 0:
+                self.fps += SMOOTHING_FACTOR * (1 / interval - self.fps)
+            self.avg_processing_ms += SMOOTHING_FACTOR * (
+                self.last_processing_ms - self.avg_processing_ms
+            )
+        self._last_frame_time = now
+        if self._frame_seconds is not None:
+            self._frame_seconds.observe(processing_seconds)
+
+    def as_dict(self) -> dict[str, object]:
+        """Return the statistics as a JSON serializable dictionary."""
+        return {
+            "frames": self.frames,
+            "fps": round(self.fps, 2),
+            "avg_processing_ms": round(self.avg_processing_ms, 3),
+            "last_processing_ms": round(self.last_processing_ms, 3),
+        }
@@ -1,11 +1,18 @@
 """Helper functions for various utilities."""
 
+import os
+import sys
 import time
 from logging import Logger
 from pathlib import Path
 
 import cv2 as cv
 
+# Windows API constants used to look processes up
+PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+STILL_ACTIVE = 259
+ERROR_ACCESS_DENIED = 5
+
 
 def print_countdown(duration: int = 3) -> None:
     """Print a countdown from the specified duration in seconds."""
@@ -50,6 +57,47 @@ def construct_script_name(file_path: str) -> str:
     return base_name
 
 
+def pid_is_alive(pid: int) -> bool:
+    """Tell if a process with the given PID is running.
+
+    A PID can be reused once its process is gone, so a True answer only means that
+    some process has this PID.
+
+    Args:
+        pid: The process ID to look for.
+
+    Returns:
+        True if a process with this PID exists, False otherwise.
+
+    """
+    if pid <= 0:
+        return False
+    if sys.platform == "win32":
+        import ctypes
+
+        # ctypes keeps its own copy of the last error, the interpreter may have
+        # overwritten the thread's one by the time it is read
+        kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+        handle = kernel32.OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+        if not handle:
+            # Access denied means the process exists but belongs to someone else
+            return ctypes.get_last_error() == ERROR_ACCESS_DENIED
+        try:
+            exit_code = ctypes.c_ulong()
+            if not kernel32.GetExitCodeProcess(handle, ctypes.byref(exit_code)):
+                return False
+            return exit_code.value == STILL_ACTIVE
+        finally:
+            kernel32.CloseHandle(handle)
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
 def load_grayscale_opencv_template(
     template_path: Path, logger: Logger | None = None
 ) -> cv.typing.MatLike:
@@ -0,0 +1,148 @@
+"""Report how much time importing each app entry point costs, module by module.
+
+Every entry module is imported in a fresh interpreter run with `-X importtime`, whose
+report is parsed to show the total import time and the most expensive modules. The
+project's own modules are listed separately with their self time, which is where
+module level side effects (decoding images, loading models...) show up.
+
+Usage:
+    python -m src.utils.import_profiler shopwatcher robeau --top 15
+
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+from dataclasses import dataclass
+from typing import Protocol, cast
+
+from src.config.settings import PROJECT_ROOT_PATH
+from src.connection.constants import APP_ENTRY_MODULES
+
+IMPORT_TIME_LINE_PATTERN = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)")
+PROJECT_PACKAGE_PREFIX = "src."
+DEFAULT_TOP = 15
+
+
+class Args(Protocol):
+    """Protocol for command-line arguments."""
+
+    apps: list[str]
+    top: int
+
+
+@dataclass(frozen=True)
+class ModuleImport:
+    """Import cost of a module, in microseconds, as reported by `-X importtime`."""
+
+    name: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+@dataclass(frozen=True)
+class ImportProfile:
+    """Import cost of an entry module and of everything it imports."""
+
+    module: str
+    imports: list[ModuleImport]
+    error: str | None = None
+
+    @property
+    def total_us(self) -> int:
+        """Time spent importing the entry module, dependencies included."""
+        return sum(imp.cumulative_us for imp in self.imports if imp.depth == 0)
+
+    def top(self, count: int) -> list[ModuleImport]:
+        """Return the `count` modules with the highest cumulative import time."""
+        by_cost = sorted(self.imports, key=lambda imp: imp.cumulative_us, reverse=True)
+        return by_cost[:count]
+
+    def project_modules(self) -> list[ModuleImport]:
+        """Return the project's own modules, by decreasing self import time."""
+        return sorted(
+            (
+                imp
+                for imp in self.imports
+                if imp.name.startswith(PROJECT_PACKAGE_PREFIX)
+            ),
+            key=lambda imp: imp.self_us,
+            reverse=True,
+        )
+
+
+def parse_import_times(report: str) -> list[ModuleImport]:
+    """Parse the stderr output of `python -X importtime`."""
+    imports: list[ModuleImport] = []
+    for line in report.splitlines():
+        match = IMPORT_TIME_LINE_PATTERN.match(line)
+        if match is None:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        imports.append(
+            ModuleImport(name, int(self_us), int(cumulative_us), len(indent) // 2)
+        )
+    return imports
+
+
+def profile_module_import(module: str) -> ImportProfile:
+    """Import a module in a fresh interpreter and collect its import times."""
+    env = os.environ.copy()
+    env["PYTHONPATH"] = str(PROJECT_ROOT_PATH)
+    completed = subprocess.run(  # noqa: S603
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT_PATH,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    error = None
+    if completed.returncode != 0:
+        error = completed.stderr.strip().splitlines()[-1]
+    return ImportProfile(module, parse_import_times(completed.stderr), error)
+
+
+def format_profile(profile: ImportProfile, top: int) -> str:
+    """Format a profile as a human readable report."""
+    lines = [f"{profile.module}: {profile.total_us / 1000:.1f} ms total"]
+    if profile.error:
+        lines.append(f"  import failed: {profile.error}")
+    lines.append(f"  top {top} by cumulative time (ms):")
+    lines.extend(
+        f"    {imp.cumulative_us / 1000:9.1f}  {imp.name}" for imp in profile.top(top)
+    )
+    lines.append("  project modules by self time (ms):")
+    lines.extend(
+        f"    {imp.self_us / 1000:9.1f}  {imp.name}"
+        for imp in profile.project_modules()[:top]
+    )
+    return "\n".join(lines)
+
+
+def main() -> None:
+    """Parse arguments, profile the entry modules and print the reports."""
+    parser = argparse.ArgumentParser(
+        description="Report the import time of the apps entry points."
+    )
+    parser.add_argument(
+        "apps",
+        nargs="*",
+        help=f"Apps to profile among {sorted(APP_ENTRY_MODULES)}, all by default",
+    )
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP)
+    args = cast("Args", cast("object", parser.parse_args()))
+    unknown_apps = set(args.apps) - APP_ENTRY_MODULES.keys()
+    if unknown_apps:
+        parser.error(f"unknown apps: {sorted(unknown_apps)}")
+
+    for app in args.apps or sorted(APP_ENTRY_MODULES):
+        profile = profile_module_import(APP_ENTRY_MODULES[app])
+        print(format_profile(profile, args.top), end="\n\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,52 +1,149 @@
+"""Single instance locks for the apps, based on OS advisory file locks.
+
+Each app holds an exclusive lock on its `<script_name>.lock` file for as long as it
+runs: `fcntl.flock` on POSIX, `msvcrt.locking` on Windows. The kernel releases the
+lock when the process exits, crash included, so a lock can never be stale: the file
+may outlive its process, but nobody holds its lock anymore. Taking the lock is also
+the check, which makes it atomic when two instances of an app start together.
+
+The holder writes its PID and the time it took the lock in the file, for display.
+"""
+
+import json
 import os
+import sys
+import time
 from logging import Logger
-from typing import Optional
+from typing import final
 
 from src.core import constants as const
 from src.utils.helpers import construct_script_name
 from src.utils.logging_utils import setup_logger
 
+if sys.platform == "win32":
+    import msvcrt
+else:
+    import fcntl
+
 LOCK_DIR = const.LOCK_FILES_DIR_PATH
 SCRIPT_NAME = construct_script_name(__file__)
 
+# Windows locks are mandatory: the locked byte is kept away from the holder's
+# information so that it stays readable by others.
+WINDOWS_LOCKED_BYTE_OFFSET = 1 << 20
+
+
+def lock_name_for_module(module: str) -> str:
+    """Return the lock name of an app from its entry module, e.g. "src.robeau.main".
+
+    Apps lock under their script name, see `construct_script_name`.
+    """
+    return construct_script_name(f"{module.replace('.', '/')}.py")
 
+
+@final
 class LockFileManager:
-    def __init__(self, script_name: str, logger: Optional[Logger] = None):
-        self.filename = script_name  # name of script instantiating the class
+    """Exclusive, kernel released lock ensuring a single instance of a script."""
+
+    def __init__(self, script_name: str, logger: Logger | None = None) -> None:
+        """Initialize the manager, the lock is not taken until `acquire()`.
+
+        Args:
+            script_name: Name of the script the lock is for.
+            logger: Logger instance, defaults to this module's logger.
+
+        """
+        self.filename = script_name
         self.lock_dir = LOCK_DIR
-        self.lock_file_path = os.path.join(self.lock_dir, f"{self.filename}.lock")
+        self.lock_file_path = self.lock_dir / f"{self.filename}.lock"
         self.logger = logger if logger is not None else setup_logger(SCRIPT_NAME)
-        self.class_name = self.__class__.__name__
+        self._fd: int | None = None
+        self.lock_dir.mkdir(parents=True, exist_ok=True)
 
-        if not os.path.exists(self.lock_dir):
-            print(f"[{self.class_name}] Creating lock directory at {self.lock_dir}")
-            os.makedirs(self.lock_dir)
+    @property
+    def acquired(self) -> bool:
+        """Whether this manager holds the lock."""
+        return self._fd is not None
 
-    def create_lock_file(self):
-        try:
-            with open(self.lock_file_path, "x"):
-                print(f"[{self.class_name}] Created lock file: {self.filename}.lock")
-        except FileExistsError:
-            print(
-                f"[{self.class_name}] Lock file path: {self.lock_file_path} already exists."
-            )
-
-    def remove_lock_file(self):
-        self.logger.debug(f"Attempting to remove lock file for <{self.filename}>")
+    def acquire(self) -> bool:
+        """Try to take the lock, without waiting.
+
+        Returns:
+            True if the lock was taken (or already held by this manager), False if
+            another process holds it.
+
+        """
+        if self._fd is not None:
+            return True
+        fd = self._try_lock()
+        if fd is None:
+            holder = self.holder()
+            self.logger.info(f"Lock for {self.filename} is held by {holder}")
+            return False
+
+        info = {"pid": os.getpid(), "locked_at": time.time()}
+        os.ftruncate(fd, 0)
+        os.lseek(fd, 0, os.SEEK_SET)
+        os.write(fd, json.dumps(info).encode())
+        os.fsync(fd)
+        self._fd = fd
+        self.logger.info(f"Acquired lock for {self.filename}: {info}")
+        return True
+
+    def release(self) -> None:
+        """Release the lock if held, the kernel does it anyway on exit."""
+        fd, self._fd = self._fd, None
+        if fd is None:
+            return
         try:
-            os.remove(self.lock_file_path)
-            print(f"[{self.class_name}] Removed lock file: {self.filename}.lock")
-            self.logger.info(f"Removed lock file: {self.filename}.lock")
-        except FileNotFoundError:
-            print(
-                f"[{self.class_name}] Lock file path: {self.lock_file_path} does not exist."
-            )
-            self.logger.info(f"Lock file path: {self.lock_file_path} does not exist.")
+            os.ftruncate(fd, 0)
+            _unlock(fd)
+        finally:
+            os.close(fd)
+        self.logger.info(f"Released lock for {self.filename}")
 
     def lock_exists(self) -> bool:
-        if os.path.isfile(self.lock_file_path):
-            print(f"[{self.class_name}] Lock file is present for {self.filename}")
+        """Tell if a running process, this one included, holds the lock."""
+        if self._fd is not None:
             return True
-        else:
-            print(f"[{self.class_name}] No lock found for {self.filename}")
-            return False
+        fd = self._try_lock()
+        if fd is None:
+            return True
+        _unlock(fd)
+        os.close(fd)
+        return False
+
+    def holder(self) -> dict[str, object] | None:
+        """Return the PID and lock time written by the lock's holder, if held."""
+        if not self.lock_exists():
+            return None
+        try:
+            info = json.loads(self.lock_file_path.read_text() or "null")
+        except (OSError, json.JSONDecodeError):
+            return None
+        return info if isinstance(info, dict) else None
+
+    def _try_lock(self) -> int | None:
+        fd = os.open(self.lock_file_path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            _lock(fd)
+        except OSError:
+            os.close(fd)
+            return None
+        return fd
+
+
+def _lock(fd: int) -> None:
+    if sys.platform == "win32":
+        os.lseek(fd, WINDOWS_LOCKED_BYTE_OFFSET, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+    else:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+
+def _unlock(fd: int) -> None:
+    if sys.platform == "win32":
+        os.lseek(fd, WINDOWS_LOCKED_BYTE_OFFSET, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+    else:
+        fcntl.flock(fd, fcntl.LOCK_UN)
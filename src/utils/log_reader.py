@@ -0,0 +1,127 @@
+"""Read a logger's log files back as one log, merged in timestamp order.
+
+Every process writes its own log files, which are rotated and gzipped as they grow,
+see `log_rotation`. This gathers the live, rotated and archived files of a logger,
+from every process, and interleaves their entries by timestamp. Entries spanning
+several lines, like tracebacks, are kept whole.
+
+Usage:
+    python -m src.utils.log_reader                      # all_logs, every process
+    python -m src.utils.log_reader robeau_main --tail 200
+    python -m src.utils.log_reader --since "2026-10-19 14:00" --grep "ERROR"
+
+"""
+
+import argparse
+import gzip
+import heapq
+import re
+from collections import deque
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import Protocol, cast
+
+from src.core.constants import COMMON_LOGS_FILE_PATH, LOG_DIR_PATH
+from src.utils.log_rotation import LOG_FILE_PATTERN, log_files_of
+
+ENTRY_START_PATTERN = re.compile(r"^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2},\d{3} ")
+"""Start of a formatted record, its `asctime` sorts in chronological order."""
+TIMESTAMP_LENGTH = len("2026-10-19 14:00:00,000")
+
+LogEntry = tuple[str, str]
+"""An entry's timestamp and its text, lines without a timestamp included."""
+
+
+class Args(Protocol):
+    """Protocol for command-line arguments."""
+
+    name: str
+    since: str | None
+    grep: str | None
+    tail: int | None
+
+
+def _file_order(path: Path) -> tuple[str, str, int]:
+    # Rotated files are older than the live one of the same process, and those
+    # rotated within the same second are numbered in order
+    match = LOG_FILE_PATTERN.match(path.name)
+    if match is None:
+        return "", path.name, 0
+    return match["pid"], match["rotated_at"] or "~", int(match["rotation"] or 0)
+
+
+def read_entries(path: Path) -> Iterator[LogEntry]:
+    """Yield the entries of a log file, gzipped or not, in file order.
+
+    Lines without a timestamp, like the rest of a traceback or the "New Log Entry"
+    mark, belong to the entry before them. Those at the top of a file are given the
+    timestamp of the first entry.
+    """
+    opener = gzip.open if path.suffix == ".gz" else open
+    with opener(path, "rt", encoding="utf-8", errors="replace") as log_file:
+        timestamp = ""
+        lines: list[str] = []
+        for line in log_file:
+            if ENTRY_START_PATTERN.match(line):
+                if lines:
+                    yield timestamp or line[:TIMESTAMP_LENGTH], "".join(lines)
+                    lines = []
+                timestamp = line[:TIMESTAMP_LENGTH]
+            lines.append(line)
+        if lines:
+            yield timestamp, "".join(lines)
+
+
+def merge_logs(
+    name: str = COMMON_LOGS_FILE_PATH.stem, log_dir: Path = LOG_DIR_PATH
+) -> Iterator[LogEntry]:
+    """Yield the entries of every log file of the `name` logger, oldest first."""
+    per_process: dict[str, list[Path]] = {}
+    for path in sorted(log_files_of(log_dir, name), key=_file_order):
+        per_process.setdefault(_file_order(path)[0], []).append(path)
+    # A process's files follow each other, and the processes overlap
+    return heapq.merge(
+        *(_chain_entries(paths) for paths in per_process.values()),
+        key=lambda entry: entry[0],
+    )
+
+
+def _chain_entries(paths: Iterable[Path]) -> Iterator[LogEntry]:
+    for path in paths:
+        try:
+            yield from read_entries(path)
+        except FileNotFoundError:
+            # Compressed since it was listed, unless it was pruned
+            archive = path.with_name(f"{path.name}.gz")
+            if path.suffix != ".gz" and archive.exists():
+                yield from read_entries(archive)
+
+
+def main() -> None:
+    """Parse arguments and print the merged log."""
+    parser = argparse.ArgumentParser(
+        description="Print a logger's log files from every process, merged by time."
+    )
+    parser.add_argument("name", nargs="?", default=COMMON_LOGS_FILE_PATH.stem)
+    parser.add_argument(
+        "--since", help='Only entries from this time on, e.g. "2026-10-19 14:00"'
+    )
+    parser.add_argument("--grep", help="Only entries matching this regex")
+    parser.add_argument("--tail", type=int, help="Only the last N entries")
+    args = cast("Args", cast("object", parser.parse_args()))
+
+    entries: Iterable[LogEntry] = merge_logs(args.name)
+    if args.since is not None:
+        since = args.since
+        entries = (entry for entry in entries if entry[0] >= since)
+    if args.grep is not None:
+        pattern = re.compile(args.grep)
+        entries = (entry for entry in entries if pattern.search(entry[1]))
+    if args.tail is not None:
+        entries = deque(entries, maxlen=args.tail)
+    for _, text in entries:
+        print(text, end="")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+"""Size and time based rotation of the log files, with background compression.
+
+Every process writes its own log files, named after the logger and the process id,
+e.g. `robeau_main.4242.log` and `all_logs.4242.log`: several processes appending to
+and rotating a shared file is not safe, so no file ever has more than one writer.
+`log_reader` merges them back in timestamp order.
+
+A log file is rotated once it reaches `LOG_MAX_BYTES`, or `LOG_ROTATE_SECONDS` after
+it was opened, by renaming it with a timestamp, e.g. `all_logs.4242.20261019-140000
+.log`. The rotated file is then gzipped by the process's `LogArchiver` thread, which
+also removes the oldest archives once the log directory goes over
+`LOG_DIR_MAX_BYTES`, or once they are older than `LOG_RETENTION_SECONDS`. The files
+left behind by processes that exited are archived the same way once stale.
+"""
+
+import contextlib
+import gzip
+import logging
+import os
+import queue
+import re
+import shutil
+import threading
+import time
+from logging.handlers import BaseRotatingHandler
+from pathlib import Path
+from typing import final
+
+LOG_MAX_BYTES = 10 * 1024 * 1024
+LOG_ROTATE_SECONDS = 24 * 60 * 60
+LOG_DIR_MAX_BYTES = 256 * 1024 * 1024
+LOG_RETENTION_SECONDS = 14 * 24 * 60 * 60
+STALE_LOG_SECONDS = 2 * LOG_ROTATE_SECONDS
+"""Age of the last write after which another process's log file is archived. Live
+processes rotate their files at least every `LOG_ROTATE_SECONDS` when they log."""
+FILE_CHECK_SECONDS = 1.0
+"""Seconds between checks that a log file was not moved away from under its
+handler, e.g. archived as stale while its process was idle."""
+ROTATED_TIMESTAMP_FORMAT = "%Y%m%d-%H%M%S"
+
+LOG_FILE_PATTERN = re.compile(
+    r"^(?P<stem>.+)\.(?P<pid>\d+)"
+    r"(?:\.(?P<rotated_at>\d{8}-\d{6})(?:-(?P<rotation>\d+))?)?\.log(?P<archived>\.gz)?$"
+)
+"""Names of the log files, live, rotated or archived."""
+
+
+def process_log_path(path: Path, pid: int | None = None) -> Path:
+    """Return the path of the log file `path` for a process, the current one if None.
+
+    Usage:
+        process_log_path(Path("temp/logs/all_logs.log"))  # temp/logs/all_logs.42.log
+
+    """
+    pid = os.getpid() if pid is None else pid
+    return path.with_name(f"{path.stem}.{pid}{path.suffix}")
+
+
+def log_files_of(log_dir: Path, stem: str) -> list[Path]:
+    """Return the live, rotated and archived log files of a logger, in any order."""
+    if not log_dir.is_dir():
+        return []
+    return [
+        path
+        for path in log_dir.iterdir()
+        if (match := LOG_FILE_PATTERN.match(path.name)) and match["stem"] == stem
+    ]
+
+
+@final
+class LogArchiver:
+    """Compresses rotated log files and prunes the oldest archives, in a thread."""
+
+    def __init__(
+        self,
+        log_dir: Path,
+        max_dir_bytes: int = LOG_DIR_MAX_BYTES,
+        retention_seconds: float = LOG_RETENTION_SECONDS,
+        stale_seconds: float = STALE_LOG_SECONDS,
+    ) -> None:
+        """Prepare the archiver, its thread is started by the first file submitted.
+
+        Args:
+            log_dir: Directory of the log files.
+            max_dir_bytes: Size of the log directory above which archives are pruned.
+            retention_seconds: Age after which archives are pruned.
+            stale_seconds: Age of the last write after which the log files of other
+                processes are archived.
+
+        """
+        self.log_dir = log_dir
+        self.max_dir_bytes = max_dir_bytes
+        self.retention_seconds = retention_seconds
+        self.stale_seconds = stale_seconds
+        self._files: queue.SimpleQueue[Path | None] = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self.archived = 0
+        self.pruned = 0
+
+    def submit(self, path: Path) -> None:
+        """Queue a rotated log file to be compressed."""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="LogArchiver", daemon=True
+                )
+                self._thread.start()
+        self._files.put(path)
+
+    def archive_stale_logs(self) -> None:
+        """Queue the log files other processes stopped writing to, to be compressed.
+
+        These are the live files of processes that exited, and the rotated files
+        they did not get to compress.
+        """
+        stale_before = time.time() - self.stale_seconds
+        own_pid = str(os.getpid())
+        for path in self.log_dir.glob("*.log"):
+            match = LOG_FILE_PATTERN.match(path.name)
+            if match is None:
+                continue
+            with contextlib.suppress(FileNotFoundError):
+                if match["pid"] != own_pid and path.stat().st_mtime < stale_before:
+                    self.submit(path)
+
+    def close(self) -> None:
+        """Compress the queued files and stop the thread."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None and thread.is_alive():
+            self._files.put(None)
+            thread.join()
+
+    def compress(self, path: Path) -> Path | None:
+        """Gzip a log file next to it and remove it.
+
+        Returns:
+            The archive's path, or None if the file was already gone, e.g. archived
+            by another process.
+
+        """
+        archive = path.with_name(f"{path.name}.gz")
+        partial = path.with_name(f"{archive.name}.{os.getpid()}.tmp")
+        try:
+            with path.open("rb") as source, gzip.open(partial, "wb") as target:
+                shutil.copyfileobj(source, target)
+        except FileNotFoundError:
+            partial.unlink(missing_ok=True)
+            return None
+        partial.replace(archive)
+        path.unlink(missing_ok=True)
+        self.archived += 1
+        return archive
+
+    def prune(self) -> None:
+        """Remove the expired archives, then the oldest ones while over the size cap."""
+        archives: list[tuple[float, int, Path]] = []
+        total_bytes = 0
+        for path in self.log_dir.iterdir():
+            with contextlib.suppress(FileNotFoundError):
+                stat = path.stat()
+                total_bytes += stat.st_size
+                if path.name.endswith(".log.gz"):
+                    archives.append((stat.st_mtime, stat.st_size, path))
+        expired_before = time.time() - self.retention_seconds
+        for modified_at, size, path in sorted(archives):
+            if modified_at >= expired_before and total_bytes <= self.max_dir_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total_bytes -= size
+            self.pruned += 1
+
+    def _run(self) -> None:
+        while (path := self._files.get()) is not None:
+            try:
+                self.compress(path)
+                self.prune()
+            except OSError:
+                logging.getLogger(__name__).exception(f"Could not archive {path}")
+
+
+@final
+class CompressingRotatingFileHandler(BaseRotatingHandler):
+    """File handler rotating by size and age, rotated files go to an archiver."""
+
+    def __init__(
+        self,
+        filename: Path,
+        archiver: LogArchiver,
+        max_bytes: int = LOG_MAX_BYTES,
+        rotate_seconds: float = LOG_ROTATE_SECONDS,
+    ) -> None:
+        """Prepare the handler, the file is opened by the first record.
+
+        Args:
+            filename: Log file, written by this process only.
+            archiver: Archiver compressing the rotated files.
+            max_bytes: Size at which the file is rotated.
+            rotate_seconds: Age at which the file is rotated.
+
+        """
+        super().__init__(filename, "a", encoding="utf-8", delay=True)
+        self.archiver = archiver
+        self.max_bytes = max_bytes
+        self.rotate_seconds = rotate_seconds
+        self.rollover_at = time.time() + rotate_seconds
+        self._checked_at = time.monotonic()
+        self._rotated_at = ""
+        self._rotation = 0
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:  # noqa: ARG002, N802
+        """Tell if the file is due for rotation, as of the previous record.
+
+        Checking the size written so far rather than the size with the record spares
+        formatting every record twice, the file may go over by one record.
+        """
+        if self.stream is None:
+            self.stream = self._open()
+        elif time.monotonic() - self._checked_at >= FILE_CHECK_SECONDS:
+            self._checked_at = time.monotonic()
+            if not Path(self.baseFilename).exists():
+                self.stream.close()
+                self.stream = self._open()
+        return time.time() >= self.rollover_at or self.stream.tell() >= self.max_bytes
+
+    def doRollover(self) -> None:  # noqa: N802
+        """Rename the file with the current time, hand it to the archiver, reopen."""
+        if self.stream is not None:
+            self.stream.close()
+            self.stream = None  # pyright: ignore[reportAttributeAccessIssue]
+        self.rollover_at = time.time() + self.rotate_seconds
+        path = Path(self.baseFilename)
+        with contextlib.suppress(FileNotFoundError):
+            if path.stat().st_size > 0:
+                rotated = self._rotated_path(path)
+                path.replace(rotated)
+                self.archiver.submit(rotated)
+        self.stream = self._open()
+
+    def _rotated_path(self, path: Path) -> Path:
+        # Rotations within the same second are numbered, never reusing the name of
+        # an archive that was pruned since, as the reader orders files by name
+        rotated_at = time.strftime(ROTATED_TIMESTAMP_FORMAT)
+        if rotated_at == self._rotated_at:
+            self._rotation += 1
+        else:
+            self._rotated_at, self._rotation = rotated_at, 0
+        while True:
+            rotation = f"-{self._rotation}" if self._rotation else ""
+            rotated = path.with_name(f"{path.stem}.{rotated_at}{rotation}{path.suffix}")
+            if not (
+                rotated.exists() or rotated.with_name(f"{rotated.name}.gz").exists()
+            ):
+                return rotated
+            self._rotation += 1
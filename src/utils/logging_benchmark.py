@@ -0,0 +1,155 @@
+"""Compare the cost of logging with synchronous file handlers and through a queue.
+
+Loggers used to get two `FileHandler`s each, the script's log file and the common
+one, so every record was formatted and written twice on the caller's thread, and
+`setup_logger` read `config/settings.ini` and appended a "New Log Entry" line on
+every call. That setup is reproduced here as a reference, next to the queued one of
+`logging_utils`, both writing to a temporary directory:
+- setup: repeated `setup_logger` calls for an already set up logger.
+- info: one `logger.info` call, as done by hot paths like the websocket client's
+  sends or the graph network's nodes, timed on the caller's thread.
+- drain: time for the listener to write out every queued record, which the caller
+  does not wait for.
+
+Usage:
+    python -m src.utils.logging_benchmark --records 20000
+
+"""
+
+import argparse
+import configparser
+import logging
+import queue
+import statistics
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Protocol, cast
+
+from src.config.settings import PROJECT_ROOT_PATH
+from src.utils.logging_utils import (
+    LOG_FORMAT,
+    NEW_LOG_ENTRY_LINE,
+    LogFilesRouter,
+    ProcessQueueHandler,
+    setup_logger,
+)
+
+SETUP_CALLS = 200
+
+
+class Args(Protocol):
+    """Protocol for command-line arguments."""
+
+    records: int
+
+
+def legacy_setup_logger(name: str, log_dir: Path) -> logging.Logger:
+    """Set up a logger the way `setup_logger` used to, in `log_dir`."""
+    config = configparser.ConfigParser()
+    config.read(PROJECT_ROOT_PATH / "config" / "settings.ini")
+    script_log_file_path = log_dir / f"{name}.log"
+    with script_log_file_path.open("a", encoding="utf-8") as log_file:
+        log_file.write(NEW_LOG_ENTRY_LINE)
+
+    logger = logging.getLogger(name)
+    if not logger.hasHandlers():
+        logger.setLevel(logging.INFO)
+        for path in (script_log_file_path, log_dir / "all_logs.log"):
+            handler = logging.FileHandler(path, encoding="utf-8")
+            handler.setFormatter(logging.Formatter(LOG_FORMAT))
+            logger.addHandler(handler)
+    return logger
+
+
+def queued_logger(
+    name: str, log_dir: Path
+) -> tuple[logging.Logger, ProcessQueueHandler]:
+    """Set up a logger like `setup_logger` does, in `log_dir`."""
+    router = LogFilesRouter(log_dir / "all_logs.log")
+    router.add_logger(name, log_dir / f"{name}.log")
+    handler = ProcessQueueHandler(queue.SimpleQueue(), router)
+    handler.start()
+    logger = logging.getLogger(name)
+    logger.setLevel(logging.INFO)
+    logger.addHandler(handler)
+    return logger, handler
+
+
+def _time_calls(call: Callable[[int], object], count: int) -> dict[str, float]:
+    samples: list[float] = []
+    for i in range(count):
+        started_at = time.perf_counter()
+        call(i)
+        samples.append((time.perf_counter() - started_at) * 1_000_000)
+    samples.sort()
+    return {
+        "mean_us": statistics.fmean(samples),
+        "p50_us": samples[len(samples) // 2],
+        "p99_us": samples[int(len(samples) * 0.99)],
+    }
+
+
+def _close(logger: logging.Logger) -> None:
+    for handler in logger.handlers[:]:
+        handler.close()
+        logger.removeHandler(handler)
+
+
+def run_benchmark(records: int) -> dict[str, dict[str, dict[str, float]]]:
+    """Time setting up and logging with both setups, in a temporary directory."""
+    results: dict[str, dict[str, dict[str, float]]] = {}
+    with tempfile.TemporaryDirectory() as temp_dir:
+        log_dir = Path(temp_dir)
+
+        legacy = legacy_setup_logger("legacy_benchmark", log_dir)
+        results["legacy"] = {
+            "setup": _time_calls(
+                lambda _: legacy_setup_logger("legacy_benchmark", log_dir),
+                SETUP_CALLS,
+            ),
+            "info": _time_calls(
+                lambda i: legacy.info("Sent message %d to the server", i), records
+            ),
+        }
+        _close(legacy)
+
+        queued, handler = queued_logger("queued_benchmark", log_dir)
+        setup_logger("queued_benchmark")  # Already has its handler, a cached no-op
+        setup_timing = _time_calls(
+            lambda _: setup_logger("queued_benchmark"), SETUP_CALLS
+        )
+        info_timing = _time_calls(
+            lambda i: queued.info("Sent message %d to the server", i), records
+        )
+        started_at = time.perf_counter()
+        handler.stop()
+        drain_ms = (time.perf_counter() - started_at) * 1000
+        handler.router.close()
+        _close(queued)
+        results["queued"] = {
+            "setup": setup_timing,
+            "info": info_timing,
+            "drain": {"total_ms": drain_ms},
+        }
+    return results
+
+
+def main() -> None:
+    """Parse arguments, run the benchmark and print the results."""
+    parser = argparse.ArgumentParser(
+        description="Compare synchronous and queued logging overhead."
+    )
+    parser.add_argument("--records", type=int, default=20000)
+    args = cast("Args", cast("object", parser.parse_args()))
+
+    for setup, operations in run_benchmark(args.records).items():
+        print(f"{setup}:")
+        for operation, stats in operations.items():
+            formatted = ", ".join(f"{k} {v:.2f}" for k, v in stats.items())
+            print(f"  {operation:>6}: {formatted}")
+
+
+if __name__ == "__main__":
+    main()
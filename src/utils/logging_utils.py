@@ -1,11 +1,32 @@
-"""Utility functions for setting up and managing loggers."""
+"""Utility functions for setting up and managing loggers.
 
+Loggers don't write to their files themselves: their records are put on a queue,
+which a single `QueueListener` thread per process writes to the script's log file
+and to the common one. Logging from a hot path then costs filtering the record and
+putting it on the queue, the formatting and the disk writes happen off the caller's
+thread. The listener is stopped at exit, once every queued record was written.
+
+Each process writes its own log files, which are rotated and compressed as they grow
+and age, see `log_rotation`, and read back merged with `log_reader`.
+"""
+
+import atexit
 import configparser
 import logging
+import queue
+import threading
+from functools import cache
 from logging import Logger
+from logging.handlers import QueueHandler, QueueListener
+from pathlib import Path
 
 from src.config.settings import PROJECT_ROOT_PATH
 from src.core.constants import COMMON_LOGS_FILE_PATH, LOG_DIR_PATH
+from src.utils.log_rotation import (
+    CompressingRotatingFileHandler,
+    LogArchiver,
+    process_log_path,
+)
 
 LOG_LEVELS = {
     "DEBUG": logging.DEBUG,
@@ -14,6 +35,133 @@ LOG_LEVELS = {
     "ERROR": logging.ERROR,
     "CRITICAL": logging.CRITICAL,
 }
+LOG_FORMAT = "%(asctime)s - %(filename)s:%(lineno)d - %(levelname)s - %(message)s"
+NEW_LOG_ENTRY_LINE = "<< New Log Entry >>\n"
+
+
+class _LogFileFormatter(logging.Formatter):
+    """Formats records, or passes the raw text of `log_empty_lines` records."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        """Format the record, unless it carries raw text."""
+        raw_text: str | None = getattr(record, "raw_text", None)
+        if raw_text is not None:
+            return raw_text
+        return super().format(record)
+
+
+class LogFilesRouter(logging.Handler):
+    """Writes each record to its logger's log file and to the common log file.
+
+    The files are the process's own, e.g. `all_logs.<pid>.log` for the common one.
+    """
+
+    def __init__(self, common_log_file_path: Path = COMMON_LOGS_FILE_PATH) -> None:
+        """Open the common log file, script log files are added with their logger."""
+        super().__init__()
+        self.formatter = _LogFileFormatter(LOG_FORMAT)
+        self.archiver = LogArchiver(common_log_file_path.parent)
+        self.common_handler = self._open(common_log_file_path)
+        self.script_handlers: dict[str, CompressingRotatingFileHandler] = {}
+
+    def add_logger(self, name: str, path: Path) -> None:
+        """Route the records of the `name` logger to the process's `path` log file."""
+        if name not in self.script_handlers:
+            self.script_handlers[name] = self._open(path)
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """Write the record to its logger's log file, if known, and the common one."""
+        handler = self.script_handlers.get(record.name)
+        if handler is not None:
+            handler.handle(record)
+        self.common_handler.handle(record)
+
+    def close(self) -> None:
+        """Close every log file, once the rotated ones are compressed."""
+        for handler in (*self.script_handlers.values(), self.common_handler):
+            handler.close()
+        self.archiver.close()
+        super().close()
+
+    def _open(self, path: Path) -> CompressingRotatingFileHandler:
+        handler = CompressingRotatingFileHandler(process_log_path(path), self.archiver)
+        handler.setFormatter(self.formatter)
+        return handler
+
+
+class ProcessQueueHandler(QueueHandler):
+    """Queues records for a listener thread, or writes them itself once it stopped."""
+
+    def __init__(
+        self, records: "queue.SimpleQueue[logging.LogRecord]", router: LogFilesRouter
+    ) -> None:
+        """Prepare the listener writing the queued records with the router."""
+        super().__init__(records)
+        self.router = router
+        self.listener = QueueListener(records, router)
+        self.listening = False
+
+    def start(self) -> None:
+        """Start the listener thread."""
+        self.listener.start()
+        self.listening = True
+
+    def stop(self) -> None:
+        """Write out the queued records and stop the listener thread."""
+        if self.listening:
+            self.listening = False
+            self.listener.stop()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Merge the message with its arguments, before they can change.
+
+        The record stays in process, so unlike the default it is neither formatted
+        nor copied here: the listener formats it, traceback included.
+        """
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """Queue the record, or write it right away if the listener stopped."""
+        if self.listening:
+            super().emit(record)
+        else:
+            self.router.handle(record)
+
+
+_lock = threading.Lock()
+_queue_handler: ProcessQueueHandler | None = None
+
+
+@cache
+def _configured_level() -> str:
+    """Read the logging level of `config/settings.ini`, once per process."""
+    config = configparser.ConfigParser()
+    config_path = PROJECT_ROOT_PATH / "config" / "settings.ini"
+    if config.read(config_path):
+        return config.get("logging", "level", fallback="DEBUG").upper()
+    return "DEBUG"
+
+
+def _get_queue_handler() -> ProcessQueueHandler:
+    global _queue_handler  # noqa: PLW0603
+    if _queue_handler is None:
+        _queue_handler = ProcessQueueHandler(queue.SimpleQueue(), LogFilesRouter())
+        _queue_handler.start()
+        _queue_handler.router.archiver.archive_stale_logs()
+        atexit.register(stop_logging)
+    return _queue_handler
+
+
+def stop_logging() -> None:
+    """Write out the queued records, stop the listener thread and finish archiving.
+
+    Records logged afterwards are written synchronously.
+    """
+    if _queue_handler is not None:
+        _queue_handler.stop()
+        _queue_handler.router.archiver.close()
 
 
 def setup_logger(
@@ -22,62 +170,46 @@ def setup_logger(
 ) -> logging.Logger:
     """Set up a logger that logs to a script-specific log file and a common log file.
 
-    If a logging level is not provided, it reads from the configuration file situated
-    in `config/settings.ini`
+    If a logging level is not provided, it is read from the configuration file
+    situated in `config/settings.ini`, once per process. The "New Log Entry" mark is
+    written to the process's script log file when its logger is first set up.
     """
-    if not LOG_DIR_PATH.exists():
-        LOG_DIR_PATH.mkdir(parents=True, exist_ok=True)
-
-    script_log_file_path = LOG_DIR_PATH / f"{file_name}.log"
-
-    if level is None:
-        config = configparser.ConfigParser()
-        config_path = PROJECT_ROOT_PATH / "config" / "settings.ini"
-
-        if config.read(config_path):
-            level = config.get("logging", "level", fallback="DEBUG").upper()
-        else:
-            level = "DEBUG"
-
-    level = level.upper()
+    level = (level or _configured_level()).upper()
     if level not in LOG_LEVELS:
         level = "DEBUG"
 
-    with script_log_file_path.open("a", encoding="utf-8") as log_file:
-        log_file.write("<< New Log Entry >>\n")
-
     logger = logging.getLogger(file_name)
-    if not logger.hasHandlers():
+    with _lock:
+        if logger.hasHandlers():
+            return logger
+        LOG_DIR_PATH.mkdir(parents=True, exist_ok=True)
+        script_log_file_path = LOG_DIR_PATH / f"{file_name}.log"
+        with process_log_path(script_log_file_path).open(
+            "a", encoding="utf-8"
+        ) as log_file:
+            log_file.write(NEW_LOG_ENTRY_LINE)
+
+        queue_handler = _get_queue_handler()
+        queue_handler.router.add_logger(file_name, script_log_file_path)
         logger.setLevel(LOG_LEVELS[level])
-
-        # Script-specific file handler with UTF-8 encoding
-        script_fh = logging.FileHandler(script_log_file_path, encoding="utf-8")
-        script_fh.setLevel(LOG_LEVELS[level])
-        formatter = logging.Formatter(
-            "%(asctime)s - %(filename)s:%(lineno)d - %(levelname)s - %(message)s"
-        )
-        script_fh.setFormatter(formatter)
-        logger.addHandler(script_fh)
-
-        # Common file handler with UTF-8 encoding
-        common_fh = logging.FileHandler(COMMON_LOGS_FILE_PATH, encoding="utf-8")
-        common_fh.setLevel(LOG_LEVELS[level])
-        common_formatter = logging.Formatter(
-            "%(asctime)s - %(filename)s:%(lineno)d - %(levelname)s - %(message)s"
-        )
-        common_fh.setFormatter(common_formatter)
-        logger.addHandler(common_fh)
+        logger.addHandler(queue_handler)
 
     return logger
 
 
 def log_empty_lines(logger: Logger, lines: int = 1) -> None:
-    """Log empty lines to all file handlers of the given logger.
+    """Log empty lines to the log files of the given logger.
 
     Allows to space the entry better and create gaps that dont have the timestamp info
-    in them.
+    in them. The lines are queued like any record, so they land in order.
     """
+    if lines <= 0:
+        return
+    record = logger.makeRecord(
+        logger.name, logging.CRITICAL, "", 0, "", (), None, extra=None
+    )
+    # The file handlers end every record with a newline
+    record.raw_text = (lines - 1) * "\n"
     for handler in logger.handlers:
-        if isinstance(handler, logging.FileHandler):
-            handler.stream.write(lines * "\n")
-            handler.flush()
+        if isinstance(handler, QueueHandler):
+            handler.handle(record)
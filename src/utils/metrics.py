@@ -0,0 +1,527 @@
+"""Process wide registry of counters, gauges and histograms.
+
+Metrics are cheap enough for hot paths: updating one takes a lock and a few integer
+operations, and histograms count observations in fixed buckets, so nothing grows
+with the amount of samples. Every process has its own `registry`, which apps expose
+on their control socket through the `metrics` command, as JSON or in the Prometheus
+text format, and optionally on a local HTTP port, see `MetricsExporter`.
+
+Usage:
+    db_seconds = registry.histogram(
+        "db_operation_seconds", "Time spent in database operations", ("operation",)
+    )
+    with db_seconds.labels(operation="free_slot").time():
+        ...
+
+"""
+
+import asyncio
+import contextlib
+import functools
+import inspect
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from collections.abc import Awaitable, Callable, Iterator, Sequence
+from logging import Logger
+from typing import ClassVar, cast, final
+
+LATENCY_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+"""Default histogram buckets, in seconds."""
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+HTTP_READ_TIMEOUT = 5.0
+
+Sample = tuple[str, dict[str, str], float]
+"""A metric's name suffix, labels and value, as exposed to Prometheus."""
+
+
+class _Value(ABC):
+    """Value of a metric for one set of label values."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+
+    @abstractmethod
+    def samples(self) -> Iterator[Sample]:
+        """Yield the value's samples, as exposed to Prometheus."""
+
+    @abstractmethod
+    def snapshot(self) -> object:
+        """Return the value, as exposed in JSON."""
+
+
+@final
+class CounterValue(_Value):
+    """A count that only goes up."""
+
+    def __init__(self) -> None:
+        """Start at zero."""
+        super().__init__()
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        """Add `amount`, which cannot be negative.
+
+        Raises:
+            ValueError: If `amount` is negative.
+
+        """
+        if amount < 0:
+            e = f"Counters only go up, cannot add {amount}"
+            raise ValueError(e)
+        with self._lock:
+            self.value += amount
+
+    def samples(self) -> Iterator[Sample]:
+        """Yield the count."""
+        yield "", {}, self.value
+
+    def snapshot(self) -> object:
+        """Return the count."""
+        return self.value
+
+
+@final
+class GaugeValue(_Value):
+    """A value that goes up and down, set directly or read from a function."""
+
+    def __init__(self) -> None:
+        """Start at zero."""
+        super().__init__()
+        self.value = 0.0
+        self._function: Callable[[], float] | None = None
+
+    def set(self, value: float) -> None:
+        """Set the value."""
+        with self._lock:
+            self.value = value
+
+    def inc(self, amount: float = 1.0) -> None:
+        """Add `amount`, which can be negative."""
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        """Subtract `amount`."""
+        self.inc(-amount)
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        """Read the value from `function` whenever it is exported, e.g. a frame rate.
+
+        This costs nothing to the code that updates the underlying state.
+        """
+        self._function = function
+
+    def samples(self) -> Iterator[Sample]:
+        """Yield the value."""
+        yield "", {}, self.get()
+
+    def snapshot(self) -> object:
+        """Return the value."""
+        return self.get()
+
+    def get(self) -> float:
+        """Return the value, read from the function if one was set."""
+        return self.value if self._function is None else float(self._function())
+
+
+@final
+class HistogramValue(_Value):
+    """Counts of observations in fixed buckets, with their sum."""
+
+    def __init__(self, buckets: tuple[float, ...]) -> None:
+        """Start with empty buckets."""
+        super().__init__()
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # The last one is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        """Count a value in the first bucket whose upper bound is not below it."""
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    @contextlib.contextmanager
+    def time(self) -> Iterator[None]:
+        """Observe the seconds spent in the `with` block."""
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started_at)
+
+    def samples(self) -> Iterator[Sample]:
+        """Yield the cumulative bucket counts, the sum and the count."""
+        with self._lock:
+            counts, total, count = list(self.counts), self.sum, self.count
+        cumulative = 0
+        for bound, bucket_count in zip((*self.buckets, math.inf), counts, strict=True):
+            cumulative += bucket_count
+            yield "_bucket", {"le": _format_value(bound)}, cumulative
+        yield "_sum", {}, total
+        yield "_count", {}, count
+
+    def snapshot(self) -> object:
+        """Return the count, the sum and the mean of the observations."""
+        with self._lock:
+            total, count = self.sum, self.count
+        return {
+            "count": count,
+            "sum": round(total, 6),
+            "mean": round(total / count, 6) if count else None,
+        }
+
+
+class _MetricBase(ABC):
+    """What the registry knows of a metric, whatever the type of its values."""
+
+    kind: ClassVar[str]
+
+    def __init__(
+        self, name: str, documentation: str, label_names: Sequence[str] = ()
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+
+    @abstractmethod
+    def samples(self) -> Iterator[Sample]:
+        """Yield the samples of every value of the metric."""
+
+    @abstractmethod
+    def snapshot(self) -> object:
+        """Return the values of the metric, keyed by their labels if it has some."""
+
+
+class Metric[V: _Value](_MetricBase, ABC):
+    """A named metric, with one value per set of label values."""
+
+    def __init__(
+        self, name: str, documentation: str, label_names: Sequence[str] = ()
+    ) -> None:
+        """Describe the metric, its values are created as labels are used.
+
+        Args:
+            name: Name of the metric, e.g. "detection_frame_seconds".
+            documentation: What the metric measures.
+            label_names: Names of the labels the values are told apart by.
+
+        """
+        super().__init__(name, documentation, label_names)
+        self._values: dict[tuple[str, ...], V] = {}
+        self._lock = threading.Lock()
+        # Resolved once, as metrics without labels are updated on hot paths
+        self._default = None if self.label_names else self.labels()
+
+    def labels(self, **label_values: str) -> V:
+        """Return the value of the metric for these label values.
+
+        Raises:
+            ValueError: If the labels are not exactly the metric's.
+
+        """
+        if label_values.keys() != set(self.label_names):
+            e = f"{self.name} expects labels {self.label_names}, got {label_values}"
+            raise ValueError(e)
+        key = tuple(str(label_values[name]) for name in self.label_names)
+        value = self._values.get(key)
+        if value is None:
+            with self._lock:
+                value = self._values.setdefault(key, self._new_value())
+        return value
+
+    def samples(self) -> Iterator[Sample]:
+        """Yield the samples of every value of the metric."""
+        for key, value in list(self._values.items()):
+            labels = dict(zip(self.label_names, key, strict=True))
+            for suffix, sample_labels, sample in value.samples():
+                yield suffix, labels | sample_labels, sample
+
+    def snapshot(self) -> object:
+        """Return the values of the metric, keyed by their labels if it has some."""
+        if not self.label_names:
+            return self._unlabelled().snapshot()
+        return {
+            ",".join(f"{n}={v}" for n, v in zip(self.label_names, key, strict=True)): (
+                value.snapshot()
+            )
+            for key, value in list(self._values.items())
+        }
+
+    def _unlabelled(self) -> V:
+        if self._default is None:
+            e = f"{self.name} has labels {self.label_names}, use labels() first"
+            raise ValueError(e)
+        return self._default
+
+    @abstractmethod
+    def _new_value(self) -> V:
+        """Create the value of a new set of label values."""
+
+
+@final
+class Counter(Metric[CounterValue]):
+    """A count that only goes up, e.g. of processed nodes."""
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0) -> None:
+        """Add `amount` to the metric, if it has no labels."""
+        self._unlabelled().inc(amount)
+
+    def _new_value(self) -> CounterValue:
+        return CounterValue()
+
+
+@final
+class Gauge(Metric[GaugeValue]):
+    """A value that goes up and down, e.g. a frame rate."""
+
+    kind = "gauge"
+
+    def set(self, value: float) -> None:
+        """Set the metric, if it has no labels."""
+        self._unlabelled().set(value)
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        """Read the metric from `function`, if it has no labels."""
+        self._unlabelled().set_function(function)
+
+    def _new_value(self) -> GaugeValue:
+        return GaugeValue()
+
+
+@final
+class Histogram(Metric[HistogramValue]):
+    """Distribution of observed values, e.g. latencies, in fixed buckets."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> None:
+        """Describe the metric, see `Metric`, with the upper bounds of its buckets.
+
+        Raises:
+            ValueError: If the buckets are not sorted in increasing order.
+
+        """
+        self.buckets = tuple(float(bound) for bound in buckets)
+        if list(self.buckets) != sorted(set(self.buckets)):
+            e = f"{name} buckets must be increasing, got {self.buckets}"
+            raise ValueError(e)
+        super().__init__(name, documentation, label_names)
+
+    def observe(self, value: float) -> None:
+        """Observe a value, if the metric has no labels."""
+        self._unlabelled().observe(value)
+
+    def time(self) -> contextlib.AbstractContextManager[None]:
+        """Observe the seconds spent in a `with` block, if the metric has no labels."""
+        return self._unlabelled().time()
+
+    def _new_value(self) -> HistogramValue:
+        return HistogramValue(self.buckets)
+
+
+@final
+class MetricsRegistry:
+    """The metrics of a process, by name."""
+
+    def __init__(self) -> None:
+        """Start without metrics."""
+        self._metrics: dict[str, _MetricBase] = {}
+        self._lock = threading.Lock()
+
+    def counter(
+        self, name: str, documentation: str, label_names: Sequence[str] = ()
+    ) -> Counter:
+        """Return the counter `name`, registering it the first time."""
+        return self._register(Counter(name, documentation, label_names))
+
+    def gauge(
+        self, name: str, documentation: str, label_names: Sequence[str] = ()
+    ) -> Gauge:
+        """Return the gauge `name`, registering it the first time."""
+        return self._register(Gauge(name, documentation, label_names))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        """Return the histogram `name`, registering it the first time."""
+        return self._register(Histogram(name, documentation, label_names, buckets))
+
+    def snapshot(self) -> dict[str, object]:
+        """Return the value of every metric, JSON serializable."""
+        return {
+            name: metric.snapshot() for name, metric in sorted(self._metrics.items())
+        }
+
+    def render_prometheus(self) -> str:
+        """Render every metric in the Prometheus text exposition format."""
+        lines: list[str] = []
+        for name, metric in sorted(self._metrics.items()):
+            lines.append(f"# HELP {name} {_escape_help(metric.documentation)}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            for suffix, labels, value in metric.samples():
+                lines.append(
+                    f"{name}{suffix}{_format_labels(labels)} {_format_value(value)}"
+                )
+        return "\n".join(lines) + "\n"
+
+    def _register[M: _MetricBase](self, metric: M) -> M:
+        with self._lock:
+            existing = self._metrics.setdefault(metric.name, metric)
+        if type(existing) is not type(metric) or (
+            existing.label_names != metric.label_names
+        ):
+            e = (
+                f"Metric {metric.name} is already registered as a {existing.kind} "
+                f"with labels {existing.label_names}"
+            )
+            raise ValueError(e)
+        return cast("M", existing)
+
+
+registry = MetricsRegistry()
+"""The metrics of the current process."""
+
+
+def timed[**P, R](
+    histogram: HistogramValue,
+) -> Callable[[Callable[P, R]], Callable[P, R]]:
+    """Decorate a function, sync or async, to observe the seconds its calls take."""
+
+    def decorator(func: Callable[P, R]) -> Callable[P, R]:
+        if inspect.iscoroutinefunction(func):
+            async_func = cast("Callable[P, Awaitable[object]]", func)
+
+            @functools.wraps(func)
+            async def async_wrapper(*args: P.args, **kwargs: P.kwargs) -> object:
+                with histogram.time():
+                    return await async_func(*args, **kwargs)
+
+            return cast("Callable[P, R]", async_wrapper)
+
+        @functools.wraps(func)
+        def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+            with histogram.time():
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+@final
+class MetricsExporter:
+    """Serves a registry in the Prometheus text format on a local HTTP port.
+
+    Only `GET /metrics` is answered, over plain HTTP/1.0, which is all a Prometheus
+    scraper or `curl` needs.
+    """
+
+    def __init__(
+        self,
+        port: int,
+        logger: Logger,
+        metrics_registry: MetricsRegistry = registry,
+        host: str = "127.0.0.1",
+    ) -> None:
+        """Prepare the exporter, `start()` opens the port."""
+        self.port = port
+        self.host = host
+        self.logger = logger
+        self.registry = metrics_registry
+        self._server: asyncio.Server | None = None
+
+    async def start(self) -> None:
+        """Start serving the metrics."""
+        self._server = await asyncio.start_server(self._serve, self.host, self.port)
+        self.logger.info(f"Serving metrics on http://{self.host}:{self.port}/metrics")
+
+    async def close(self) -> None:
+        """Stop serving the metrics."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _serve(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            async with asyncio.timeout(HTTP_READ_TIMEOUT):
+                request_line = await reader.readline()
+                while (await reader.readline()).strip():
+                    pass  # Headers are not needed
+            method, _, target = request_line.decode("latin-1").partition(" ")
+            path = target.partition(" ")[0].partition("?")[0]
+            if method == "GET" and path == "/metrics":
+                status = "200 OK"
+                body = self.registry.render_prometheus().encode()
+            else:
+                status = "404 Not Found"
+                body = b"Only GET /metrics is served\n"
+            writer.write(
+                f"HTTP/1.0 {status}\r\nContent-Type: {PROMETHEUS_CONTENT_TYPE}\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode()
+                + body
+            )
+            await writer.drain()
+        except (TimeoutError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+            with contextlib.suppress(ConnectionError):
+                await writer.wait_closed()
+
+
+def _escape_help(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        (name, value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in labels.items()
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
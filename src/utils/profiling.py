@@ -0,0 +1,314 @@
+"""Profile a running app for a few seconds, without restarting it.
+
+A profiling session runs for a given amount of seconds, in one of two modes:
+- "cprofile": deterministic profiling with `cProfile`, written to `temp/profiles/`
+  as a `.pstats` file, e.g. for `snakeviz`. It is exact but slows the profiled code
+  down, and only sees the event loop's thread.
+- "sampling": the stacks of every thread are sampled every `SAMPLE_INTERVAL`, and
+  written in the collapsed stack format (`thread;outer;...;inner count` lines) for
+  flame graph tools like `flamegraph.pl` or speedscope. The overhead does not depend
+  on the profiled code, which suits detection loops and the graph engine's threads.
+
+Both modes also measure the asyncio event loop's lag, how late a sleep wakes up. The
+sampling mode also estimates the time spent in each task, from which one is running
+at every sample, while cProfile times the tasks' coroutines itself. The two are not
+mixed: from Python 3.12 on, cProfile's data is muddled by other threads running
+Python code, the sampler's included.
+
+Sessions are started with the `profile` control command (see `socket_server`), or
+at startup by `setup_script` when the `APP_PROFILE` environment variable is set,
+e.g. `APP_PROFILE=sampling:30`.
+"""
+
+import asyncio
+import cProfile
+import functools
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from logging import Logger
+from pathlib import Path
+from types import FrameType
+from typing import Literal, cast, final
+
+from src.core.constants import PROFILES_DIR_PATH
+from src.utils.metrics import registry
+
+PROFILE_ENV_VAR = "APP_PROFILE"
+"""Set to "<mode>[:<seconds>]" to profile an app from its startup."""
+ProfileMode = Literal["cprofile", "sampling"]
+PROFILE_MODES: tuple[ProfileMode, ...] = ("cprofile", "sampling")
+DEFAULT_PROFILE_SECONDS = 10.0
+MAX_PROFILE_SECONDS = 600.0
+SAMPLE_INTERVAL = 0.005
+LOOP_LAG_INTERVAL = 0.05
+"""Seconds the loop lag probe sleeps for, its lag is how much longer it took."""
+TOP_ENTRIES = 10
+
+loop_lag_seconds = registry.histogram(
+    "asyncio_loop_lag_seconds",
+    "How late the event loop woke a sleeping task up, measured while profiling",
+)
+
+
+@dataclass
+class _Samples:
+    """What the sampler thread collected."""
+
+    count: int = 0
+    stacks: Counter[str] = field(default_factory=Counter)
+    tasks: Counter[str] = field(default_factory=Counter)
+
+
+@final
+class ProfilingSession:
+    """One profiling run, started and stopped from the event loop's thread."""
+
+    def __init__(
+        self,
+        label: str,
+        mode: ProfileMode,
+        seconds: float,
+        logger: Logger,
+        output_dir: Path = PROFILES_DIR_PATH,
+    ) -> None:
+        """Describe the session, `run()` starts it.
+
+        Args:
+            label: Name of the profiled app, used in the output file's name.
+            mode: "cprofile" or "sampling", see the module's docstring.
+            seconds: Duration of the session.
+            logger: Logger the session's summary is written to.
+            output_dir: Directory of the output file.
+
+        """
+        self.label = label
+        self.mode = mode
+        self.seconds = seconds
+        self.logger = logger
+        timestamp = time.strftime("%Y%m%d-%H%M%S")
+        suffix = ".pstats" if mode == "cprofile" else ".collapsed"
+        self.path = output_dir / f"{label}.{os.getpid()}.{timestamp}{suffix}"
+        self._samples = _Samples()
+        self._lags: list[float] = []
+        self._stop = threading.Event()
+
+    async def run(self) -> dict[str, object]:
+        """Profile for the session's duration, write the output file.
+
+        Returns:
+            A summary of the session: output file, loop lag, busiest functions,
+            and busiest tasks when sampling.
+
+        """
+        loop = asyncio.get_running_loop()
+        lag_probe = asyncio.create_task(self._probe_loop_lag(), name="loop-lag-probe")
+        self.logger.info(f"Profiling ({self.mode}) for {self.seconds}s")
+        if self.mode == "cprofile":
+            profile = cProfile.Profile()
+            profile.enable()
+            try:
+                await asyncio.sleep(self.seconds)
+            finally:
+                profile.disable()
+                lag_probe.cancel()
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            profile.dump_stats(self.path)
+            summary = self._summary(_top_functions(profile))
+        else:
+            sampler = threading.Thread(
+                target=self._sample,
+                args=(loop, threading.get_ident()),
+                name="ProfilingSampler",
+                daemon=True,
+            )
+            sampler.start()
+            try:
+                await asyncio.sleep(self.seconds)
+            finally:
+                self._stop.set()
+                lag_probe.cancel()
+                await asyncio.to_thread(sampler.join)
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            await asyncio.to_thread(self._write_collapsed_stacks)
+            summary = self._summary(_top_frames(self._samples.stacks))
+            summary["tasks"] = self._task_summary()
+
+        self.logger.info(f"Profiling done, written to {self.path}: {summary}")
+        return summary
+
+    def _summary(self, top: list[str]) -> dict[str, object]:
+        return {
+            "mode": self.mode,
+            "seconds": self.seconds,
+            "path": str(self.path),
+            "loop_lag_ms": self._lag_summary(),
+            "top": top,
+        }
+
+    def _sample(self, loop: asyncio.AbstractEventLoop, loop_thread_id: int) -> None:
+        own_thread_id = threading.get_ident()
+        while not self._stop.wait(SAMPLE_INTERVAL):
+            self._samples.count += 1
+            # Reading another thread's loop is only safe as long as the GIL is held
+            task = asyncio.current_task(loop)
+            if task is not None:
+                self._samples.tasks[task.get_name()] += 1
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():  # noqa: SLF001
+                if thread_id == own_thread_id:
+                    continue
+                thread_name = names.get(thread_id, str(thread_id))
+                if thread_id == loop_thread_id and task is not None:
+                    thread_name += f";task {task.get_name()}"
+                self._samples.stacks[f"{thread_name};{_collapse(frame)}"] += 1
+
+    async def _probe_loop_lag(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started_at = loop.time()
+            await asyncio.sleep(LOOP_LAG_INTERVAL)
+            lag = max(0.0, loop.time() - started_at - LOOP_LAG_INTERVAL)
+            self._lags.append(lag)
+            loop_lag_seconds.observe(lag)
+
+    def _write_collapsed_stacks(self) -> None:
+        with self.path.open("w", encoding="utf-8") as output:
+            for stack, count in self._samples.stacks.most_common():
+                output.write(f"{stack} {count}\n")
+
+    def _lag_summary(self) -> dict[str, object]:
+        if not self._lags:
+            return {"probes": 0}
+        lags = sorted(self._lags)
+        return {
+            "probes": len(lags),
+            "mean": round(sum(lags) / len(lags) * 1000, 3),
+            "p99": round(lags[int(len(lags) * 0.99)] * 1000, 3),
+            "max": round(lags[-1] * 1000, 3),
+        }
+
+    def _task_summary(self) -> list[dict[str, object]]:
+        # A task's samples tell how often it was running, hence its share of time
+        samples = max(self._samples.count, 1)
+        return [
+            {
+                "task": name,
+                "seconds": round(count * self.seconds / samples, 3),
+                "share": round(count / samples, 3),
+            }
+            for name, count in self._samples.tasks.most_common(TOP_ENTRIES)
+        ]
+
+
+@final
+class Profiler:
+    """Runs the profiling sessions of the process, one at a time."""
+
+    def __init__(self) -> None:
+        """Start idle."""
+        self.session: ProfilingSession | None = None
+        self._tasks: set[asyncio.Task[dict[str, object]]] = set()
+
+    async def profile(
+        self,
+        label: str,
+        logger: Logger,
+        seconds: float = DEFAULT_PROFILE_SECONDS,
+        mode: str = "sampling",
+    ) -> dict[str, object]:
+        """Run a profiling session and return its summary, see `ProfilingSession`.
+
+        Raises:
+            ValueError: If the mode or the duration is invalid, or a session is
+                already running.
+
+        """
+        if mode not in PROFILE_MODES:
+            e = f"Unknown profiling mode {mode!r}, use one of {PROFILE_MODES}"
+            raise ValueError(e)
+        if not 0 < seconds <= MAX_PROFILE_SECONDS:
+            e = f"Profiling lasts from 0 to {MAX_PROFILE_SECONDS}s, got {seconds}"
+            raise ValueError(e)
+        if self.session is not None:
+            e = f"Already profiling, until {self.session.path} is written"
+            raise ValueError(e)
+        self.session = ProfilingSession(
+            label, cast("ProfileMode", mode), seconds, logger
+        )
+        try:
+            return await self.session.run()
+        finally:
+            self.session = None
+
+    def start_from_environment(self, label: str, logger: Logger) -> None:
+        """Start a session in the background if `APP_PROFILE` asks for one.
+
+        The variable holds the mode, optionally followed by the duration in seconds,
+        e.g. "sampling:30" or "cprofile".
+        """
+        setting = os.environ.get(PROFILE_ENV_VAR)
+        if not setting:
+            return
+        mode, _, seconds = setting.partition(":")
+        try:
+            duration = float(seconds) if seconds else DEFAULT_PROFILE_SECONDS
+        except ValueError:
+            logger.error(f"Invalid {PROFILE_ENV_VAR} duration: {setting}")  # noqa: TRY400
+            return
+        task = asyncio.create_task(
+            self.profile(label, logger, duration, mode), name="startup-profile"
+        )
+        self._tasks.add(task)
+        task.add_done_callback(functools.partial(self._report_startup_profile, logger))
+
+    def _report_startup_profile(
+        self, logger: Logger, task: asyncio.Task[dict[str, object]]
+    ) -> None:
+        self._tasks.discard(task)
+        if not task.cancelled() and (exception := task.exception()) is not None:
+            logger.error("Startup profiling failed", exc_info=exception)
+
+
+profiler = Profiler()
+"""The profiler of the current process."""
+
+
+def _collapse(frame: FrameType | None) -> str:
+    names: list[str] = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({Path(code.co_filename).name}:{frame.f_lineno})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+def _top_frames(stacks: Counter[str]) -> list[str]:
+    """Return the innermost frames the samples were most often in."""
+    leaves: Counter[str] = Counter()
+    for stack, count in stacks.items():
+        leaves[stack.rsplit(";", 1)[-1]] += count
+    total = max(sum(leaves.values()), 1)
+    return [
+        f"{count / total:.1%} {leaf}" for leaf, count in leaves.most_common(TOP_ENTRIES)
+    ]
+
+
+def _top_functions(profile: cProfile.Profile) -> list[str]:
+    """Return the functions with the highest cumulative time."""
+    stats = pstats.Stats(profile)
+    entries = sorted(
+        stats.stats.items(),  # pyright: ignore[reportAttributeAccessIssue]
+        key=lambda item: item[1][3],
+        reverse=True,
+    )
+    return [
+        f"{cumulative:.3f}s {Path(filename).name}:{line}({function})"
+        for (filename, line, function), (_, _, _, cumulative, _) in entries[
+            :TOP_ENTRIES
+        ]
+    ]
@@ -1,5 +1,6 @@
 """Utility to initialize terminal window managed scripts."""
 
+import asyncio
 import atexit
 import signal
 import sys
@@ -19,13 +20,18 @@ from src.core.termwm import (
 from src.utils.helpers import construct_script_name
 from src.utils.lock_file_manager import LockFileManager
 from src.utils.logging_utils import setup_logger
+from src.utils.profiling import profiler
 
 SCRIPT_NAME = construct_script_name(__file__)
 logger = setup_logger(SCRIPT_NAME)
 
+LEASE_HEARTBEAT_INTERVAL = sdh.LEASE_DURATION_SECONDS / 3
+"""Seconds between slot lease renewals, a few renewals can be missed in a row."""
+
 cleanup_functions: list[
     tuple[Callable[..., None], tuple[object, ...], dict[str, object]]
 ] = []
+heartbeat_tasks: set[asyncio.Task[None]] = set()
 
 
 def _register_atexit_func(
@@ -63,6 +69,31 @@ def _setup_signal_handlers() -> None:
     signal.signal(signal.SIGINT, _signal_handler)
 
 
+async def _renew_slot_leases(slots_db_conn: aiosqlite.Connection) -> None:
+    """Keep the slots of this process leased until it exits."""
+    while True:
+        await asyncio.sleep(LEASE_HEARTBEAT_INTERVAL)
+        try:
+            renewed = await sdh.renew_leases(slots_db_conn)
+        except ValueError:
+            logger.debug("Slots database connection closed, stopping the heartbeat")
+            return
+        if renewed is None:
+            # The lease outlives a few missed renewals, try again on the next beat
+            logger.warning("Could not renew the slot leases, retrying")
+        elif not renewed:
+            logger.warning("No slot lease left to renew, it was reclaimed or freed")
+            return
+
+
+def _start_lease_heartbeat(slots_db_conn: aiosqlite.Connection) -> None:
+    task = asyncio.create_task(
+        _renew_slot_leases(slots_db_conn), name="slot-lease-heartbeat"
+    )
+    heartbeat_tasks.add(task)
+    task.add_done_callback(heartbeat_tasks.discard)
+
+
 async def _manage_script_startup(
     slots_db_conn: aiosqlite.Connection,
     window_type: WinType,
@@ -76,13 +107,12 @@ async def _manage_script_startup(
     )
     if window_type == WinType.DENIED:
         _register_atexit_func(sdh.free_denied_slot_sync, slot)
-        print(f"\n>>> Lock file is present for {script_name} <<<")
-        logger.info(f"Lock file is present for {script_name}")
+        print(f"\n>>> Lock is held for {script_name} <<<")
+        logger.info(f"Lock is held for {script_name}")
 
     elif window_type == WinType.ACCEPTED:
         if lock_file_manager:
-            lock_file_manager.create_lock_file()
-            _register_atexit_func(lock_file_manager.remove_lock_file)
+            _register_atexit_func(lock_file_manager.release)
         _register_atexit_func(sdh.free_slot_by_name_sync, name)
     return slot
 
@@ -90,7 +120,11 @@ async def _manage_script_startup(
 async def setup_script(
     script_name: str,
 ) -> tuple[aiosqlite.Connection, int | None]:
-    """Initialize the must have components for a terminal window managed script."""
+    """Initialize the must have components for a terminal window managed script.
+
+    Setting the `APP_PROFILE` environment variable, e.g. to "sampling:30", also
+    profiles the script from its startup, see `profiling`.
+    """
     lock_file_manager = LockFileManager(script_name)
     db_conn = await sdh.create_connection(TERMINAL_WINDOW_SLOTS_DB_FILE_PATH)
 
@@ -101,13 +135,18 @@ async def setup_script(
     _setup_signal_handlers()
     atexit.register(_witness_atexit_execution)
 
-    if lock_file_manager.lock_exists():
-        window_type = WinType.DENIED
-    else:
+    # Taking the lock is the check, two instances starting together cannot both win
+    if lock_file_manager.acquire():
         window_type = WinType.ACCEPTED
+    else:
+        window_type = WinType.DENIED
 
     slot = await _manage_script_startup(
         db_conn, window_type, script_name, lock_file_manager
     )
+    if slot is not None:
+        # The slot is leased, without renewals it gets reclaimed as if we crashed
+        _start_lease_heartbeat(db_conn)
 
+    profiler.start_from_environment(script_name, logger)
     return db_conn, slot
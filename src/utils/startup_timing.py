@@ -0,0 +1,68 @@
+"""Measure how long apps take from being launched to doing useful work.
+
+Whoever launches an app stamps the launch time (and how it was launched) in its
+environment with `mark_launch()`. The app then calls `report_startup_milestone()` when
+it reaches a point worth measuring, e.g. its first detection, which logs the time
+elapsed since launch once per milestone.
+"""
+
+import os
+import time
+from collections.abc import MutableMapping
+from logging import Logger
+
+LAUNCH_TIMESTAMP_ENV_VAR = "APP_LAUNCH_TIMESTAMP"
+LAUNCH_MODE_ENV_VAR = "APP_LAUNCH_MODE"
+FIRST_DETECTION_MILESTONE = "first detection"
+
+startup_milestones: dict[str, float] = {}
+"""Seconds elapsed from launch to each milestone reached so far."""
+
+
+def mark_launch(
+    env: MutableMapping[str, str], mode: str, timestamp: float | None = None
+) -> None:
+    """Stamp the launch time and mode into an app's environment.
+
+    Args:
+        env: The environment the app runs with.
+        mode: How the app was launched, e.g. "cold" or "warm".
+        timestamp: Launch time as given by `time.time()`, defaults to now.
+
+    """
+    env[LAUNCH_TIMESTAMP_ENV_VAR] = repr(
+        time.time() if timestamp is None else timestamp
+    )
+    env[LAUNCH_MODE_ENV_VAR] = mode
+
+
+def seconds_since_launch() -> float | None:
+    """Return the seconds elapsed since the app was launched, if it was stamped."""
+    raw_timestamp = os.environ.get(LAUNCH_TIMESTAMP_ENV_VAR)
+    if raw_timestamp is None:
+        return None
+    try:
+        return time.time() - float(raw_timestamp)
+    except ValueError:
+        return None
+
+
+def report_startup_milestone(milestone: str, logger: Logger) -> float | None:
+    """Log the time elapsed since launch, the first time a milestone is reached.
+
+    Returns:
+        The elapsed seconds, or None if the milestone was already reported or the app
+        launch was not stamped.
+
+    """
+    if milestone in startup_milestones:
+        return None
+    elapsed = seconds_since_launch()
+    if elapsed is None:
+        return None
+    startup_milestones[milestone] = elapsed
+    mode = os.environ.get(LAUNCH_MODE_ENV_VAR, "unknown")
+    message = f"Launch to {milestone}: {elapsed:.3f}s ({mode} start)"
+    print(message)
+    logger.info(message)
+    return elapsed